@@ -1,33 +1,98 @@
+import time
+import uuid
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import altair as alt
-import tempfile
 from datetime import datetime
-from src.pipeline import run_pipeline
-from src.modules.report_generator import generate_pdf_report
+from src.utils.dashboard import content_hash, build_dashboard_data
+from src.utils.jobs import get_job_manager, COMPLETED, FAILED, CANCELLED
+from src.config.settings import APP_POLL_SECONDS
+
+# Rows offered in the review picker; larger categories are truncated
+EXPLORER_MAX_OPTIONS = 1000
 
 st.set_page_config(page_title="AI Review Analyzer", layout="wide")
 st.title("AI Review Analyzer")
 st.caption("GenAI-powered review analysis with consistent analytics")
 
+# Jobs run on worker threads shared by every session; results are kept per
+# file content hash, so the same file is analyzed once across sessions
+jobs = get_job_manager()
+
 if "result" not in st.session_state:
     st.session_state.result = None
+if "file_hashes" not in st.session_state:
+    st.session_state.file_hashes = {}
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+if "session_id" not in st.session_state:
+    # Identifies this session as a job subscriber, so its Cancel only
+    # stops a shared run once no other session is waiting on it
+    st.session_state.session_id = uuid.uuid4().hex
 
-uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
+uploaded_file = st.file_uploader(
+    "Upload reviews (CSV, Parquet, Arrow or JSONL)",
+    type=["csv", "parquet", "arrow", "feather", "jsonl", "ndjson"]
+)
 
 if uploaded_file:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-        tmp.write(uploaded_file.getvalue())
-        file_path = tmp.name
+    # Hash each upload once, not on every rerun
+    upload_key = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    file_hash = st.session_state.file_hashes.get(upload_key)
+    if file_hash is None:
+        file_hash = content_hash(uploaded_file.getbuffer())
+        st.session_state.file_hashes = {upload_key: file_hash}
 
     if st.button("Run Analysis"):
-        with st.spinner("Analyzing reviews using AI..."):
-            st.session_state.result = run_pipeline(file_path)
+        job = jobs.submit(file_hash, uploaded_file.getvalue(), suffix=Path(uploaded_file.name).suffix,
+                          postprocess=build_dashboard_data, subscriber=st.session_state.session_id)
+        st.session_state.job_id = job.id
+
+job = jobs.get(st.session_state.job_id) if st.session_state.job_id else None
+polling = False
+
+if job is not None:
+    if job.status == COMPLETED:
+        st.session_state.result = (job.result, job.extra)
+        st.session_state.job_id = None
         st.success("Analysis completed")
+    elif job.status == FAILED:
+        st.session_state.job_id = None
+        st.error(f"Analysis failed: {job.error}")
+    elif job.status == CANCELLED:
+        st.session_state.job_id = None
+        st.warning("Analysis cancelled")
+    else:
+        polling = True
+        snapshot = job.progress.snapshot()
+
+        st.header("Analysis in progress")
+        st.progress(min(1.0, snapshot["fraction"]))
+        eta = snapshot["eta_seconds"]
+        st.caption(
+            f"{snapshot['done']} of {snapshot['total'] or '?'} reviews analyzed "
+            f"({snapshot['failed']} failed) | {snapshot['reviews_per_second']:.1f} reviews/s | "
+            f"ETA {f'{eta:.0f}s' if eta is not None else 'n/a'}"
+        )
+
+        partial = snapshot["partial"]
+        if partial:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("AI Rating so far", f"{partial['overall_ai_rating']:.2f}")
+            col2.metric("Weighted Rating so far", f"{partial['weighted_rating']:.2f}")
+            col3.metric("Mean Sentiment so far", f"{partial['mean_sentiment']:.3f}")
+            st.bar_chart(pd.DataFrame({"count": partial["sentiment_counts"]}))
+
+        if st.button("Cancel Analysis"):
+            if not jobs.cancel(job.id, st.session_state.session_id):
+                # Another session still waits on it; this one just stops watching
+                st.session_state.job_id = None
+            st.rerun()
 
 if st.session_state.result:
-    result = st.session_state.result
-    df_all = pd.DataFrame(result["ratings_dataframe"])
+    result, dashboard = st.session_state.result
+    df_all = result["ratings_dataframe"]
 
     st.header("Overall Summary")
     col1, col2, col3 = st.columns(3)
@@ -36,15 +101,8 @@ if st.session_state.result:
     col3.metric("Mean Sentiment", round(result["sentiment_stats"]["mean_sentiment"], 3))
 
     st.subheader("Rating Distribution")
-    rating_counts = (
-        df_all["ai_rating"]
-        .value_counts()
-        .sort_index()
-        .reset_index()
-    )
-    rating_counts.columns = ["ai_rating", "count"]
     rating_chart = (
-        alt.Chart(rating_counts)
+        alt.Chart(dashboard["rating_counts"])
         .mark_bar(color="#4C78A8")
         .encode(
             x=alt.X("ai_rating:O", title="AI Rating"),
@@ -57,21 +115,15 @@ if st.session_state.result:
 
     st.subheader("Sentiment Overview")
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Min Sentiment", f"{df_all['sentiment'].min():.3f}")
-    col2.metric("Mean Sentiment", f"{df_all['sentiment'].mean():.3f}")
-    col3.metric("Max Sentiment", f"{df_all['sentiment'].max():.3f}")
-    col4.metric("Std Dev", f"{df_all['sentiment'].std():.3f}")
+    sentiment_summary = dashboard["sentiment_summary"]
+    col1.metric("Min Sentiment", f"{sentiment_summary['min']:.3f}")
+    col2.metric("Mean Sentiment", f"{sentiment_summary['mean']:.3f}")
+    col3.metric("Max Sentiment", f"{sentiment_summary['max']:.3f}")
+    col4.metric("Std Dev", f"{sentiment_summary['std']:.3f}")
 
     st.subheader("Sentiment Categories")
-    sentiment_counts = (
-        df_all["sentiment_category"]
-        .value_counts()
-        .reindex(["Strong Negative", "Negative", "Neutral", "Positive", "Strong Positive"], fill_value=0)
-        .reset_index()
-    )
-    sentiment_counts.columns = ["sentiment_category", "count"]
     sentiment_chart = (
-        alt.Chart(sentiment_counts)
+        alt.Chart(dashboard["sentiment_counts"])
         .mark_bar(color="#F58518")
         .encode(
             x=alt.X("sentiment_category:N", title="Sentiment", sort=["Strong Negative", "Negative", "Neutral", "Positive", "Strong Positive"]),
@@ -84,28 +136,49 @@ if st.session_state.result:
 
     st.subheader("Review Category Breakdown")
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Total Reviews", len(df_all))
-    col2.metric("Strong Negative", (df_all["sentiment_category"] == "Strong Negative").sum())
-    col3.metric("Neutral / Balanced", (df_all["sentiment_category"] == "Neutral").sum())
-    col4.metric("Strong Positive", (df_all["sentiment_category"] == "Strong Positive").sum())
+    category_counts = dashboard["category_counts"]
+    col1.metric("Total Reviews", dashboard["total_reviews"])
+    col2.metric("Strong Negative", category_counts["Strong Negative"])
+    col3.metric("Neutral / Balanced", category_counts["Neutral"])
+    col4.metric("Strong Positive", category_counts["Strong Positive"])
     col5.metric("Most Influential", len(result["impact_analysis"]["most_influential_reviews"]))
 
+    user_stats = result.get("user_rating_stats")
+    if user_stats:
+        st.subheader("User vs AI Ratings")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Mean User Rating", user_stats["mean_user_rating"])
+        col2.metric("Mean AI Rating", user_stats["mean_ai_rating"])
+        col3.metric("Mean Gap (AI - User)", user_stats["mean_gap"])
+
+    if result.get("segment_stats") is not None:
+        st.subheader("Segments")
+        st.dataframe(result["segment_stats"], use_container_width=True)
+
     st.header("Review Explorer")
     review_category = st.selectbox(
         "Select review category",
         ["Strong Negative Reviews", "Neutral/Balanced Reviews", "Strong Positive Reviews", "Statistical Outliers", "Most Influential Reviews"]
     )
 
+    category_positions = dashboard["category_positions"]
     if review_category == "Strong Negative Reviews":
-        df_reviews = df_all[df_all["sentiment_category"] == "Strong Negative"]
+        positions = category_positions["Strong Negative"]
     elif review_category == "Neutral/Balanced Reviews":
-        df_reviews = df_all[df_all["sentiment_category"] == "Neutral"]
+        positions = category_positions["Neutral"]
     elif review_category == "Strong Positive Reviews":
-        df_reviews = df_all[df_all["sentiment_category"] == "Strong Positive"]
+        positions = category_positions["Strong Positive"]
     elif review_category == "Statistical Outliers":
-        df_reviews = pd.DataFrame(result["outliers"]["statistical_outliers"])
+        positions = result["outliers"]["indices"]["statistical_outliers"]
     else:
-        df_reviews = pd.DataFrame(result["impact_analysis"]["most_influential_reviews"])
+        positions = None
+
+    if positions is None:
+        df_reviews = result["impact_analysis"]["most_influential_reviews"].to_frame()
+    else:
+        if len(positions) > EXPLORER_MAX_OPTIONS:
+            st.caption(f"Showing the first {EXPLORER_MAX_OPTIONS} of {len(positions)} reviews.")
+        df_reviews = df_all.iloc[positions[:EXPLORER_MAX_OPTIONS]]
 
     if df_reviews.empty:
         st.info("No reviews found for this category.")
@@ -128,15 +201,17 @@ if st.session_state.result:
     col1, col2 = st.columns([2, 1])
     with col1:
         st.write("Download a comprehensive PDF report with all statistics, outliers, and influential reviews.")
+        include_appendix = st.checkbox("Include appendix with all reviews")
     
     with col2:
         if st.button("Generate PDF Report", use_container_width=True):
             with st.spinner("Generating PDF report..."):
                 try:
-                    pdf_path = generate_pdf_report(result)
-                    
-                    with open(pdf_path, "rb") as pdf_file:
-                        pdf_data = pdf_file.read()
+                    # reportlab is only needed once a report is requested
+                    from src.modules.report_generator import render_pdf_report
+
+                    # Rendered in memory and cached per result, so sessions never share a file
+                    pdf_data = render_pdf_report(result, appendix=include_appendix)
                     
                     st.download_button(
                         label="Download PDF Report",
@@ -148,4 +223,9 @@ if st.session_state.result:
                     
                     st.success("PDF report generated successfully!")
                 except Exception as e:
-                    st.error(f"Error generating PDF: {str(e)}")
\ No newline at end of file
+                    st.error(f"Error generating PDF: {str(e)}")
+
+if polling:
+    # Poll the background job without blocking other sessions
+    time.sleep(APP_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,129 @@
+"""
+Offline throughput comparison of the review analysis strategies.
+
+Runs `analyze_reviews` and `run_pipeline` against the deterministic fake
+LLM backend (no network, no API spend) and reports reviews/second for
+sequential, concurrent, batched and cached runs.
+
+Usage:
+    python benchmarks/analysis_throughput.py [--rows 500] [--latency uniform:0.05,0.15]
+        [--malformed-rate 0.02] [--error-rate 0.01] [--concurrency 4 16 64]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--latency", default="uniform:0.05,0.15")
+    parser.add_argument("--malformed-rate", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--skip-sequential", action="store_true",
+                        help="skip the (slow) one-request-at-a-time baseline")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    # Settings are read at import time, so the backend is chosen before importing src
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = args.latency
+    os.environ["FAKE_LLM_MALFORMED_RATE"] = str(args.malformed_rate)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ["CHECKPOINT_ENABLED"] = "0"
+    os.environ["DEDUP_ENABLED"] = "0"
+    os.environ["RESULT_CACHE_PATH"] = str(Path(tempfile.mkdtemp()) / "bench_cache.sqlite")
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def build_dataset(rows):
+    import pandas as pd
+
+    frames = [pd.read_csv(PROJECT_ROOT / "data/input/data1.csv"),
+              pd.read_csv(PROJECT_ROOT / "data/input/data2.csv")]
+    base = pd.concat(frames, ignore_index=True)
+
+    repeats = -(-rows // len(base))
+    df = pd.concat([base] * repeats, ignore_index=True).iloc[:rows].copy()
+    # Unique texts so neither deduplication nor caching hides the LLM cost
+    df["Review"] = [f"{text} (ref {i})" for i, text in enumerate(df["Review"])]
+    df["ID"] = range(1, len(df) + 1)
+    return df
+
+
+def timed(label, fn, rows, llm, expect_calls=True):
+    llm.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        output = fn()
+        elapsed = time.perf_counter() - start
+
+    # A broken chain fails every review instantly; that is not throughput
+    analyzed = len(output["all_reviews"]) if isinstance(output, dict) else len(output)
+    if not analyzed:
+        raise SystemExit(f"{label}: every review failed, no throughput to report")
+    if expect_calls and llm.calls == 0:
+        raise SystemExit(f"{label}: no LLM calls were made, no throughput to report")
+
+    print(f"{label:<34} {elapsed:8.2f} s  {rows / elapsed:9.1f} reviews/s  {llm.calls:6d} calls")
+    return output
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from src.modules.review_analyzer import (
+        analyze_reviews,
+        analyze_reviews_concurrent,
+        analyze_reviews_batched,
+    )
+    from src.pipeline import run_pipeline
+    from src.utils.cache import get_cache
+    from src.utils.llm_utils import get_llm
+
+    df = build_dataset(args.rows)
+    reviews = df["Review"].astype(str).tolist()
+    ids = df["ID"].tolist()
+    llm = get_llm()
+
+    print(f"{args.rows} reviews, latency={args.latency}, malformed={args.malformed_rate}, "
+          f"errors={args.error_rate}\n")
+
+    if not args.skip_sequential:
+        timed("analyze_reviews (sequential)", lambda: analyze_reviews(reviews, ids), args.rows, llm)
+
+    for concurrency in args.concurrency:
+        timed(f"analyze_reviews_concurrent x{concurrency}",
+              lambda: analyze_reviews_concurrent(reviews, ids, concurrency), args.rows, llm)
+
+    timed(f"analyze_reviews_batched x{args.concurrency[0]}",
+          lambda: analyze_reviews_batched(reviews, ids, args.concurrency[0]), args.rows, llm)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "bench_reviews.csv"
+        df.to_csv(csv_path, index=False)
+
+        cache = get_cache()
+        cache.clear()
+        concurrency = args.concurrency[-1]
+        timed(f"run_pipeline x{concurrency} (cold cache)",
+              lambda: run_pipeline(str(csv_path), concurrency=concurrency), args.rows, llm)
+        timed(f"run_pipeline x{concurrency} (warm cache)",
+              lambda: run_pipeline(str(csv_path), concurrency=concurrency), args.rows, llm,
+              expect_calls=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Scaling benchmark for the analytics stages.
+
+Times and memory-profiles load_csv, aggregate_results, aggregate_by_segment,
+detect_outliers, analyze_impact and generate_pdf_report separately on synthetic datasets
+(1k to 1M rows), compares against stored baselines and exits non-zero when
+a stage regresses beyond the threshold.
+
+Usage:
+    python benchmarks/stages.py [--sizes 1000 10000 100000 1000000]
+        [--threshold 1.5] [--update-baseline] [--no-memory]
+
+Baselines are machine-specific. benchmarks/baselines/stages.json holds the
+committed reference run; re-record it with --update-baseline on the machine
+that runs the comparison. A stage without a baseline fails the check rather
+than passing unchecked.
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic import make_reviews, make_analysis_results  # noqa: E402
+
+BASELINE_PATH = PROJECT_ROOT / "benchmarks" / "baselines" / "stages.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Regressions are only reported above this absolute floor, to ignore timer noise
+MIN_SECONDS = 0.05
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="fail when a stage takes more than threshold x its baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per stage (best is kept)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak measurement")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    return parser.parse_args()
+
+
+def measure(fn, repeat, memory):
+    """
+    Returns (best wall time in seconds, peak traced memory in MB or None, last output).
+    """
+    best = float("inf")
+    output = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = peak / 2**20
+
+    return best, peak_mb, output
+
+
+def run_size(n, args, workdir):
+    from src.modules.csv_loader import load_csv
+    from src.modules.aggregation import aggregate_results, aggregate_by_segment
+    from src.modules.outlier_detection import detect_outliers
+    from src.modules.impact_analysis import analyze_impact
+    from src.modules.report_generator import generate_pdf_report
+
+    memory = not args.no_memory
+    df = make_reviews(n)
+    csv_path = workdir / f"reviews_{n}.csv"
+    df.to_csv(csv_path, index=False)
+    analysis = make_analysis_results(df)
+
+    stages = {}
+
+    seconds, peak, data = measure(lambda: load_csv(str(csv_path)), args.repeat, memory)
+    stages["load_csv"] = (seconds, peak)
+
+    seconds, peak, aggregation = measure(
+        lambda: aggregate_results(analysis, data["reviews"], data["ids"]), args.repeat, memory
+    )
+    stages["aggregate_results"] = (seconds, peak)
+    ratings_df = aggregation["ratings_dataframe"]
+
+    # Thousands of segments at the larger sizes
+    segmented = ratings_df.assign(
+        product=(ratings_df["id"] % max(1, min(5000, n // 100))).astype(str),
+        user_rating=df["Ratings"].to_numpy()
+    )
+    seconds, peak, _ = measure(lambda: aggregate_by_segment(segmented, "product"), args.repeat, memory)
+    stages["aggregate_by_segment"] = (seconds, peak)
+
+    seconds, peak, outliers = measure(lambda: detect_outliers(ratings_df), args.repeat, memory)
+    stages["detect_outliers"] = (seconds, peak)
+
+    seconds, peak, impacts = measure(lambda: analyze_impact(ratings_df), args.repeat, memory)
+    stages["analyze_impact"] = (seconds, peak)
+
+    result = {
+        "total_reviews": n,
+        "overall_ai_rating": aggregation["overall_ai_rating"],
+        "weighted_rating": aggregation["weighted_rating"],
+        "sentiment_stats": aggregation["sentiment_stats"],
+        "ratings_dataframe": ratings_df,
+        "outliers": outliers,
+        "impact_analysis": impacts,
+    }
+    pdf_path = str(workdir / f"report_{n}.pdf")
+    seconds, peak, _ = measure(lambda: generate_pdf_report(result, pdf_path), 1, memory)
+    stages["generate_pdf_report"] = (seconds, peak)
+
+    return stages
+
+
+def main():
+    args = parse_args()
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text())
+
+    current = {}
+    regressions = []
+    missing = []
+
+    print(f"{'stage':<22}{'rows':>10}{'seconds':>11}{'peak MB':>10}{'baseline':>11}{'ratio':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            for stage, (seconds, peak) in run_size(n, args, Path(tmp)).items():
+                key = f"{stage}@{n}"
+                current[key] = {"seconds": round(seconds, 5),
+                                "peak_mb": round(peak, 2) if peak is not None else None}
+
+                baseline = baselines.get(key, {}).get("seconds")
+                ratio = seconds / baseline if baseline else None
+                flag = ""
+                if baseline is None:
+                    missing.append(key)
+                    flag = "  NO BASELINE"
+                elif ratio > args.threshold and seconds > MIN_SECONDS:
+                    regressions.append(key)
+                    flag = "  REGRESSION"
+
+                print(f"{stage:<22}{n:>10}{seconds:>11.4f}"
+                      f"{(f'{peak:.1f}' if peak is not None else '-'):>10}"
+                      f"{(f'{baseline:.4f}' if baseline else '-'):>11}"
+                      f"{(f'{ratio:.2f}' if ratio else '-'):>8}{flag}")
+
+    if args.update_baseline:
+        baselines.update(current)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaselines written to {args.baseline}")
+        return
+
+    if missing:
+        print(f"\nNo baseline in {args.baseline} for: {', '.join(missing)}\n"
+              f"Record one with --update-baseline.")
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond {args.threshold}x: {', '.join(regressions)}")
+    if missing or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
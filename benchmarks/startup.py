@@ -0,0 +1,103 @@
+"""
+Cold-start guard for the CLI and Streamlit entry points.
+
+Runs `python -X importtime` on the modules imported at startup and fails
+when the import time exceeds its budget or a heavy module (LLM client,
+PDF rendering) is imported eagerly.
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 1500] [--repeat 3]
+"""
+import argparse
+import importlib.util
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Modules imported by main.py and app/streamlit_app.py at startup
+TARGETS = {
+    "cli": "import main",
+    "pipeline": "import src.pipeline",
+    # Runs the script outside `streamlit run` (bare mode), which imports the same modules
+    "app": "import runpy; runpy.run_path('app/streamlit_app.py')",
+}
+
+# Targets that need an optional package; skipped when it is not installed
+TARGET_REQUIRES = {"app": "streamlit"}
+
+# Must only be imported on first use
+DEFERRED_MODULES = ("langchain", "langchain_core", "langchain_groq", "groq", "reportlab")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(statement):
+    """
+    Returns (total cumulative import time in ms, set of imported modules).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        # Top-level imports are indented by a single space
+        if len(indent) == 1:
+            total_us += cumulative
+
+    return total_us / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="maximum import time per target (best of --repeat runs)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+
+    for name, statement in TARGETS.items():
+        required = TARGET_REQUIRES.get(name)
+        if required and importlib.util.find_spec(required) is None:
+            print(f"{name:<10} {'-':>8}     skipped ({required} not installed)")
+            continue
+
+        runs = [measure(statement) for _ in range(args.repeat)]
+        best_ms = min(ms for ms, _ in runs)
+        modules = runs[0][1]
+
+        eager = sorted(
+            module for module in modules
+            if module.split(".")[0] in DEFERRED_MODULES
+        )
+
+        status = "ok"
+        if best_ms > args.budget_ms:
+            status = f"SLOW (budget {args.budget_ms:.0f} ms)"
+            failed = True
+        if eager:
+            status = f"EAGER IMPORTS: {', '.join(sorted({m.split('.')[0] for m in eager}))}"
+            failed = True
+
+        print(f"{name:<10} {best_ms:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
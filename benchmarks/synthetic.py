@@ -0,0 +1,69 @@
+"""
+Synthetic review datasets shaped like data/input/data1.csv and data2.csv.
+
+`make_reviews(n)` returns a DataFrame with the CSV columns (ID, Name, Review,
+Ratings); `make_analysis_results(df)` returns analyzer-shaped results so the
+analytics stages can be exercised without any LLM calls.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SAMPLE_FILES = ("data/input/data1.csv", "data/input/data2.csv")
+
+REASONINGS = np.array([
+    "The review describes a mostly positive experience with minor caveats.",
+    "The reviewer is clearly dissatisfied with the service quality.",
+    "The feedback is balanced, mentioning both strengths and weaknesses.",
+    "Strong praise for reliability and support responsiveness.",
+    "Frustration with usability issues dominates the review.",
+], dtype=object)
+
+
+def _samples():
+    frames = [pd.read_csv(PROJECT_ROOT / path) for path in SAMPLE_FILES]
+    base = pd.concat(frames, ignore_index=True)
+    return base["Name"].astype(str).to_numpy(dtype=object), base["Review"].astype(str).to_numpy(dtype=object)
+
+
+def make_reviews(n, seed=0):
+    """
+    n reviews drawn from the sample files' names and texts, with a per-row
+    suffix so texts are not exact duplicates, and user ratings in [0, 5].
+    """
+    rng = np.random.default_rng(seed)
+    names, texts = _samples()
+
+    picked = texts[rng.integers(0, len(texts), n)]
+    suffix = rng.integers(0, 1_000_000, n).astype(str)
+    reviews = picked + " Order #" + suffix
+
+    return pd.DataFrame({
+        "ID": np.arange(1, n + 1),
+        "Name": names[rng.integers(0, len(names), n)],
+        "Review": reviews,
+        "Ratings": np.round(rng.uniform(0.0, 5.0, n), 1),
+    })
+
+
+def make_analysis_results(df, seed=0):
+    """
+    Analyzer-shaped results (id, ai_rating, sentiment, reasoning) loosely
+    correlated with the user ratings.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n = len(df)
+
+    user = df["Ratings"].to_numpy(dtype=float)
+    sentiment = np.clip((user - 2.5) / 2.5 + rng.normal(0, 0.25, n), -1, 1).round(3)
+    ai_rating = np.clip(1 + (sentiment + 1) * 2 + rng.normal(0, 0.3, n), 1, 5).round(2)
+    reasoning = REASONINGS[rng.integers(0, len(REASONINGS), n)]
+
+    return pd.DataFrame({
+        "id": df["ID"].to_numpy(),
+        "ai_rating": ai_rating,
+        "sentiment": sentiment,
+        "reasoning": reasoning,
+    }).to_dict("records")
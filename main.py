@@ -1,19 +1,29 @@
-from src.pipeline import run_pipeline
-import json
+from src.utils.batch import discover_inputs, run_batch
+import argparse
 
 
 if __name__ == "__main__":
 
-    result = run_pipeline("data/input/reviews.csv")
+    parser = argparse.ArgumentParser(description="Analyze review files in parallel.")
+    parser.add_argument("inputs", nargs="*", default=["data/input"],
+                        help="CSV, Parquet, Arrow or JSONL files, directories or glob patterns "
+                             "(default: data/input)")
+    parser.add_argument("--output-dir", default="data/output")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: BATCH_FILE_WORKERS, 0 = one per core)")
+    parser.add_argument("--no-pdf", action="store_true", help="skip the per-file PDF reports")
+    args = parser.parse_args()
 
-    print("\nFINAL SUMMARY\n")
-    print("Total Reviews:", result["total_reviews"])
-    print("Overall AI Rating:", result["overall_ai_rating"])
-    print("Weighted Rating:", result["weighted_rating"])
+    files = discover_inputs(args.inputs)
+    summary = run_batch(files, output_dir=args.output_dir, workers=args.workers, pdf=not args.no_pdf)
 
-    print("\nTop 3 Influential Reviews:")
-    for r in result["impact_analysis"]["most_influential_reviews"][:3]:
-        print(r)
+    print("\nBATCH SUMMARY\n")
+    print("Files:", summary["files"], f"({summary['succeeded']} ok, {summary['failed']} failed)")
+    print("Total Reviews:", summary["total_reviews"])
+    print("Overall AI Rating:", summary["overall_ai_rating"])
+    print("Weighted Rating:", summary["weighted_rating"])
+    print(f"Wall Time: {summary['wall_seconds']:.1f}s")
+    print(f"\nPer-file outputs and batch_summary.json written to {args.output_dir}")
 
-    print("\nOutlier Counts:")
-    print(result["outliers"]["counts"])
+    if summary["failed"]:
+        raise SystemExit(1)
@@ -24,3 +24,33 @@ RETURN ONLY JSON:
 Review:
 {review}
 """
+
+BATCH_REVIEW_ANALYSIS_PROMPT = """
+You are an expert AI review analyst. Analyze each review below objectively and provide accurate, balanced ratings.
+
+CRITICAL INSTRUCTIONS (apply to EVERY review independently):
+
+1. **AI Rating (0-5)**: Based on the review, give a new generated ai rating between 0 and 5, where it can be in decimals as well.
+2. **Sentiment (-1 to 1)**: Reader's TRUE emotional tone - give a decimal number according to the sentiment you understand from the review.
+IMPORTANT: Output the sentiment that truly matches each review's tone. Diversity of sentiment is expected across different reviews.
+   - Do NOT default to neutral - identify if the review expresses clear positive or negative emotion.
+
+3. **Reasoning**: One clear sentence explaining your assessment
+Again remember you need to act like a human and give out these. Also don't act on the positive side and give out actual real details.
+
+Each review is given as "[ID: <id>] <review text>".
+
+RETURN ONLY A JSON ARRAY with exactly one object per review, in the same order, copying each ID as given:
+
+[
+  {{
+    "id": "<id>",
+    "ai_rating": <float 0-5>,
+    "sentiment": <float -1 to 1>,
+    "reasoning": "concise explanation"
+  }}
+]
+
+Reviews:
+{reviews}
+"""
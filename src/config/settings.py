@@ -8,9 +8,140 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = "allam-2-7b"
 TEMPERATURE = 0
 
+# LLM backend: "groq" for the live API, "fake" for the deterministic
+# in-process model used for offline benchmarks.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+
+# Fake backend behaviour. Latency specs: "fixed:0.05", "uniform:0.02,0.2",
+# "exponential:0.1" or "lognormal:-2.3,0.5" (seconds).
+FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "0")
+FAKE_LLM_MALFORMED_RATE = float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+# Maximum number of in-flight LLM requests during review analysis.
+# 1 keeps the original sequential behaviour.
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "8"))
+
+# Retry policy for LLM calls: exponential backoff with full jitter (seconds),
+# honoring Retry-After on 429/5xx responses.
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+
+# Client-side request and token rate limits shared by all concurrent calls
+# (per minute, 0 = unlimited). Set them to the Groq limits of your tier.
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+
+# Circuit breaker: after this many consecutive retryable failures all LLM
+# calls pause for the cooldown (seconds) before a single probe request.
+# 0 disables the breaker.
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "30"))
+
+# Per-review prompt token budget (estimated tokens, 0 = unlimited) and the
+# policy for oversized reviews: "head_tail" keeps the beginning and end,
+# "extractive" keeps the most central sentences, "none" sends them whole.
+REVIEW_MAX_TOKENS = int(os.getenv("REVIEW_MAX_TOKENS", "1000"))
+REVIEW_TRUNCATION_POLICY = os.getenv("REVIEW_TRUNCATION_POLICY", "head_tail")
+REVIEW_HEAD_RATIO = float(os.getenv("REVIEW_HEAD_RATIO", "0.7"))
+
+# Multi-review prompting: pack several reviews into one request.
+# Batches are sized so the estimated prompt stays within the token budget.
+BATCH_PROMPTING_ENABLED = os.getenv("BATCH_PROMPTING_ENABLED", "0") == "1"
+BATCH_TOKEN_BUDGET = int(os.getenv("BATCH_TOKEN_BUDGET", "2500"))
+BATCH_MAX_REVIEWS = int(os.getenv("BATCH_MAX_REVIEWS", "25"))
+
+# Deduplication before LLM analysis. Exact duplicates are matched on
+# normalized text; near-duplicates (opt-in) on SimHash similarity (0-1).
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_NEAR_ENABLED = os.getenv("DEDUP_NEAR_ENABLED", "0") == "1"
+DEDUP_NEAR_THRESHOLD = float(os.getenv("DEDUP_NEAR_THRESHOLD", "0.85"))
+
+# On-disk cache of parsed LLM analyses, keyed on review text, prompt,
+# model and temperature.
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "data/cache/review_cache.sqlite")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "500000"))
+RESULT_CACHE_MAX_AGE_DAYS = int(os.getenv("RESULT_CACHE_MAX_AGE_DAYS", "30"))
+
+# Rows per chunk when running the pipeline in streaming mode.
+STREAMING_CHUNK_SIZE = int(os.getenv("STREAMING_CHUNK_SIZE", "5000"))
+
+# Crash-safe checkpoint journal: parsed results are appended to a JSONL
+# file tied to the input file's fingerprint and fsynced in batches.
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "1") == "1"
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "data/checkpoints")
+CHECKPOINT_FSYNC_EVERY = int(os.getenv("CHECKPOINT_FSYNC_EVERY", "50"))
+CHECKPOINT_FSYNC_INTERVAL = float(os.getenv("CHECKPOINT_FSYNC_INTERVAL", "2.0"))
+
+# Optional metrics exports: a Prometheus textfile (node_exporter textfile
+# collector) rewritten after each run, and a JSON-lines run log.
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")
+METRICS_LOG_PATH = os.getenv("METRICS_LOG_PATH", "")
+
+# Number of finished analyses the Streamlit app keeps in memory, shared
+# across sessions and keyed on the file's content hash.
+APP_RESULT_CACHE_ENTRIES = int(os.getenv("APP_RESULT_CACHE_ENTRIES", "4"))
+
+# Background analysis jobs in the Streamlit app: worker threads shared by
+# all sessions and the progress polling interval (seconds).
+APP_MAX_JOBS = int(os.getenv("APP_MAX_JOBS", "2"))
+APP_POLL_SECONDS = float(os.getenv("APP_POLL_SECONDS", "1.0"))
+
+# PDF reports: rendered reports kept in memory (keyed on the result's
+# fingerprint) and rows per table in the optional all-reviews appendix.
+REPORT_CACHE_ENTRIES = int(os.getenv("REPORT_CACHE_ENTRIES", "8"))
+REPORT_APPENDIX_CHUNK_ROWS = int(os.getenv("REPORT_APPENDIX_CHUNK_ROWS", "50"))
+
+# Multi-file batch runs (main.py): worker processes, 0 = one per CPU core.
+BATCH_FILE_WORKERS = int(os.getenv("BATCH_FILE_WORKERS", "0"))
+
+# Local HTTP job service (python -m src.service): bind address, concurrent
+# jobs, finished jobs kept in memory and the largest accepted upload (MB).
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8765"))
+SERVICE_MAX_JOBS = int(os.getenv("SERVICE_MAX_JOBS", "4"))
+SERVICE_FINISHED_JOBS = int(os.getenv("SERVICE_FINISHED_JOBS", "32"))
+SERVICE_MAX_UPLOAD_MB = int(os.getenv("SERVICE_MAX_UPLOAD_MB", "512"))
+
+# Offline pre-classifier in front of the LLM: lexicon sentiment combined
+# with the dataset's own rating. Reviews scored below the confidence
+# threshold (0-1) go to the LLM, as does a stable audit sample of the rest.
+PRECLASSIFY_ENABLED = os.getenv("PRECLASSIFY_ENABLED", "0") == "1"
+PRECLASSIFY_CONFIDENCE = float(os.getenv("PRECLASSIFY_CONFIDENCE", "0.8"))
+PRECLASSIFY_AUDIT_RATE = float(os.getenv("PRECLASSIFY_AUDIT_RATE", "0.05"))
+
+# Segment columns for per-segment metrics, comma-separated. A date column
+# can be bucketed with a pandas period alias, e.g. "Product,Name,Date:M".
+SEGMENT_COLUMNS = os.getenv("SEGMENT_COLUMNS", "")
+
+# Progressive sampling (run_pipeline(sample=True)): rounds of reviews are
+# analyzed until the confidence interval (SAMPLE_CONFIDENCE) of the overall
+# and weighted AI rating is narrower than SAMPLE_TARGET_WIDTH rating points
+# or SAMPLE_BUDGET reviews have been sent (0 = no budget). Sampling is
+# stratified by the dataset's rating unless SAMPLE_STRATIFY is 0.
+SAMPLE_TARGET_WIDTH = float(os.getenv("SAMPLE_TARGET_WIDTH", "0.1"))
+SAMPLE_BUDGET = int(os.getenv("SAMPLE_BUDGET", "0"))
+SAMPLE_INITIAL_SIZE = int(os.getenv("SAMPLE_INITIAL_SIZE", "200"))
+SAMPLE_CONFIDENCE = float(os.getenv("SAMPLE_CONFIDENCE", "0.95"))
+SAMPLE_STRATIFY = os.getenv("SAMPLE_STRATIFY", "1") == "1"
+SAMPLE_SEED = int(os.getenv("SAMPLE_SEED", "0"))
+
+# Number of most influential reviews reported by impact analysis.
+IMPACT_TOP_K = int(os.getenv("IMPACT_TOP_K", "10"))
+
+# Outlier detection. OUTLIER_METHOD picks which flags are reported as
+# statistical outliers: "percentile", "sigma", "iqr" or "mad".
+OUTLIER_METHOD = os.getenv("OUTLIER_METHOD", "percentile")
+OUTLIER_SIGMA_K = float(os.getenv("OUTLIER_SIGMA_K", "1.5"))
+OUTLIER_IQR_K = float(os.getenv("OUTLIER_IQR_K", "1.5"))
+OUTLIER_MAD_K = float(os.getenv("OUTLIER_MAD_K", "3.5"))
+
 CSV_COLUMNS = {
     "id": "ID",
     "name": "Name",
     "review": "Review",
-    "rating": "Rating"
+    "rating": "Ratings"
 }
@@ -1,9 +1,21 @@
+import numpy as np
 import pandas as pd
 
 
-def aggregate_results(analysis_results, original_reviews, original_ids=None):
+# Fields of a StreamingAggregator summary that `aggregate_results` can reuse
+HEADLINE_KEYS = ("overall_ai_rating", "weighted_rating", "sentiment_stats", "rating_stats", "sentiment_counts")
+
+
+def aggregate_results(analysis_results, original_reviews, original_ids=None, user_ratings=None,
+                      segments=None, summary=None):
     """
     Aggregates LLM review analysis into overall metrics.
+    `user_ratings` and the `segments` columns ({name: values}) are aligned
+    with `original_ids`; with them the result also carries the user-vs-AI
+    rating gap and per-segment metrics (see `aggregate_by_segment`).
+    `summary` (a StreamingAggregator summary over the same results, e.g.
+    from a ResultStore) supplies the headline numbers instead of a pass
+    over the table.
     """
 
     if not analysis_results:
@@ -14,18 +26,43 @@ def aggregate_results(analysis_results, original_reviews, original_ids=None):
         )
 
     df = pd.DataFrame(analysis_results)
-    df["sentiment_category"] = df["sentiment"].apply(categorize_sentiment)
+    df["sentiment_category"] = categorize_sentiments(df["sentiment"].to_numpy(dtype=float))
 
 
     # Attach the original review text by matching IDs when possible.
     # `original_ids` is expected to be the list of ids aligned with `original_reviews`.
     if original_ids is not None and len(original_ids) == len(original_reviews):
-        id_to_text = {i: t for i, t in zip(original_ids, original_reviews)}
-        df["review_text"] = df["id"].map(id_to_text)
+        positions = _positions(df["id"], original_ids)
+        df["review_text"] = _take(original_reviews, positions)
+        if user_ratings is not None:
+            df["user_rating"] = _take(np.asarray(user_ratings, dtype=float), positions)
+        for name, values in (segments or {}).items():
+            df[name] = _take(values, positions)
     else:
         # Fallback: use first N reviews (preserves previous behavior)
         df["review_text"] = original_reviews[:len(df)]
 
+    if summary is not None:
+        # Running aggregates replace a pass over the table; min/max are only
+        # bounds after removals, so they still come from the ratings
+        headline = {key: summary[key] for key in HEADLINE_KEYS}
+        headline["rating_stats"] = {
+            **summary["rating_stats"],
+            "min": float(df["ai_rating"].min()),
+            "max": float(df["ai_rating"].max())
+        }
+    else:
+        headline = _headline_stats(df)
+
+    return {
+        **headline,
+        "user_rating_stats": user_rating_stats(df) if "user_rating" in df.columns else None,
+        "segment_stats": aggregate_by_segment(df, list(segments)) if segments else None,
+        "ratings_dataframe": df
+    }
+
+
+def _headline_stats(df):
     # Basic overall average rating
     overall_ai_rating = df["ai_rating"].mean()
 
@@ -42,16 +79,173 @@ def aggregate_results(analysis_results, original_reviews, original_ids=None):
 
     # Additional statistics
     sentiment_stats = {
-        "mean_sentiment": round(df["sentiment"].mean()),
-        "std_sentiment": round(df["sentiment"].std())
+        "mean_sentiment": round(df["sentiment"].mean(), 3),
+        "std_sentiment": round(df["sentiment"].std(), 3)
+    }
+
+    # Same shape as StreamingAggregator.summary, so reports can reuse them
+    rating_stats = {
+        "count": int(len(df)),
+        "std": float(df["ai_rating"].std()),
+        "min": float(df["ai_rating"].min()),
+        "max": float(df["ai_rating"].max())
+    }
+    category_counts = df["sentiment_category"].value_counts()
+    sentiment_counts = {
+        category: int(category_counts.get(category, 0)) for category in SENTIMENT_CATEGORIES
     }
 
     return {
-        "overall_ai_rating": round(overall_ai_rating),
-        "weighted_rating": round(weighted_rating),
+        "overall_ai_rating": round(overall_ai_rating, 2),
+        "weighted_rating": round(weighted_rating, 2),
         "sentiment_stats": sentiment_stats,
-        "ratings_dataframe": df
+        "rating_stats": rating_stats,
+        "sentiment_counts": sentiment_counts
+    }
+
+
+def _positions(result_ids, original_ids):
+    # Row of each result in the original input, -1 when missing
+    index = pd.Index(original_ids)
+    if index.is_unique:
+        return index.get_indexer(result_ids)
+    # Duplicate IDs: the last occurrence wins, as with a dict lookup
+    last = {review_id: pos for pos, review_id in enumerate(original_ids)}
+    return np.array([last.get(review_id, -1) for review_id in result_ids], dtype=np.int64)
+
+
+def _take(values, positions):
+    values = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+    taken = values[positions] if len(values) else np.empty(len(positions), dtype=values.dtype)
+    if (positions < 0).any():
+        taken = pd.Series(taken).where(positions >= 0).to_numpy()
+    return taken
+
+
+def user_rating_stats(df):
+    """
+    How the AI ratings compare with the user-supplied ones, over the rows
+    that have a user rating. Gap is AI minus user.
+    """
+    user = df["user_rating"].to_numpy(dtype=float)
+    rated = ~np.isnan(user)
+    if not rated.any():
+        return None
+
+    ai = df["ai_rating"].to_numpy(dtype=float)[rated]
+    gap = ai - user[rated]
+    return {
+        "count": int(rated.sum()),
+        "mean_user_rating": round(float(user[rated].mean()), 3),
+        "mean_ai_rating": round(float(ai.mean()), 3),
+        "mean_gap": round(float(gap.mean()), 3),
+        "mean_abs_gap": round(float(np.abs(gap).mean()), 3)
     }
+
+
+def aggregate_by_segment(df, by):
+    """
+    Per-segment metrics for one or more segment columns in a single
+    vectorized pass: rows are numbered by group once, then every statistic
+    is a weighted `np.bincount` over those numbers, so cost stays linear in
+    rows however many groups there are.
+    Returns one row per segment with review count, mean and
+    sentiment-weighted AI rating, mean sentiment, the count per sentiment
+    category and, when `user_rating` is present, the user-vs-AI gap.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = df.groupby(by, observed=True, sort=True, dropna=False)
+    groups = grouped.ngroup().to_numpy()
+    n_groups = grouped.ngroups
+
+    def per_group(weights=None, mask=None):
+        g = groups if mask is None else groups[mask]
+        return np.bincount(g, weights=weights, minlength=n_groups)
+
+    rating = df["ai_rating"].to_numpy(dtype=float)
+    sentiment = df["sentiment"].to_numpy(dtype=float)
+    weight = np.abs(sentiment)
+
+    count = per_group()
+    rating_mean = per_group(rating) / count
+    weight_sum = per_group(weight)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weighted = np.where(weight_sum > 0, per_group(rating * weight) / weight_sum, rating_mean)
+
+    segments = grouped.size().index.to_frame(index=False)
+    segments["reviews"] = count
+    segments["mean_ai_rating"] = rating_mean
+    segments["weighted_rating"] = weighted
+    segments["mean_sentiment"] = per_group(sentiment) / count
+
+    codes = pd.Categorical(df["sentiment_category"], categories=SENTIMENT_CATEGORIES).codes
+    category_counts = np.bincount(
+        groups * len(SENTIMENT_CATEGORIES) + codes,
+        minlength=n_groups * len(SENTIMENT_CATEGORIES)
+    ).reshape(n_groups, len(SENTIMENT_CATEGORIES))
+    for i, category in enumerate(SENTIMENT_CATEGORIES):
+        segments[category] = category_counts[:, i]
+
+    if "user_rating" in df.columns:
+        user = df["user_rating"].to_numpy(dtype=float)
+        rated = ~np.isnan(user)
+        gap = rating[rated] - user[rated]
+        rated_count = per_group(mask=rated)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            segments["user_rated"] = rated_count
+            segments["mean_user_rating"] = per_group(user[rated], rated) / rated_count
+            segments["mean_rating_gap"] = per_group(gap, rated) / rated_count
+            segments["mean_abs_rating_gap"] = per_group(np.abs(gap), rated) / rated_count
+
+    return segments
+
+
+def parse_segments(spec):
+    """
+    Segment spec ("Product,Name,Date:M" or a list of such entries) as
+    (column, period) pairs. A period (pandas alias: D, W, M, Q, Y) buckets
+    a date column.
+    """
+    if not spec:
+        return []
+    entries = spec.split(",") if isinstance(spec, str) else spec
+
+    parsed = []
+    for entry in entries:
+        column, _, period = entry.strip().partition(":")
+        if column:
+            parsed.append((column, period or None))
+    return parsed
+
+
+def build_segments(columns, specs):
+    """
+    Segment arrays ({column: values}) from raw loaded columns, with date
+    columns bucketed into periods.
+    """
+    segments = {}
+    for column, period in specs:
+        values = columns[column]
+        if period:
+            values = pd.to_datetime(pd.Series(values), errors="coerce").dt.to_period(period).astype(str).to_numpy()
+        segments[column] = values
+    return segments
+
+
+def categorize_sentiments(values):
+    """
+    Array version of `categorize_sentiment`: bins every score at once and
+    returns an ordered Categorical over SENTIMENT_CATEGORIES.
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.select(
+        [values <= -0.6, values < -0.2, values <= 0.2, values < 0.6],
+        [0, 1, 2, 3],
+        default=4
+    )
+    return pd.Categorical.from_codes(codes, categories=SENTIMENT_CATEGORIES, ordered=True)
+
+
 def categorize_sentiment(score: float) -> str:
     if score <= -0.6:
         return "Strong Negative"
@@ -63,3 +257,140 @@ def categorize_sentiment(score: float) -> str:
         return "Positive"
     else:
         return "Strong Positive"
+
+
+SENTIMENT_CATEGORIES = ["Strong Negative", "Negative", "Neutral", "Positive", "Strong Positive"]
+
+
+class RunningStats:
+    """
+    Welford running mean/variance. Values can be added and removed.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def remove(self, value):
+        # min/max cannot be maintained under removal and are left as upper/lower bounds
+        if self.count <= 1:
+            self.__init__()
+            return
+        delta = value - self.mean
+        self.mean = (self.mean * self.count - value) / (self.count - 1)
+        self.count -= 1
+        self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+    def state(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        stats.__dict__.update(state)
+        return stats
+
+    @property
+    def variance(self):
+        # Sample variance (ddof=1), matching pandas' Series.std
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+
+class StreamingAggregator:
+    """
+    Incremental counterpart of `aggregate_results` with O(1) memory.
+    """
+
+    def __init__(self):
+        self.rating = RunningStats()
+        self.sentiment = RunningStats()
+        self.weight_sum = 0.0
+        self.weighted_rating_sum = 0.0
+        self.category_counts = dict.fromkeys(SENTIMENT_CATEGORIES, 0)
+
+    def add(self, result):
+        ai_rating = result["ai_rating"]
+        sentiment = result["sentiment"]
+
+        self.rating.add(ai_rating)
+        self.sentiment.add(sentiment)
+        self.weight_sum += abs(sentiment)
+        self.weighted_rating_sum += ai_rating * abs(sentiment)
+        self.category_counts[categorize_sentiment(sentiment)] += 1
+
+    def remove(self, result):
+        ai_rating = result["ai_rating"]
+        sentiment = result["sentiment"]
+
+        self.rating.remove(ai_rating)
+        self.sentiment.remove(sentiment)
+        self.weight_sum -= abs(sentiment)
+        self.weighted_rating_sum -= ai_rating * abs(sentiment)
+        self.category_counts[categorize_sentiment(sentiment)] -= 1
+
+    def state(self):
+        return {
+            "rating": self.rating.state(),
+            "sentiment": self.sentiment.state(),
+            "weight_sum": self.weight_sum,
+            "weighted_rating_sum": self.weighted_rating_sum,
+            "category_counts": dict(self.category_counts)
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        aggregator = cls()
+        aggregator.rating = RunningStats.from_state(state["rating"])
+        aggregator.sentiment = RunningStats.from_state(state["sentiment"])
+        aggregator.weight_sum = state["weight_sum"]
+        aggregator.weighted_rating_sum = state["weighted_rating_sum"]
+        aggregator.category_counts.update(state["category_counts"])
+        return aggregator
+
+    def summary(self):
+        if self.rating.count == 0:
+            raise ValueError(
+                "No reviews were successfully analyzed by the LLM. "
+                "This could indicate: API connectivity issues, LLM failures, "
+                "or malformed review data. Check the logs above for details."
+            )
+
+        overall_ai_rating = self.rating.mean
+
+        if self.weight_sum == 0:
+            weighted_rating = overall_ai_rating
+        else:
+            weighted_rating = self.weighted_rating_sum / self.weight_sum
+
+        std_sentiment = self.sentiment.std
+
+        return {
+            "overall_ai_rating": round(overall_ai_rating, 2),
+            "weighted_rating": round(weighted_rating, 2),
+            "sentiment_stats": {
+                "mean_sentiment": round(self.sentiment.mean, 3),
+                "std_sentiment": round(std_sentiment, 3) if std_sentiment == std_sentiment else std_sentiment
+            },
+            "rating_stats": {
+                "count": self.rating.count,
+                "std": self.rating.std,
+                "min": self.rating.min,
+                "max": self.rating.max
+            },
+            "sentiment_counts": dict(self.category_counts)
+        }
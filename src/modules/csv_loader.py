@@ -1,10 +1,25 @@
-# CSV loader node
+# Review loader node: CSV, Parquet, Arrow IPC and JSONL inputs
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
-from src.config.settings import CSV_COLUMNS
+from src.config.settings import CSV_COLUMNS, STREAMING_CHUNK_SIZE
 
 
-def load_csv(file_path):
+INPUT_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+def resolve_path(file_path):
     # Try the provided path first, then resolve relative to project root if not found
     path = Path(file_path)
     if not path.exists():
@@ -13,14 +28,194 @@ def load_csv(file_path):
         alt_path = project_root / file_path
         if alt_path.exists():
             path = alt_path
+    return path
+
+
+def input_format(path):
+    """
+    Input format from the file extension (CSV when unknown).
+    """
+    return INPUT_FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def load_reviews(file_path, extra_columns=()):
+    """
+    Reads the id, review and (optional) rating columns of a CSV, Parquet,
+    Arrow IPC (memory-mapped) or JSONL file, chosen by extension. Only the
+    needed columns are read and they come back as NumPy arrays, not lists.
+    `extra_columns` (e.g. segment columns) are returned under `columns`.
+    """
+    path = resolve_path(file_path)
+    columns = _select_columns(_schema_names(path), extra_columns, path)
+
+    fmt = input_format(path)
+    if fmt == "csv":
+        import pyarrow.csv as pacsv
+        table = pacsv.read_csv(path, convert_options=_csv_convert_options(columns))
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    elif fmt == "ipc":
+        table = _read_ipc(path).select(columns)
+    else:
+        import pyarrow.json as pajson
+        table = pajson.read_json(path).select(columns)
+
+    return _review_arrays(table, extra_columns)
+
+
+# Kept for existing callers; reads every supported format
+load_csv = load_reviews
+
+
+def iter_review_chunks(file_path, chunk_size=STREAMING_CHUNK_SIZE):
+    """
+    Yields the input in chunks of at most `chunk_size` rows, each shaped like
+    `load_reviews` output. Only the id, review and (if present) rating
+    columns are read, and no format is fully loaded except Arrow IPC, which
+    is memory-mapped.
+    """
+    path = resolve_path(file_path)
+    columns = _select_columns(_schema_names(path), (), path)
+
+    fmt = input_format(path)
+    if fmt == "csv":
+        import pyarrow.csv as pacsv
+        batches = pacsv.open_csv(path, convert_options=_csv_convert_options(columns))
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns)
+    elif fmt == "ipc":
+        batches = _read_ipc(path).select(columns).to_batches(max_chunksize=chunk_size)
+    else:
+        import pyarrow.json as pajson
+        if hasattr(pajson, "open_json"):
+            batches = (batch.select(columns) for batch in pajson.open_json(path))
+        else:
+            batches = pajson.read_json(path).select(columns).to_batches(max_chunksize=chunk_size)
+
+    for chunk in _rebatch(batches, chunk_size):
+        yield _review_arrays(chunk, ())
+
+
+iter_csv_chunks = iter_review_chunks
+
+
+def _schema_names(path):
+    fmt = input_format(path)
+    if fmt == "csv":
+        import pyarrow.csv as pacsv
+        # Only the first block is parsed to get the header
+        return pacsv.open_csv(path).schema.names
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    if fmt == "ipc":
+        return _read_ipc(path).schema.names
+
+    import pyarrow.json as pajson
+    if hasattr(pajson, "open_json"):
+        return pajson.open_json(path).schema.names
+    return pajson.read_json(path).schema.names
 
-    df = pd.read_csv(path)
 
-    ids = df[CSV_COLUMNS["id"]].tolist()
-    reviews = df[CSV_COLUMNS["review"]].astype(str).tolist()
+def _select_columns(names, extra_columns, path):
+    required = [CSV_COLUMNS["id"], CSV_COLUMNS["review"], *extra_columns]
+    missing = [column for column in required if column not in names]
+    if missing:
+        raise ValueError(f"Columns not found in {path.name}: {', '.join(missing)}")
+
+    columns = list(dict.fromkeys(required))
+    if CSV_COLUMNS["rating"] in names and CSV_COLUMNS["rating"] not in columns:
+        columns.append(CSV_COLUMNS["rating"])
+    return columns
+
+
+def _csv_convert_options(columns):
+    import pyarrow.csv as pacsv
+
+    # Types are fixed from the first block, so the id, review and rating
+    # columns get explicit types instead of inferred ones. IDs and ratings
+    # are read as text: a later "X-0" ID or "4 stars" rating cannot fail the
+    # load (see `_review_ids` and `_user_ratings`)
+    return pacsv.ConvertOptions(
+        include_columns=columns,
+        column_types={
+            CSV_COLUMNS["id"]: pa.string(),
+            CSV_COLUMNS["review"]: pa.string(),
+            CSV_COLUMNS["rating"]: pa.string()
+        }
+    )
+
+
+def _read_ipc(path):
+    # Memory-mapped, so column buffers are read straight from the page cache
+    source = pa.memory_map(str(path), "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def _rebatch(batches, chunk_size):
+    # Regroups record batches of any size into tables of exactly `chunk_size` rows
+    pending = []
+    pending_rows = 0
+
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows < chunk_size:
+            continue
+
+        table = pa.Table.from_batches(pending)
+        offset = 0
+        while pending_rows - offset >= chunk_size:
+            yield table.slice(offset, chunk_size)
+            offset += chunk_size
+        pending = table.slice(offset).to_batches()
+        pending_rows -= offset
+
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _review_arrays(table, extra_columns):
+    reviews = table.column(CSV_COLUMNS["review"])
+    if not pa.types.is_string(reviews.type) and not pa.types.is_large_string(reviews.type):
+        reviews = pc.cast(reviews, pa.string())
+    reviews = pc.fill_null(reviews, "").to_numpy(zero_copy_only=False)
 
     return {
         "reviews": reviews,
-        "ids": ids,
-        "total_reviews": len(reviews)
+        "ids": _review_ids(table),
+        "ratings": _user_ratings(table),
+        "columns": {column: table.column(column).to_numpy(zero_copy_only=False) for column in extra_columns},
+        "total_reviews": table.num_rows
     }
+
+
+def _review_ids(table):
+    # IDs read as text stay integers when every one of them is
+    ids = table.column(CSV_COLUMNS["id"])
+    if pa.types.is_string(ids.type) or pa.types.is_large_string(ids.type):
+        try:
+            ids = pc.cast(ids, pa.int64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return ids.to_numpy(zero_copy_only=False)
+
+
+def _user_ratings(table):
+    # The user-supplied rating is optional; ratings stored as text are
+    # parsed, with unparseable values as NaN
+    if CSV_COLUMNS["rating"] not in table.column_names:
+        return None
+
+    ratings = table.column(CSV_COLUMNS["rating"])
+    try:
+        # Numeric columns and clean numeric text cast directly
+        return pc.cast(ratings, pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pd.to_numeric(ratings.to_pandas(), errors="coerce").to_numpy(dtype=np.float64)
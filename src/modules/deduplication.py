@@ -0,0 +1,158 @@
+# Review deduplication node
+import re
+import hashlib
+import unicodedata
+from src.config.settings import DEDUP_NEAR_ENABLED, DEDUP_NEAR_THRESHOLD
+
+
+SIMHASH_BITS = 64
+
+# Negation words, after normalization ("don't" becomes "don t"). SimHash
+# barely moves for one added "not", so near-duplicates must share them.
+NEGATIONS = {
+    "not", "no", "never", "without", "nothing", "neither", "nor", "cannot", "hardly", "t",
+    "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent", "wont", "cant", "couldnt",
+    "shouldnt", "wouldnt", "havent", "hasnt",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Canonical form used for duplicate matching: NFKC, lowercase,
+    punctuation stripped, whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def simhash(normalized):
+    """
+    64-bit SimHash over word features. Short reviews make word n-grams
+    too sparse, so single words give the most stable fingerprints.
+    """
+    weights = [0] * SIMHASH_BITS
+
+    for feature in normalized.split():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _band_slices(max_distance):
+    # Pigeonhole: two fingerprints within `max_distance` bits agree
+    # exactly on at least one of `max_distance + 1` bands.
+    bands = max_distance + 1
+    width, extra = divmod(SIMHASH_BITS, bands)
+    slices = []
+    start = 0
+    for band in range(bands):
+        size = width + (1 if band < extra else 0)
+        slices.append((start, (1 << size) - 1))
+        start += size
+    return slices
+
+
+def deduplicate_reviews(reviews, ids, near_duplicates=None, threshold=None):
+    """
+    Groups exact duplicates (hash of normalized text) and, optionally,
+    near-duplicates (SimHash similarity >= threshold and the same negation
+    words). Only one representative per group needs LLM analysis;
+    `expand_results` fans results back out.
+    """
+
+    if near_duplicates is None:
+        near_duplicates = DEDUP_NEAR_ENABLED
+    if threshold is None:
+        threshold = DEDUP_NEAR_THRESHOLD
+
+    max_distance = int(round((1.0 - threshold) * SIMHASH_BITS))
+    slices = _band_slices(max_distance)
+
+    exact_index = {}
+    band_buckets = {}
+    fingerprints = []
+    negations = []
+    members = []
+    exact_duplicates = 0
+    near_duplicate_count = 0
+
+    for pos, review_text in enumerate(reviews):
+        normalized = normalize_text(review_text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+        group = exact_index.get(digest)
+        if group is not None:
+            members[group].append(pos)
+            exact_duplicates += 1
+            continue
+
+        fingerprint = simhash(normalized) if near_duplicates and normalized else None
+        negated = NEGATIONS.intersection(normalized.split()) if fingerprint is not None else None
+
+        if fingerprint is not None:
+            for band, (shift, mask) in enumerate(slices):
+                for candidate in band_buckets.get((band, (fingerprint >> shift) & mask), ()):
+                    if (negations[candidate] == negated
+                            and bin(fingerprint ^ fingerprints[candidate]).count("1") <= max_distance):
+                        group = candidate
+                        break
+                if group is not None:
+                    break
+
+        if group is not None:
+            members[group].append(pos)
+            exact_index[digest] = group
+            near_duplicate_count += 1
+            continue
+
+        group = len(members)
+        members.append([pos])
+        fingerprints.append(fingerprint)
+        negations.append(negated)
+        exact_index[digest] = group
+
+        if fingerprint is not None:
+            for band, (shift, mask) in enumerate(slices):
+                band_buckets.setdefault((band, (fingerprint >> shift) & mask), []).append(group)
+
+    return {
+        "reviews": [reviews[group[0]] for group in members],
+        "ids": [ids[group[0]] for group in members],
+        "members": members,
+        "total_reviews": len(reviews),
+        "unique_reviews": len(members),
+        "exact_duplicates": exact_duplicates,
+        "near_duplicates": near_duplicate_count
+    }
+
+
+def expand_results(analysis_results, dedup, original_ids):
+    """
+    Copies each representative's analysis to every review in its group,
+    returning one result per original review in input order.
+    """
+
+    by_representative = {}
+    for result in analysis_results:
+        by_representative.setdefault(result["id"], result)
+
+    expanded = []
+    for representative_id, group in zip(dedup["ids"], dedup["members"]):
+        result = by_representative.get(representative_id)
+        if result is None:
+            continue
+        for pos in group:
+            expanded.append((pos, {**result, "id": original_ids[pos]}))
+
+    expanded.sort(key=lambda item: item[0])
+    return [result for _, result in expanded]
@@ -1,35 +1,178 @@
-def analyze_impact(df):
+import heapq
+import numpy as np
+from src.config.settings import IMPACT_TOP_K
+from src.utils.result_table import RecordView, example_table
+
+
+def analyze_impact(df, k=None):
     """
     Calculates how much each review affects the overall rating.
+    Leave-one-out deltas are computed in closed form for every review at once:
+      mean:     |x_i - mean| / (n - 1)
+      weighted: |R/W - (R - w_i x_i) / (W - w_i)|, with w = |sentiment|
+    Lists are lazy RecordViews over `df` carrying the impact scores.
     """
 
-    base_rating = df["ai_rating"].mean()
+    if k is None:
+        k = IMPACT_TOP_K
 
-    impacts = []
+    ratings = df["ai_rating"].to_numpy(dtype=float)
+    weights = np.abs(df["sentiment"].to_numpy(dtype=float))
+    n = len(ratings)
 
-    for i in range(len(df)):
-        temp_df = df.drop(df.index[i])
+    if n == 0:
+        return {"most_influential_reviews": RecordView(df, []), "most_influential_weighted_reviews": RecordView(df, [])}
 
-        new_rating = temp_df["ai_rating"].mean()
+    total = ratings.sum()
+    base_rating = total / n
 
-        impact_value = abs(base_rating - new_rating)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loo_mean = (total - ratings) / (n - 1)
+        impact = np.abs(base_rating - loo_mean)
 
-        impacts.append({
-            "id": df.iloc[i]["id"],
-            "review_text": df.iloc[i]["review_text"],
-            "ai_rating": df.iloc[i]["ai_rating"],
-            "sentiment": df.iloc[i]["sentiment"],
-            "impact_score": round(impact_value, 5),
-            "reasoning": df.iloc[i]["reasoning"]
-        })
+        weight_sum = weights.sum()
+        weighted_sum = (ratings * weights).sum()
+        base_weighted = weighted_sum / weight_sum if weight_sum != 0 else base_rating
 
-    # Sort by highest impact
-    impacts_sorted = sorted(
-        impacts,
-        key=lambda x: x["impact_score"],
-        reverse=True
-    )
+        remaining_weight = weight_sum - weights
+        loo_weighted = np.where(
+            remaining_weight > 0,
+            (weighted_sum - ratings * weights) / remaining_weight,
+            loo_mean
+        )
+        weighted_impact = np.abs(base_weighted - loo_weighted)
 
     return {
-        "most_influential_reviews": impacts_sorted[:10]
+        "most_influential_reviews": _impact_records(
+            df, _top_k_indices(impact, k), impact, weighted_impact
+        ),
+        "most_influential_weighted_reviews": _impact_records(
+            df, _top_k_indices(weighted_impact, k), impact, weighted_impact
+        )
     }
+
+
+def _top_k_indices(scores, k):
+    """
+    Indices of the k highest scores, descending, ties in input order
+    (same order as a stable full sort) using a partial sort.
+    """
+
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.array([], dtype=int)
+
+    # NaN scores (single-review input) sort last
+    keyed = np.where(np.isnan(scores), -np.inf, scores)
+
+    if k < n:
+        threshold = np.partition(keyed, n - k)[n - k]
+        above = np.flatnonzero(keyed > threshold)
+        ties = np.flatnonzero(keyed == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -keyed[candidates]))
+    return candidates[order]
+
+
+def _impact_records(df, indices, impact, weighted_impact):
+    # Ranked on the exact scores (reviews whose rounded scores tie keep the
+    # order of their true impact); reported rounded
+    return RecordView(df, indices, {
+        "impact_score": np.round(impact[indices], 5),
+        "weighted_impact_score": np.round(weighted_impact[indices], 5)
+    })
+
+
+class StreamingImpactTracker:
+    """
+    Incremental counterpart of `analyze_impact`.
+    Removing review i shifts the mean by |x_i - mean| / (n - 1), so the most
+    influential reviews are always among the `k` lowest or `k` highest ratings.
+    Only those 2k candidates are kept, whatever the final mean turns out to be.
+    The weighted ranking has no such bound and is not tracked.
+    """
+
+    def __init__(self, k=None):
+        self.k = IMPACT_TOP_K if k is None else k
+        self.count = 0
+        self.rating_sum = 0.0
+        self.weight_sum = 0.0
+        self.weighted_sum = 0.0
+        self._lowest = []
+        self._highest = []
+
+    def add(self, result):
+        ai_rating = result["ai_rating"]
+        position = self.count
+        self.count += 1
+        self.rating_sum += ai_rating
+        self.weight_sum += abs(result["sentiment"])
+        self.weighted_sum += ai_rating * abs(result["sentiment"])
+
+        record = {
+            "id": result["id"],
+            "review_text": result.get("review_text"),
+            "ai_rating": ai_rating,
+            "sentiment": result["sentiment"],
+            "reasoning": result.get("reasoning")
+        }
+
+        # Ties keep the earliest review, like the stable sort in `analyze_impact`
+        for heap, entry in (
+            (self._lowest, (-ai_rating, -position, record)),
+            (self._highest, (ai_rating, -position, record)),
+        ):
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    def example_records(self):
+        """
+        Every retained candidate record, keyed by its position in the stream.
+        """
+        return {-entry[1]: entry[2] for entry in self._lowest + self._highest}
+
+    def finalize(self, table=None, positions=None):
+        """
+        `most_influential_reviews` as a RecordView over `table`, the example
+        table whose rows are the sorted stream `positions` (by default one
+        built from `example_records`).
+        """
+        if table is None:
+            table, positions = example_table(self.example_records())
+        if self.count == 0:
+            return {"most_influential_reviews": RecordView(table, [])}
+
+        candidates = sorted(self.example_records().items())
+        candidate_positions = np.array([position for position, _ in candidates], dtype=np.int64)
+        ratings = np.array([record["ai_rating"] for _, record in candidates], dtype=float)
+        weights = np.abs(np.array([record["sentiment"] for _, record in candidates], dtype=float))
+
+        # Same closed forms as `analyze_impact`, from the running sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            base_rating = self.rating_sum / self.count
+            loo_mean = (self.rating_sum - ratings) / (self.count - 1)
+            impact = np.abs(base_rating - loo_mean)
+
+            base_weighted = self.weighted_sum / self.weight_sum if self.weight_sum != 0 else base_rating
+            remaining_weight = self.weight_sum - weights
+            loo_weighted = np.where(
+                remaining_weight > 0,
+                (self.weighted_sum - ratings * weights) / remaining_weight,
+                loo_mean
+            )
+            weighted_impact = np.abs(base_weighted - loo_weighted)
+
+        top = _top_k_indices(impact, self.k)
+        rows = np.searchsorted(positions, candidate_positions[top])
+        return {
+            "most_influential_reviews": RecordView(table, rows, {
+                "impact_score": np.round(impact[top], 5),
+                "weighted_impact_score": np.round(weighted_impact[top], 5)
+            })
+        }
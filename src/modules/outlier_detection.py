@@ -1,116 +1,311 @@
-def detect_outliers(df):
+import heapq
+import numpy as np
+from src.config.settings import (
+    OUTLIER_METHOD,
+    OUTLIER_SIGMA_K,
+    OUTLIER_IQR_K,
+    OUTLIER_MAD_K,
+)
+
+
+OUTLIER_METHODS = ("percentile", "sigma", "iqr", "mad")
+
+
+def detect_outliers(df, method=None):
     """
-    Detect outliers using percentile-based extremes.
-    This guarantees only truly extreme ratings are flagged.
+    Flags outliers with every supported method in one vectorized pass over
+    the rating and sentiment arrays:
+      percentile - 5th/95th percentile extremes, widened by semantic bounds
+      sigma      - beyond mean +/- k standard deviations
+      iqr        - beyond Q1 - k*IQR / Q3 + k*IQR
+      mad        - modified z-score above k (median absolute deviation)
+    `method` selects which one is reported as `statistical_outliers`.
+    Results are positional index arrays into `df`; use `outlier_records`
+    to materialize rows when needed.
     """
 
-    # Percentile thresholds
-    low_cut = df["ai_rating"].quantile(0.05)
-    high_cut = df["ai_rating"].quantile(0.95)
+    if method is None:
+        method = OUTLIER_METHOD
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method '{method}'. Expected one of {OUTLIER_METHODS}")
 
-    # Semantic safety bounds
+    ratings = df["ai_rating"].to_numpy(dtype=float)
+    sentiments = df["sentiment"].to_numpy(dtype=float)
+
+    if len(ratings) == 0:
+        raise ValueError("Cannot detect outliers on an empty ratings table.")
+
+    # One sort serves every order statistic
+    p05, q1, median, q3, p95 = np.quantile(ratings, [0.05, 0.25, 0.5, 0.75, 0.95])
+    mean = ratings.mean()
+    std = ratings.std(ddof=1) if len(ratings) > 1 else 0.0
+    abs_deviation = np.abs(ratings - median)
+    mad = np.median(abs_deviation)
+
+    # Semantic safety (absolute bounds)
     semantic_low = 2.0
     semantic_high = 4.5
 
-    statistical_outliers = df[
-        (df["ai_rating"] <= max(low_cut, semantic_low)) |
-        (df["ai_rating"] >= min(high_cut, semantic_high))
-    ]
+    percentile_low = max(p05, semantic_low)
+    percentile_high = min(p95, semantic_high)
 
-    # Sentiment buckets
-    strong_negative = df[df["sentiment"] <= -0.7]
-    strong_positive = df[df["sentiment"] >= 0.7]
-    neutral_balanced = df[
-        (df["sentiment"] > -0.3) & (df["sentiment"] < 0.3)
-    ]
+    sigma_low = mean - OUTLIER_SIGMA_K * std
+    sigma_high = mean + OUTLIER_SIGMA_K * std
+
+    iqr = q3 - q1
+    iqr_low = q1 - OUTLIER_IQR_K * iqr
+    iqr_high = q3 + OUTLIER_IQR_K * iqr
+
+    flags = {
+        "percentile": (ratings <= percentile_low) | (ratings >= percentile_high),
+        "sigma": (ratings <= sigma_low) | (ratings >= sigma_high) if std > 0 else np.zeros(len(ratings), dtype=bool),
+        "iqr": (ratings < iqr_low) | (ratings > iqr_high),
+        "mad": (0.6745 * abs_deviation / mad > OUTLIER_MAD_K) if mad > 0 else np.zeros(len(ratings), dtype=bool),
+    }
+
+    indices = {
+        "statistical_outliers": np.flatnonzero(flags[method]),
+        "percentile_outliers": np.flatnonzero(flags["percentile"]),
+        "sigma_outliers": np.flatnonzero(flags["sigma"]),
+        "iqr_outliers": np.flatnonzero(flags["iqr"]),
+        "mad_outliers": np.flatnonzero(flags["mad"]),
+        # Sentiment buckets
+        "strong_negative": np.flatnonzero(sentiments <= -0.7),
+        "strong_positive": np.flatnonzero(sentiments >= 0.7),
+        "neutral_balanced": np.flatnonzero((sentiments > -0.3) & (sentiments < 0.3)),
+    }
 
     return {
+        "method": method,
+
         "percentile_bounds": {
-            "low_5_percentile": round(low_cut, 2),
-            "high_95_percentile": round(high_cut, 2),
+            "low_5_percentile": round(float(p05), 2),
+            "high_95_percentile": round(float(p95), 2),
+            "semantic_low": semantic_low,
+            "semantic_high": semantic_high
         },
 
-        "statistical_outliers": statistical_outliers[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        "bounds": {
+            "percentile": {"low": float(percentile_low), "high": float(percentile_high)},
+            "sigma": {"mean": float(mean), "std": float(std), "k": OUTLIER_SIGMA_K,
+                      "low": float(sigma_low), "high": float(sigma_high)},
+            "iqr": {"q1": float(q1), "q3": float(q3), "k": OUTLIER_IQR_K,
+                    "low": float(iqr_low), "high": float(iqr_high)},
+            "mad": {"median": float(median), "mad": float(mad), "k": OUTLIER_MAD_K},
+        },
 
-        "strong_negative_reviews": strong_negative[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        "indices": indices,
 
-        "strong_positive_reviews": strong_positive[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        "counts": {name: len(positions) for name, positions in indices.items()}
+    }
 
-        "neutral_reviews": neutral_balanced[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
 
-        "counts": {
-            "statistical_outliers": len(statistical_outliers),
-            "strong_negative": len(strong_negative),
-            "strong_positive": len(strong_positive),
-            "neutral_balanced": len(neutral_balanced)
-        }
-    }
-def detect_outliers(df):
+def outlier_records(df, outliers, name, columns=None):
     """
-    Detect outliers using percentile-based extremes.
-    This guarantees only truly extreme ratings are flagged.
+    Materializes the rows of one outlier group as records.
     """
+    if columns is None:
+        columns = ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
+    return df[columns].iloc[outliers["indices"][name]].to_dict("records")
 
-    # -------------------------------
-    # PERCENTILE THRESHOLDS
-    # -------------------------------
-    low_cut = df["ai_rating"].quantile(0.05)
-    high_cut = df["ai_rating"].quantile(0.95)
 
-    # Semantic safety (absolute bounds)
-    semantic_low = 2.0
-    semantic_high = 4.5
+RATING_MIN = 1.0
+RATING_MAX = 5.0
+RATING_RESOLUTION = 100  # ratings are rounded to 2 decimals by the analyzer
 
-    statistical_outliers = df[
-        (df["ai_rating"] <= max(low_cut, semantic_low)) |
-        (df["ai_rating"] >= min(high_cut, semantic_high))
-    ]
 
-    # -------------------------------
-    # SENTIMENT BUCKETS
-    # -------------------------------
-    strong_negative = df[df["sentiment"] <= -0.7]
-    strong_positive = df[df["sentiment"] >= 0.7]
-    neutral_balanced = df[
-        (df["sentiment"] > -0.3) & (df["sentiment"] < 0.3)
-    ]
+class StreamingOutlierDetector:
+    """
+    Incremental counterpart of `detect_outliers`.
+    Ratings are bounded and rounded to 0.01, so a fixed histogram gives exact
+    quantiles, mean and MAD in O(1) memory: bounds and counts match
+    `detect_outliers` for every method. Only a bounded number of example
+    records is kept, so `indices` refer to those examples (see `finalize`).
+    """
 
-    return {
-        "percentile_bounds": {
-            "low_5_percentile": round(low_cut, 2),
-            "high_95_percentile": round(high_cut, 2),
-            "semantic_low": semantic_low,
-            "semantic_high": semantic_high
-        },
+    def __init__(self, max_examples=50):
+        self.max_examples = max_examples
+        self.histogram = np.zeros(int((RATING_MAX - RATING_MIN) * RATING_RESOLUTION) + 1, dtype=np.int64)
+        self.count = 0
+        self.sentiment_counts = {"strong_negative": 0, "strong_positive": 0, "neutral_balanced": 0}
+        self.examples = {"strong_negative": [], "strong_positive": [], "neutral_balanced": []}
+        self._lowest = []
+        self._highest = []
+
+    def add(self, result):
+        ai_rating = result["ai_rating"]
+        sentiment = result["sentiment"]
+        position = self.count
 
-        "statistical_outliers": statistical_outliers[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        self.histogram[self._bin(ai_rating)] += 1
+        self.count += 1
 
-        "strong_negative_reviews": strong_negative[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        if sentiment <= -0.7:
+            bucket = "strong_negative"
+        elif sentiment >= 0.7:
+            bucket = "strong_positive"
+        elif -0.3 < sentiment < 0.3:
+            bucket = "neutral_balanced"
+        else:
+            bucket = None
 
-        "strong_positive_reviews": strong_positive[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        record = _example_record(result)
+        if bucket is not None:
+            self.sentiment_counts[bucket] += 1
+            if len(self.examples[bucket]) < self.max_examples:
+                self.examples[bucket].append((position, record))
 
-        "neutral_reviews": neutral_balanced[
-            ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
-        ].to_dict("records"),
+        # Extremes are the only candidates for rating outliers
+        entry = (-ai_rating, -position, record)
+        if len(self._lowest) < self.max_examples:
+            heapq.heappush(self._lowest, entry)
+        elif entry > self._lowest[0]:
+            heapq.heapreplace(self._lowest, entry)
 
-        "counts": {
-            "statistical_outliers": len(statistical_outliers),
-            "strong_negative": len(strong_negative),
-            "strong_positive": len(strong_positive),
-            "neutral_balanced": len(neutral_balanced)
+        entry = (ai_rating, -position, record)
+        if len(self._highest) < self.max_examples:
+            heapq.heappush(self._highest, entry)
+        elif entry > self._highest[0]:
+            heapq.heapreplace(self._highest, entry)
+
+    def quantile(self, q):
+        """
+        Exact linear-interpolated quantile, matching `Series.quantile`.
+        """
+        return _histogram_quantile(self._values(), self.histogram, q)
+
+    def example_records(self):
+        """
+        Every retained example record, keyed by its position in the stream.
+        """
+        records = {-entry[1]: entry[2] for entry in self._lowest + self._highest}
+        for examples in self.examples.values():
+            records.update(examples)
+        return records
+
+    def finalize(self, positions=None, method=None):
+        """
+        Outliers in the `detect_outliers` shape. Bounds and counts cover every
+        review; `indices` list only the retained examples, as rows of the
+        table built from `positions` (sorted stream positions, by default
+        those of `example_records`).
+        """
+        if method is None:
+            method = OUTLIER_METHOD
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Unknown outlier method '{method}'. Expected one of {OUTLIER_METHODS}")
+        if self.count == 0:
+            raise ValueError("Cannot detect outliers on an empty ratings table.")
+        if positions is None:
+            positions = np.array(sorted(self.example_records()), dtype=np.int64)
+
+        values = self._values()
+        counts = self.histogram
+
+        p05, q1, median, q3, p95 = (_histogram_quantile(values, counts, q) for q in (0.05, 0.25, 0.5, 0.75, 0.95))
+        mean = float((values * counts).sum() / self.count)
+        std = float(np.sqrt((counts * (values - mean) ** 2).sum() / (self.count - 1))) if self.count > 1 else 0.0
+        mad = _histogram_quantile(np.abs(values - median), counts, 0.5)
+
+        semantic_low = 2.0
+        semantic_high = 4.5
+
+        percentile_low = max(p05, semantic_low)
+        percentile_high = min(p95, semantic_high)
+
+        sigma_low = mean - OUTLIER_SIGMA_K * std
+        sigma_high = mean + OUTLIER_SIGMA_K * std
+
+        iqr = q3 - q1
+        iqr_low = q1 - OUTLIER_IQR_K * iqr
+        iqr_high = q3 + OUTLIER_IQR_K * iqr
+
+        def flags(ratings):
+            ratings = np.asarray(ratings, dtype=float)
+            none = np.zeros(len(ratings), dtype=bool)
+            return {
+                "percentile": (ratings <= percentile_low) | (ratings >= percentile_high),
+                "sigma": (ratings <= sigma_low) | (ratings >= sigma_high) if std > 0 else none,
+                "iqr": (ratings < iqr_low) | (ratings > iqr_high),
+                "mad": (0.6745 * np.abs(ratings - median) / mad > OUTLIER_MAD_K) if mad > 0 else none,
+            }
+
+        # Counts over every review come from the histogram bins, examples
+        # from the retained extremes
+        bin_flags = flags(values)
+        candidates = sorted({-entry[1]: entry[2]["ai_rating"] for entry in self._lowest + self._highest}.items())
+        candidate_positions = np.array([position for position, _ in candidates], dtype=np.int64)
+        candidate_flags = flags([rating for _, rating in candidates])
+
+        def rows(stream_positions):
+            return np.searchsorted(positions, np.asarray(stream_positions, dtype=np.int64))
+
+        indices = {
+            f"{name}_outliers": rows(candidate_positions[candidate_flags[name]])
+            for name in OUTLIER_METHODS
+        }
+        indices = {"statistical_outliers": indices[f"{method}_outliers"], **indices}
+        for bucket, examples in self.examples.items():
+            indices[bucket] = rows([position for position, _ in examples])
+
+        outlier_counts = {f"{name}_outliers": int(counts[bin_flags[name]].sum()) for name in OUTLIER_METHODS}
+
+        return {
+            "method": method,
+
+            "percentile_bounds": {
+                "low_5_percentile": round(float(p05), 2),
+                "high_95_percentile": round(float(p95), 2),
+                "semantic_low": semantic_low,
+                "semantic_high": semantic_high
+            },
+
+            "bounds": {
+                "percentile": {"low": float(percentile_low), "high": float(percentile_high)},
+                "sigma": {"mean": mean, "std": std, "k": OUTLIER_SIGMA_K,
+                          "low": float(sigma_low), "high": float(sigma_high)},
+                "iqr": {"q1": float(q1), "q3": float(q3), "k": OUTLIER_IQR_K,
+                        "low": float(iqr_low), "high": float(iqr_high)},
+                "mad": {"median": float(median), "mad": float(mad), "k": OUTLIER_MAD_K},
+            },
+
+            "indices": indices,
+
+            "counts": {
+                "statistical_outliers": outlier_counts[f"{method}_outliers"],
+                **outlier_counts,
+                **self.sentiment_counts
+            }
         }
-    }
\ No newline at end of file
+
+    def _bin(self, value):
+        value = max(RATING_MIN, min(RATING_MAX, value))
+        return int(round((value - RATING_MIN) * RATING_RESOLUTION))
+
+    def _values(self):
+        return RATING_MIN + np.arange(len(self.histogram)) / RATING_RESOLUTION
+
+
+def _histogram_quantile(values, counts, q):
+    """
+    Linear-interpolated quantile (as `np.quantile`) of `values` repeated
+    `counts` times, without expanding them.
+    """
+    total = counts.sum()
+    if total == 0:
+        return float("nan")
+
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    cumulative = np.cumsum(counts[order])
+
+    position = (total - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, total - 1)
+    low_value = sorted_values[np.searchsorted(cumulative, lower, side="right")]
+    high_value = sorted_values[np.searchsorted(cumulative, upper, side="right")]
+    return float(low_value + (high_value - low_value) * (position - lower))
+
+
+def _example_record(result):
+    return {key: result.get(key) for key in ("id", "review_text", "ai_rating", "sentiment", "reasoning")}
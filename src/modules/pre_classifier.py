@@ -0,0 +1,256 @@
+# Offline pre-classifier node: lexicon sentiment + the dataset's own rating
+import re
+import math
+import zlib
+from src.modules.deduplication import normalize_text, NEGATIONS
+from src.modules.review_analyzer import sanitize_result
+from src.modules.aggregation import categorize_sentiment
+from src.config.settings import PRECLASSIFY_CONFIDENCE, PRECLASSIFY_AUDIT_RATE
+
+
+# Word polarity on a -3..3 scale
+LEXICON = {
+    # positive
+    "phenomenal": 3, "outstanding": 3, "exceptional": 3, "excellent": 3, "amazing": 3,
+    "fantastic": 3, "superb": 3, "flawless": 3, "brilliant": 3, "perfect": 3,
+    "love": 3, "loved": 3, "incredible": 3, "exceeded": 2.5, "blown": 2,
+    "great": 2, "impressive": 2, "impressed": 2, "elegant": 2, "seamless": 2,
+    "delighted": 2.5, "wonderful": 2.5, "intuitive": 2, "reliable": 2, "efficient": 2,
+    "recommend": 2, "recommended": 2, "happy": 2, "pleased": 2, "enjoy": 2, "enjoyed": 2,
+    "smooth": 1.5, "fast": 1.5, "quick": 1, "quickly": 1, "helpful": 1.5, "responsive": 1.5,
+    "good": 1.5, "nice": 1.5, "solid": 1.5, "easy": 1.5, "improved": 1.5, "appreciated": 1.5,
+    "friendly": 1.5, "clean": 1, "stable": 1.5, "valuable": 1.5, "useful": 1.5, "best": 2.5,
+    "satisfied": 1.5, "decent": 0.5, "fine": 0.5, "okay": 0.3, "ok": 0.3,
+    # negative
+    "terrible": -3, "horrible": -3, "awful": -3, "worst": -3, "useless": -3, "unusable": -3,
+    "hate": -3, "disaster": -3, "broken": -2.5, "damaged": -2.5, "crash": -2.5,
+    "crashes": -2.5, "crashed": -2.5, "scam": -3, "refund": -1.5, "disappointing": -2.5,
+    "disappointed": -2.5, "frustrating": -2.5, "frustrated": -2.5, "poor": -2, "bad": -2,
+    "ignored": -2, "erased": -2, "lost": -1.5, "failed": -2, "fails": -2, "failure": -2,
+    "error": -1.5, "errors": -1.5, "bug": -1.5, "bugs": -1.5, "buggy": -2, "glitch": -1.5,
+    "slow": -1.5, "laggy": -2, "confusing": -1.5, "unintuitive": -2, "outdated": -1.5,
+    "clunky": -1.5, "annoying": -2, "complex": -0.5, "complicated": -1, "lacks": -1,
+    "lacked": -1, "lacking": -1, "missing": -1, "expensive": -1, "overpriced": -2,
+    "unreliable": -2, "unresponsive": -2, "rude": -2.5, "waste": -2.5, "problem": -1,
+    "problems": -1, "issue": -1, "issues": -1, "difficult": -1.5, "delay": -1, "delays": -1,
+    "delayed": -1, "worse": -2, "unhelpful": -2, "mediocre": -1.5, "boring": -1.5,
+}
+
+INTENSIFIERS = {
+    "very": 1.3, "really": 1.3, "so": 1.3, "highly": 1.4, "extremely": 1.5, "absolutely": 1.5,
+    "completely": 1.5, "totally": 1.5, "incredibly": 1.5, "truly": 1.3, "super": 1.3,
+    "slightly": 0.6, "somewhat": 0.7, "bit": 0.7,
+}
+
+# Words that shift the weight to the clause that follows them
+CONTRAST_WORDS = {"but", "however", "yet"}
+# Words that mark a mixed review without a clear main clause
+HEDGE_WORDS = CONTRAST_WORDS | {"although", "though", "despite", "while", "except", "whereas"}
+
+NEGATION_WINDOW = 3
+RATING_SCALE = 5.0
+
+_SENTENCE_END = re.compile(r"[.!?;]+")
+
+
+def lexicon_sentiment(text):
+    """
+    Rule-based sentiment of one review: (score in -1..1, raw polarity sum,
+    polarity words matched, mixed). Negations flip the next few words of
+    their sentence, intensifiers scale the next one, and after
+    "but"/"however" the later clause dominates.
+    """
+    tokens = []
+    sentence_starts = set()
+    for sentence in _SENTENCE_END.split(str(text)):
+        sentence_starts.add(len(tokens))
+        tokens.extend(normalize_text(sentence).split())
+
+    contrast_at = max((i for i, token in enumerate(tokens) if token in CONTRAST_WORDS), default=None)
+    mixed = any(token in HEDGE_WORDS for token in tokens)
+
+    total = 0.0
+    hits = 0
+    negate_until = -1
+    boost = 1.0
+
+    for i, token in enumerate(tokens):
+        if i in sentence_starts:
+            # Negations do not carry over into the next sentence
+            negate_until = -1
+        if token in NEGATIONS:
+            negate_until = i + NEGATION_WINDOW
+            continue
+        if token in INTENSIFIERS:
+            boost = INTENSIFIERS[token]
+            continue
+
+        weight = LEXICON.get(token)
+        if weight is None:
+            continue
+
+        weight *= boost
+        if i <= negate_until:
+            weight *= -0.75
+        if contrast_at is not None:
+            weight *= 1.5 if i > contrast_at else 0.5
+
+        total += weight
+        hits += 1
+        boost = 1.0
+
+    # Same squashing as VADER's compound score, tuned to this lexicon's scale
+    score = total / math.sqrt(total * total + 4.0)
+    return score, total, hits, mixed
+
+
+def rating_sentiment(user_rating):
+    """
+    The dataset's 0-5 rating mapped onto the -1..1 sentiment scale, or None.
+    """
+    try:
+        rating = float(user_rating)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(rating):
+        return None
+
+    rating = max(0.0, min(RATING_SCALE, rating))
+    return rating / (RATING_SCALE / 2) - 1.0
+
+
+def prescore_review(review_text, review_id, user_rating=None):
+    """
+    Cheap local analysis of one review, shaped like `sanitize_result`
+    output, and its confidence (0-1).
+
+    Confidence is high only when the text is clearly polar, the lexicon
+    found enough evidence, and the text agrees with the user's rating.
+    Without a rating it is capped at 0.75.
+    """
+    lexicon_score, raw_score, _, mixed = lexicon_sentiment(review_text)
+    user_score = rating_sentiment(user_rating)
+
+    if user_score is None:
+        sentiment = lexicon_score
+        agreement = 0.75
+        ai_rating = (lexicon_score + 1.0) * RATING_SCALE / 2
+    else:
+        sentiment = (lexicon_score + user_score) / 2
+        agreement = 1.0 - abs(lexicon_score - user_score) / 2
+        ai_rating = (float(user_rating) + (lexicon_score + 1.0) * RATING_SCALE / 2) / 2
+
+    polarity = min(1.0, abs(sentiment) / 0.6)
+    # One strong word is enough evidence; a single mild one is not
+    evidence = min(1.0, 0.6 + 0.15 * abs(raw_score))
+    confidence = agreement * polarity * evidence * (0.75 if mixed else 1.0)
+
+    reasoning = (f"Pre-classified offline: lexicon sentiment {lexicon_score:+.2f}"
+                 + (f", user rating {float(user_rating):g}" if user_score is not None else "")
+                 + f" (confidence {confidence:.2f}).")
+
+    result = sanitize_result(
+        {"ai_rating": ai_rating, "sentiment": sentiment, "reasoning": reasoning},
+        review_id
+    )
+    return result, round(confidence, 3)
+
+
+def _in_audit_sample(review_id, rate):
+    # Stable per ID, so re-runs audit the same reviews and hit the cache
+    return zlib.crc32(str(review_id).encode("utf-8")) % 10000 < rate * 10000
+
+
+class PreClassifier:
+    """
+    Cascade in front of the LLM: every review is scored locally and only
+    those below `threshold` confidence are escalated. A stable `audit_rate`
+    sample of the accepted ones is escalated too, so the report can say how
+    far the cheap path drifts from the LLM on the reviews it keeps.
+    """
+
+    def __init__(self, threshold=None, audit_rate=None):
+        self.threshold = PRECLASSIFY_CONFIDENCE if threshold is None else threshold
+        self.audit_rate = PRECLASSIFY_AUDIT_RATE if audit_rate is None else audit_rate
+
+        self.scored = 0
+        self.accepted = 0
+        self.audited = 0
+        self.escalated = 0
+
+        self._estimates = {}
+        self._divergence = {
+            group: {"reviews": 0, "rating_abs": 0.0, "sentiment_abs": 0.0, "category_matches": 0}
+            for group in ("audit", "escalated")
+        }
+
+    def split(self, reviews, ids, user_ratings=None):
+        """
+        Returns (accepted results, positions to send to the LLM).
+        """
+        if user_ratings is None:
+            user_ratings = [None] * len(reviews)
+
+        accepted = []
+        escalate = []
+
+        for pos, (review_text, review_id, user_rating) in enumerate(zip(reviews, ids, user_ratings)):
+            estimate, confidence = prescore_review(review_text, review_id, user_rating)
+            self.scored += 1
+
+            if confidence < self.threshold:
+                self._estimates[review_id] = ("escalated", estimate)
+                self.escalated += 1
+                escalate.append(pos)
+            elif _in_audit_sample(review_id, self.audit_rate):
+                self._estimates[review_id] = ("audit", estimate)
+                self.audited += 1
+                escalate.append(pos)
+            else:
+                self.accepted += 1
+                accepted.append(estimate)
+
+        return accepted, escalate
+
+    def compare(self, llm_results):
+        """
+        Records how the local estimates differ from the LLM's results.
+        """
+        for result in llm_results:
+            entry = self._estimates.pop(result["id"], None)
+            if entry is None:
+                continue
+            group, estimate = entry
+            tally = self._divergence[group]
+            tally["reviews"] += 1
+            tally["rating_abs"] += abs(estimate["ai_rating"] - result["ai_rating"])
+            tally["sentiment_abs"] += abs(estimate["sentiment"] - result["sentiment"])
+            tally["category_matches"] += (
+                categorize_sentiment(estimate["sentiment"]) == categorize_sentiment(result["sentiment"])
+            )
+
+        # Reviews the LLM failed on have nothing to compare against
+        self._estimates.clear()
+
+    def summary(self):
+        divergence = {}
+        for group, tally in self._divergence.items():
+            n = tally["reviews"]
+            divergence[group] = {
+                "reviews": n,
+                "rating_mae": round(tally["rating_abs"] / n, 3) if n else None,
+                "sentiment_mae": round(tally["sentiment_abs"] / n, 3) if n else None,
+                "category_agreement": round(tally["category_matches"] / n, 3) if n else None
+            }
+
+        return {
+            "threshold": self.threshold,
+            "audit_rate": self.audit_rate,
+            "scored": self.scored,
+            "accepted": self.accepted,
+            "audited": self.audited,
+            "escalated": self.escalated,
+            "llm_calls_saved": self.accepted,
+            "savings_rate": round(self.accepted / self.scored, 4) if self.scored else 0.0,
+            "divergence": divergence
+        }
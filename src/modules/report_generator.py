@@ -1,166 +1,303 @@
+import io
+import json
+import hashlib
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from src.modules.aggregation import SENTIMENT_CATEGORIES
+from src.config.settings import REPORT_CACHE_ENTRIES, REPORT_APPENDIX_CHUNK_ROWS
 
 
-def generate_pdf_report(result, output_path="data/output/review_analysis_report.pdf"):
+# Rendered PDFs keyed on result fingerprint, shared by all sessions
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _report_styles():
     """
-    Generates comprehensive PDF report with stats, outliers, and influential reviews.
+    Paragraph and table styles, built once per process.
     """
-    
-    doc = SimpleDocTemplate(output_path, pagesize=letter,
+    styles = getSampleStyleSheet()
+
+    return {
+        "normal": styles['Normal'],
+        "body": styles['BodyText'],
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1f77b4'),
+            spaceAfter=6,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#2ca02c'),
+            spaceAfter=12,
+            spaceBefore=12,
+            fontName='Helvetica-Bold'
+        ),
+        "subheading": ParagraphStyle(
+            'subheading', parent=styles['Normal'], fontSize=11, fontName='Helvetica-Bold'),
+        "footer": ParagraphStyle(
+            'footer', parent=styles['Normal'], fontSize=9, textColor=colors.grey),
+        "metrics_table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+        ]),
+        "sentiment_table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ca02c')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+        ]),
+        "influential_table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff7f0e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#fffacd')])
+        ]),
+        "appendix_table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ('ALIGN', (0, 0), (3, -1), 'CENTER'),
+            ('ALIGN', (4, 1), (4, -1), 'LEFT'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+        ]),
+    }
+
+
+def result_fingerprint(result, appendix=False):
+    """
+    Content hash of everything the report shows, used as the PDF cache key.
+    """
+    h = hashlib.sha256()
+    headline = {
+        key: result.get(key)
+        for key in ("overall_ai_rating", "weighted_rating", "sentiment_stats", "rating_stats", "sentiment_counts")
+    }
+    h.update(json.dumps(headline, sort_keys=True, default=str).encode("utf-8"))
+    h.update(b"appendix" if appendix else b"summary")
+
+    df = result["ratings_dataframe"]
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def render_pdf_report(result, appendix=False):
+    """
+    Renders the report into memory and returns the PDF bytes. Reports are
+    cached per result fingerprint, so repeated requests (from any session)
+    do not rebuild the document. `appendix` adds a paginated table of all
+    reviews, laid out a chunk of rows at a time.
+    """
+    key = result_fingerprint(result, appendix)
+
+    with _report_cache_lock:
+        pdf_bytes = _report_cache.get(key)
+        if pdf_bytes is not None:
+            _report_cache.move_to_end(key)
+            return pdf_bytes
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter,
                            rightMargin=0.75*inch, leftMargin=0.75*inch,
                            topMargin=0.75*inch, bottomMargin=0.75*inch)
-    
+    doc.build(_build_story(result, appendix))
+    pdf_bytes = buffer.getvalue()
+
+    with _report_cache_lock:
+        _report_cache[key] = pdf_bytes
+        while len(_report_cache) > REPORT_CACHE_ENTRIES:
+            _report_cache.popitem(last=False)
+
+    return pdf_bytes
+
+
+def generate_pdf_report(result, output_path="data/output/review_analysis_report.pdf", appendix=False):
+    """
+    Generates comprehensive PDF report with stats, outliers, and influential reviews.
+    Writes it to `output_path` and returns the path; use `render_pdf_report`
+    to get the bytes without touching the filesystem.
+    """
+    pdf_bytes = render_pdf_report(result, appendix)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(pdf_bytes)
+
+    return str(output_path)
+
+
+class _StreamedStory(list):
+    """
+    Flowable list that is refilled from a generator as the document is built,
+    so long appendices are never held in memory all at once.
+    """
+
+    def __init__(self, flowables, pending, lookahead=4):
+        super().__init__(flowables)
+        self._pending = pending
+        self._lookahead = lookahead
+
+    def __len__(self):
+        # reportlab checks len() before taking each flowable from the front
+        while self._pending is not None and super().__len__() < self._lookahead:
+            try:
+                self.append(next(self._pending))
+            except StopIteration:
+                self._pending = None
+        return super().__len__()
+
+
+def _build_story(result, appendix=False):
     story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#2ca02c'),
-        spaceAfter=12,
-        spaceBefore=12,
-        fontName='Helvetica-Bold'
-    )
-    
+    s = _report_styles()
+
     # Title and timestamp
-    story.append(Paragraph("AI Review Analysis Report", title_style))
-    story.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", 
-                          styles['Normal']))
+    story.append(Paragraph("AI Review Analysis Report", s["title"]))
+    story.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
+                          s["normal"]))
     story.append(Spacer(1, 0.3*inch))
-    
-    # Get dataframe
-    df = pd.DataFrame(result["ratings_dataframe"])
-    
+
+    df = result["ratings_dataframe"]
+
+    # Statistics precomputed by the pipeline; older results fall back to the table
+    rating_stats = result.get("rating_stats") or {
+        "count": len(df),
+        "min": float(df["ai_rating"].min()),
+        "max": float(df["ai_rating"].max())
+    }
+    sentiment_counts = result.get("sentiment_counts") or df["sentiment_category"].value_counts().to_dict()
+    total = rating_stats["count"]
+
     # Summary Metrics Section
-    story.append(Paragraph("Executive Summary", heading_style))
-    
+    story.append(Paragraph("Executive Summary", s["heading"]))
+
     metrics_data = [
         ["Metric", "Value"],
-        ["Total Reviews", str(len(df))],
+        ["Total Reviews", str(total)],
         ["Overall AI Rating", f"{result['overall_ai_rating']:.2f}"],
         ["Weighted Rating", f"{result['weighted_rating']:.2f}"],
         ["Mean Sentiment", f"{result['sentiment_stats']['mean_sentiment']:.3f}"],
-        ["Rating Std Dev", f"{df['ai_rating'].std():.3f}"],
-        ["Min Rating", f"{df['ai_rating'].min():.1f}"],
-        ["Max Rating", f"{df['ai_rating'].max():.1f}"],
+        ["Rating Std Dev", f"{result['outliers']['bounds']['sigma']['std']:.3f}"],
+        ["Min Rating", f"{rating_stats['min']:.1f}"],
+        ["Max Rating", f"{rating_stats['max']:.1f}"],
     ]
-    
+
     metrics_table = Table(metrics_data, colWidths=[3*inch, 2*inch])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
+    metrics_table.setStyle(s["metrics_table"])
+
     story.append(metrics_table)
     story.append(Spacer(1, 0.3*inch))
-    
+
     # Sentiment Breakdown
-    story.append(Paragraph("Sentiment Distribution", heading_style))
-    
-    sentiment_counts = df["sentiment_category"].value_counts().to_dict()
+    story.append(Paragraph("Sentiment Distribution", s["heading"]))
+
     sentiment_data = [["Sentiment Category", "Count", "Percentage"]]
-    
-    total = len(df)
-    for category in ["Strong Negative", "Negative", "Neutral", "Positive", "Strong Positive"]:
+
+    for category in SENTIMENT_CATEGORIES:
         count = sentiment_counts.get(category, 0)
         percentage = (count / total * 100) if total > 0 else 0
         sentiment_data.append([category, str(count), f"{percentage:.1f}%"])
-    
+
     sentiment_table = Table(sentiment_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-    sentiment_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ca02c')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
+    sentiment_table.setStyle(s["sentiment_table"])
+
     story.append(sentiment_table)
     story.append(Spacer(1, 0.3*inch))
-    
+
     story.append(PageBreak())
-    
+
     # Strong Outliers Section
-    story.append(Paragraph("Strong Outliers Analysis", heading_style))
-    
-    rating_mean = df["ai_rating"].mean()
-    rating_std = df["ai_rating"].std()
-    threshold_low = rating_mean - (1.5 * rating_std)
-    threshold_high = rating_mean + (1.5 * rating_std)
-    
-    strong_outliers = df[
-        (df["ai_rating"] <= threshold_low) | (df["ai_rating"] >= threshold_high)
-    ].to_dict("records")
-    
-    if strong_outliers:
-        story.append(Paragraph(f"Found <b>{len(strong_outliers)}</b> strong outlier(s) "
-                              f"(beyond ±1.5σ from mean)", styles['Normal']))
+    story.append(Paragraph("Strong Outliers Analysis", s["heading"]))
+
+    # Reuse the pipeline's outlier pass instead of recomputing thresholds
+    outliers = result["outliers"]
+    sigma = outliers["bounds"]["sigma"]
+    rating_mean = sigma["mean"]
+    rating_std = sigma["std"]
+    threshold_low = sigma["low"]
+
+    # Counts cover every review; streaming results only index example rows
+    sigma_count = outliers["counts"]["sigma_outliers"]
+    strong_outliers = df.iloc[outliers["indices"]["sigma_outliers"][:5]].to_dict("records")
+
+    if sigma_count:
+        story.append(Paragraph(f"Found <b>{sigma_count}</b> strong outlier(s) "
+                              f"(beyond ±{sigma['k']}σ from mean)", s["normal"]))
         story.append(Spacer(1, 0.2*inch))
-        
-        for i, outlier in enumerate(strong_outliers[:5], 1):
+
+        for i, outlier in enumerate(strong_outliers, 1):
             deviation = abs(outlier['ai_rating'] - rating_mean) / rating_std if rating_std > 0 else 0
             outlier_type = "Very Low" if outlier['ai_rating'] <= threshold_low else "Very High"
-            
+
             outlier_text = f"""
             <b>Outlier #{i}</b> - {outlier_type} ({deviation:.2f}σ from mean)<br/>
-            <b>Review ID:</b> {outlier['id']} | <b>Rating:</b> {outlier['ai_rating']} | 
+            <b>Review ID:</b> {outlier['id']} | <b>Rating:</b> {outlier['ai_rating']} |
             <b>Sentiment:</b> {outlier['sentiment']:.3f} ({outlier['sentiment_category']})<br/>
             <b>Review:</b> "{outlier['review_text'][:120]}..."<br/>
             <b>Reasoning:</b> {outlier['reasoning'][:150]}...<br/>
             """
-            story.append(Paragraph(outlier_text, styles['BodyText']))
+            story.append(Paragraph(outlier_text, s["body"]))
             story.append(Spacer(1, 0.15*inch))
     else:
-        story.append(Paragraph("No strong outliers detected in this dataset.", styles['Normal']))
-    
+        story.append(Paragraph("No strong outliers detected in this dataset.", s["normal"]))
+
     story.append(Spacer(1, 0.3*inch))
     story.append(PageBreak())
-    
+
     # Top Influential Reviews
-    story.append(Paragraph("Top 10 Most Influential Reviews", heading_style))
+    story.append(Paragraph("Top 10 Most Influential Reviews", s["heading"]))
     story.append(Paragraph(
         "These reviews have the highest impact on the overall rating. Removing them would shift the average most significantly.",
-        styles['Normal']
+        s["normal"]
     ))
     story.append(Spacer(1, 0.15*inch))
-    
+
     influential = result.get("impact_analysis", {}).get("most_influential_reviews", [])
-    
+
     if influential:
         influential_data = [["Rank", "ID", "Rating", "Sentiment", "Impact Score", "Category"]]
-        
+
         for idx, review in enumerate(influential[:10], 1):
             influential_data.append([
                 str(idx),
@@ -170,28 +307,16 @@ def generate_pdf_report(result, output_path="data/output/review_analysis_report.
                 f"{review['impact_score']:.5f}",
                 review.get('sentiment_category', 'N/A')
             ])
-        
+
         influential_table = Table(influential_data, colWidths=[0.7*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch, 1.2*inch])
-        influential_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff7f0e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#fffacd')])
-        ]))
-        
+        influential_table.setStyle(s["influential_table"])
+
         story.append(influential_table)
         story.append(Spacer(1, 0.2*inch))
-        
+
         # Detailed influential reviews
-        story.append(Paragraph("Detailed View", ParagraphStyle(
-            'subheading', parent=styles['Normal'], fontSize=11, fontName='Helvetica-Bold')))
-        
+        story.append(Paragraph("Detailed View", s["subheading"]))
+
         for idx, review in enumerate(influential[:3], 1):
             detail_text = f"""
             <b>Review #{idx} (ID: {review['id']})</b><br/>
@@ -199,20 +324,53 @@ def generate_pdf_report(result, output_path="data/output/review_analysis_report.
             <b>Text:</b> "{review['review_text']}"<br/>
             <b>Reasoning:</b> {review['reasoning']}<br/>
             """
-            story.append(Paragraph(detail_text, styles['BodyText']))
+            story.append(Paragraph(detail_text, s["body"]))
             story.append(Spacer(1, 0.15*inch))
-    
+
     story.append(Spacer(1, 0.5*inch))
-    
+
     # Footer
     footer_text = (f"<i>Report generated by AI Review Analyzer | "
-                  f"{len(df)} reviews analyzed | "
+                  f"{total} reviews analyzed | "
                   f"{datetime.now().strftime('%B %d, %Y at %H:%M')}</i>")
-    story.append(Paragraph(footer_text, 
-                          ParagraphStyle('footer', parent=styles['Normal'], 
-                                       fontSize=9, textColor=colors.grey)))
-    
-    # Build PDF
-    doc.build(story)
-    
-    return output_path
+    story.append(Paragraph(footer_text, s["footer"]))
+
+    if not appendix:
+        return story
+
+    story.append(PageBreak())
+    title = "Appendix: All Reviews" if len(df) >= total else f"Appendix: {len(df)} Example Reviews"
+    story.append(Paragraph(title, s["heading"]))
+    return _StreamedStory(story, _appendix_tables(df, s["appendix_table"]))
+
+
+def _appendix_tables(df, table_style, chunk_rows=None):
+    """
+    Yields one small table per chunk of rows. Small tables lay out in linear
+    time, whereas splitting one huge table across pages does not.
+    """
+    if chunk_rows is None:
+        chunk_rows = REPORT_APPENDIX_CHUNK_ROWS
+
+    header = ["ID", "Rating", "Sentiment", "Category", "Review"]
+    col_widths = [0.6*inch, 0.5*inch, 0.65*inch, 0.9*inch, 4.35*inch]
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        rows = [header]
+        for review_id, ai_rating, sentiment, category, review_text in zip(
+            chunk["id"], chunk["ai_rating"], chunk["sentiment"],
+            chunk["sentiment_category"], chunk["review_text"]
+        ):
+            text = " ".join(str(review_text).split())
+            rows.append([
+                str(review_id),
+                f"{ai_rating:.2f}",
+                f"{sentiment:.2f}",
+                str(category),
+                text if len(text) <= 85 else text[:82] + "..."
+            ])
+
+        table = Table(rows, colWidths=col_widths, repeatRows=1)
+        table.setStyle(table_style)
+        yield table
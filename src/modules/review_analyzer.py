@@ -1,16 +1,59 @@
 import json
-from langchain.prompts import PromptTemplate
+import time
+import asyncio
+import threading
 from src.utils.llm_utils import get_llm
-from src.config.prompts import REVIEW_ANALYSIS_PROMPT
+from src.utils.retry import get_retry_policy
+from src.modules.token_budget import estimate_tokens
+from src.config.prompts import REVIEW_ANALYSIS_PROMPT, BATCH_REVIEW_ANALYSIS_PROMPT
+from src.config.settings import ANALYSIS_CONCURRENCY, BATCH_TOKEN_BUDGET, BATCH_MAX_REVIEWS
 
-llm = get_llm()
+# Chains are built on first use (see get_chain / get_batch_chain) so that
+# importing this module does not pull in langchain or create an LLM client.
+_chain = None
+_batch_chain = None
+_chain_lock = threading.Lock()
+_shared_loop = None
 
-prompt = PromptTemplate(
-    input_variables=["review"],
-    template=REVIEW_ANALYSIS_PROMPT
-)
 
-chain = prompt | llm
+def get_chain():
+    """
+    Shared `prompt | llm` chain for single-review analysis.
+    """
+    global _chain
+
+    if _chain is None:
+        with _chain_lock:
+            if _chain is None:
+                from langchain_core.prompts import PromptTemplate
+
+                prompt = PromptTemplate(
+                    input_variables=["review"],
+                    template=REVIEW_ANALYSIS_PROMPT
+                )
+                _chain = prompt | get_llm()
+
+    return _chain
+
+
+def get_batch_chain():
+    """
+    Shared `prompt | llm` chain for multi-review batched prompting.
+    """
+    global _batch_chain
+
+    if _batch_chain is None:
+        with _chain_lock:
+            if _batch_chain is None:
+                from langchain_core.prompts import PromptTemplate
+
+                batch_prompt = PromptTemplate(
+                    input_variables=["reviews"],
+                    template=BATCH_REVIEW_ANALYSIS_PROMPT
+                )
+                _batch_chain = batch_prompt | get_llm()
+
+    return _batch_chain
 
 
 def extract_json_from_text(text):
@@ -29,11 +72,143 @@ def extract_json_from_text(text):
     return None
 
 
-def analyze_reviews(reviews, ids):
+def extract_json_array_from_text(text):
+    """
+    Safely extract a JSON array from a batched model response.
+    """
+    text = text.strip()
+    start = text.find("[")
+    end = text.rfind("]")
+
+    if start != -1 and end != -1 and end > start:
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except Exception:
+            return None
+        return parsed if isinstance(parsed, list) else None
+    return None
+
+
+def build_retry_prompt(review_text):
+    return (
+        "Analyze the review again and return ONLY valid JSON "
+        "with keys: sentiment, ai_rating, reasoning.\n\nReview:\n"
+        + review_text
+    )
+
+
+def _invoke_llm(runnable, payload, metrics=None, retry=False, tokens=0):
+    """
+    Calls `runnable.invoke` under the shared retry policy (rate limits,
+    backoff, circuit breaker), recording latency, errors and token usage
+    for every attempt.
+    """
+    state = {"attempt": 0}
+
+    def on_attempt(attempt):
+        state["attempt"] = attempt
+
+    def call():
+        start = time.perf_counter()
+        is_retry = retry or state["attempt"] > 1
+        try:
+            response = runnable.invoke(payload)
+        except Exception:
+            if metrics is not None:
+                metrics.record_llm_call(time.perf_counter() - start, error=True, retry=is_retry)
+            raise
+
+        if metrics is not None:
+            metrics.record_llm_call(time.perf_counter() - start, response=response, retry=is_retry)
+        return response
+
+    return get_retry_policy().call(call, tokens=tokens, on_attempt=on_attempt, metrics=metrics)
+
+
+async def _ainvoke_llm(runnable, payload, metrics=None, retry=False, tokens=0):
+    """
+    Async counterpart of `_invoke_llm`.
+    """
+    state = {"attempt": 0}
+
+    def on_attempt(attempt):
+        state["attempt"] = attempt
+
+    async def call():
+        start = time.perf_counter()
+        is_retry = retry or state["attempt"] > 1
+        try:
+            response = await runnable.ainvoke(payload)
+        except Exception:
+            if metrics is not None:
+                metrics.record_llm_call(time.perf_counter() - start, error=True, retry=is_retry)
+            raise
+
+        if metrics is not None:
+            metrics.record_llm_call(time.perf_counter() - start, response=response, retry=is_retry)
+        return response
+
+    return await get_retry_policy().acall(call, tokens=tokens, on_attempt=on_attempt, metrics=metrics)
+
+
+def parse_response(response):
+    raw_output = getattr(response, "content", str(response))
+    return extract_json_from_text(raw_output)
+
+
+def sanitize_result(parsed, review_id):
+    """
+    Validates model-decided values and applies the consistency rules.
+    Returns None when the parsed output is unusable.
+    """
+
+    try:
+        ai_rating = float(parsed["ai_rating"])
+        sentiment = float(parsed["sentiment"])
+        reasoning = str(parsed.get("reasoning", ""))
+    except Exception:
+        return None
+
+    # Safety bounds (not logic)
+    ai_rating = max(1.0, min(5.0, ai_rating))
+    sentiment = max(-1.0, min(1.0, sentiment))
+
+    # -------------------------------
+    # LOGICAL CONSISTENCY ENFORCEMENT
+    # (THIS FIXES DISTRIBUTION COLLAPSE)
+    # -------------------------------
+    # Strong negative sentiment should not map to mid/high rating
+    if sentiment <= -0.6 and ai_rating > 3.0:
+        ai_rating = 2.5 + (ai_rating - 3.0) * 0.3
+
+    # Strong positive sentiment should not map to mid/low rating
+    elif sentiment >= 0.6 and ai_rating < 4.0:
+        ai_rating = 4.0 + (ai_rating - 3.5) * 0.3
+
+    # Final clamp after adjustment
+    ai_rating = max(1.0, min(5.0, ai_rating))
+
+    # -------------------------------
+    # CLEAN OUTPUT
+    # -------------------------------
+    return {
+        "id": review_id,
+        "ai_rating": round(ai_rating, 2),
+        "sentiment": round(sentiment, 3),
+        "reasoning": reasoning
+    }
+
+
+def analyze_reviews(reviews, ids, cache=None, on_result=None, metrics=None, progress=None):
     """
     Fully AI-driven review analysis.
     The model decides sentiment first, then rating.
     Code only validates and sanitizes output.
+    When a `cache` is given, previously analyzed texts skip the LLM call.
+    `on_result` is called with each clean result as soon as it is available.
+    `metrics` (a PipelineMetrics) receives LLM call telemetry.
+    `progress` (an AnalysisProgress) receives one event per review and
+    can cancel the run.
     """
 
     results = []
@@ -41,30 +216,53 @@ def analyze_reviews(reviews, ids):
     success_count = 0
     total = len(reviews)
 
+    if progress is not None:
+        progress.expect(total)
+
     for idx, (review_text, review_id) in enumerate(zip(reviews, ids), 1):
 
-        parsed = None
+        parsed = cache.get(review_text, metrics) if cache is not None else None
+
+        if parsed is not None:
+            clean_output = sanitize_result(parsed, review_id)
+            if clean_output is not None:
+                results.append(clean_output)
+                success_count += 1
+                if on_result is not None:
+                    on_result(clean_output)
+                if progress is not None:
+                    progress.review_done(clean_output)
+                continue
+
+        if progress is not None:
+            progress.raise_if_cancelled()
+
+        # Built outside the per-review try, so a broken setup fails the run
+        # once instead of being logged as a failure for every review
+        chain = get_chain()
 
-        # Primary attempt
+        # Primary attempt; transport errors are retried by the retry policy
+        call_failed = False
         try:
-            response = chain.invoke({"review": review_text})
-            raw_output = getattr(response, "content", str(response))
-            parsed = extract_json_from_text(raw_output)
+            response = _invoke_llm(chain, {"review": review_text}, metrics,
+                                   tokens=review_prompt_tokens(review_text))
+            parsed = parse_response(response)
+            if parsed is None and metrics is not None:
+                metrics.record_parse_failure()
         except Exception as e:
             print(f"[Review {idx}/{len(reviews)}] Primary analysis failed for ID {review_id}: {str(e)}")
             parsed = None
+            call_failed = True
 
         # Single retry if model output is malformed
-        if parsed is None:
+        if parsed is None and not call_failed:
             try:
-                retry_prompt = (
-                    "Analyze the review again and return ONLY valid JSON "
-                    "with keys: sentiment, ai_rating, reasoning.\n\nReview:\n"
-                    + review_text
-                )
-                retry_response = llm.invoke(retry_prompt)
-                retry_raw = getattr(retry_response, "content", str(retry_response))
-                parsed = extract_json_from_text(retry_raw)
+                retry_prompt = build_retry_prompt(review_text)
+                retry_response = _invoke_llm(get_llm(), retry_prompt, metrics, retry=True,
+                                             tokens=estimate_tokens(retry_prompt))
+                parsed = parse_response(retry_response)
+                if parsed is None and metrics is not None:
+                    metrics.record_parse_failure()
                 if parsed is None:
                     print(f"[Review {idx}/{len(reviews)}] Retry failed - invalid JSON for ID {review_id}")
             except Exception as e:
@@ -74,47 +272,25 @@ def analyze_reviews(reviews, ids):
         # If model completely fails → skip review (do NOT invent values)
         if parsed is None:
             failed_count += 1
+            if progress is not None:
+                progress.review_done(failed=True)
             continue
 
-        # Validate model-decided values
-        try:
-            ai_rating = float(parsed["ai_rating"])
-            sentiment = float(parsed["sentiment"])
-            reasoning = str(parsed.get("reasoning", ""))
-        except Exception:
+        clean_output = sanitize_result(parsed, review_id)
+        if clean_output is None:
+            if progress is not None:
+                progress.review_done(failed=True)
             continue
 
-        # Safety bounds (not logic)
-        ai_rating = max(1.0, min(5.0, ai_rating))
-        sentiment = max(-1.0, min(1.0, sentiment))
-
-        # -------------------------------
-        # LOGICAL CONSISTENCY ENFORCEMENT
-        # (THIS FIXES DISTRIBUTION COLLAPSE)
-        # -------------------------------
-        # Strong negative sentiment should not map to mid/high rating
-        if sentiment <= -0.6 and ai_rating > 3.0:
-            ai_rating = 2.5 + (ai_rating - 3.0) * 0.3
-
-        # Strong positive sentiment should not map to mid/low rating
-        elif sentiment >= 0.6 and ai_rating < 4.0:
-            ai_rating = 4.0 + (ai_rating - 3.5) * 0.3
-
-        # Final clamp after adjustment
-        ai_rating = max(1.0, min(5.0, ai_rating))
-
-        # -------------------------------
-        # CLEAN OUTPUT
-        # -------------------------------
-        clean_output = {
-            "id": review_id,
-            "ai_rating": round(ai_rating, 2),
-            "sentiment": round(sentiment, 3),
-            "reasoning": reasoning
-        }
+        if cache is not None:
+            cache.put(review_text, parsed)
 
         results.append(clean_output)
         success_count += 1
+        if on_result is not None:
+            on_result(clean_output)
+        if progress is not None:
+            progress.review_done(clean_output)
 
     print(
         f"\n✓ Review analysis complete: "
@@ -122,4 +298,398 @@ def analyze_reviews(reviews, ids):
         f"out of {total} reviews"
     )
 
-    return results
\ No newline at end of file
+    return results
+
+
+def _lookup_cached(reviews, ids, cache, on_result=None, progress=None, metrics=None):
+    """
+    Splits positions into cache hits (sanitized outputs) and pending misses.
+    """
+
+    outputs = {}
+    pending = []
+
+    for pos, (review_text, review_id) in enumerate(zip(reviews, ids)):
+        if cache is not None:
+            cached = cache.get(review_text, metrics)
+            if cached is not None:
+                clean_output = sanitize_result(cached, review_id)
+                if clean_output is not None:
+                    outputs[pos] = clean_output
+                    if on_result is not None:
+                        on_result(clean_output)
+                    if progress is not None:
+                        progress.review_done(clean_output)
+                    continue
+        pending.append(pos)
+
+    return outputs, pending
+
+
+def _store_results(stored, cache=None, on_result=None):
+    """
+    Writes (review_text, parsed, clean_output) triples to the cache and
+    `on_result`. Async callers run it off the event loop: SQLite commits
+    and journal fsyncs would otherwise stall every other in-flight call
+    on a shared loop.
+    """
+    for review_text, parsed, clean_output in stored:
+        if cache is not None:
+            cache.put(review_text, parsed)
+        if on_result is not None:
+            on_result(clean_output)
+
+
+async def _analyze_one_async(review_text, review_id, idx, total, semaphore, cache=None,
+                             on_result=None, metrics=None, progress=None):
+    """
+    Async counterpart of one iteration of `analyze_reviews` (cache lookup excluded).
+    Returns (clean_output, failed) so the caller can keep the same counters.
+    """
+
+    async with semaphore:
+        if progress is not None:
+            progress.raise_if_cancelled()
+
+        parsed = None
+
+        call_failed = False
+
+        try:
+            response = await _ainvoke_llm(get_chain(), {"review": review_text}, metrics,
+                                          tokens=review_prompt_tokens(review_text))
+            parsed = parse_response(response)
+            if parsed is None and metrics is not None:
+                metrics.record_parse_failure()
+        except Exception as e:
+            print(f"[Review {idx}/{total}] Primary analysis failed for ID {review_id}: {str(e)}")
+            parsed = None
+            call_failed = True
+
+        if parsed is None and not call_failed:
+            try:
+                retry_prompt = build_retry_prompt(review_text)
+                retry_response = await _ainvoke_llm(get_llm(), retry_prompt, metrics, retry=True,
+                                                    tokens=estimate_tokens(retry_prompt))
+                parsed = parse_response(retry_response)
+                if parsed is None and metrics is not None:
+                    metrics.record_parse_failure()
+                if parsed is None:
+                    print(f"[Review {idx}/{total}] Retry failed - invalid JSON for ID {review_id}")
+            except Exception as e:
+                print(f"[Review {idx}/{total}] Retry analysis failed for ID {review_id}: {str(e)}")
+                parsed = None
+
+    if parsed is None:
+        if progress is not None:
+            progress.review_done(failed=True)
+        return None, True
+
+    clean_output = sanitize_result(parsed, review_id)
+    if clean_output is not None and (cache is not None or on_result is not None):
+        await asyncio.to_thread(_store_results, [(review_text, parsed, clean_output)], cache, on_result)
+    if progress is not None:
+        progress.review_done(clean_output, failed=clean_output is None)
+
+    return clean_output, False
+
+
+async def analyze_reviews_async(reviews, ids, max_concurrency=None, cache=None, on_result=None,
+                                metrics=None, progress=None):
+    """
+    Concurrent version of `analyze_reviews` built on `chain.ainvoke`.
+    At most `max_concurrency` requests are in flight at once; results
+    keep the input order and are identical per ID to the sequential path.
+    """
+
+    if max_concurrency is None:
+        max_concurrency = ANALYSIS_CONCURRENCY
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    total = len(reviews)
+
+    if progress is not None:
+        progress.expect(total)
+
+    # SQLite lookups run off the event loop, which may be shared with other runs
+    outputs, pending = await asyncio.to_thread(_lookup_cached, reviews, ids, cache, on_result, progress, metrics)
+    if pending:
+        # Built before any task starts, so a broken setup fails the run once
+        get_chain()
+
+    tasks = [
+        _analyze_one_async(reviews[pos], ids[pos], pos + 1, total, semaphore, cache, on_result, metrics,
+                           progress)
+        for pos in pending
+    ]
+    outcomes = await asyncio.gather(*tasks)
+
+    failed_count = 0
+    for pos, (clean_output, failed) in zip(pending, outcomes):
+        failed_count += failed
+        if clean_output is not None:
+            outputs[pos] = clean_output
+
+    results = [outputs[pos] for pos in sorted(outputs)]
+
+    print(
+        f"\n✓ Review analysis complete: "
+        f"{len(results)} successful, {failed_count} failed "
+        f"out of {total} reviews"
+    )
+
+    return results
+
+
+def start_shared_event_loop():
+    """
+    Runs every later async analysis in this process on one background event
+    loop instead of a new loop per call, so concurrent runs (e.g. service
+    jobs) share the LLM client's connection pool.
+    """
+    global _shared_loop
+
+    with _chain_lock:
+        if _shared_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+            _shared_loop = loop
+    return _shared_loop
+
+
+def _run_coroutine(coro):
+    """
+    Runs a coroutine to completion from synchronous code, even when the
+    caller already owns a running event loop (e.g. notebooks).
+    """
+
+    if _shared_loop is not None:
+        return asyncio.run_coroutine_threadsafe(coro, _shared_loop).result()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    outcome = {}
+
+    def runner():
+        try:
+            outcome["value"] = asyncio.run(coro)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def analyze_reviews_concurrent(reviews, ids, max_concurrency=None, cache=None, on_result=None,
+                               metrics=None, progress=None):
+    """
+    Synchronous entry point for the async engine.
+    """
+    return _run_coroutine(analyze_reviews_async(
+        reviews, ids, max_concurrency, cache, on_result, metrics, progress
+    ))
+
+
+def review_prompt_tokens(review_text):
+    """
+    Estimated prompt tokens of one single-review request.
+    """
+    return estimate_tokens(REVIEW_ANALYSIS_PROMPT) + estimate_tokens(str(review_text))
+
+
+def format_batch_item(review_text, review_id):
+    return f"[ID: {review_id}] " + " ".join(str(review_text).split())
+
+
+def build_review_batches(reviews, ids, token_budget=None, max_batch_size=None):
+    """
+    Packs reviews into batches whose rendered prompt stays within `token_budget`.
+    Returns lists of positions into `reviews`. IDs are unique within a batch.
+    """
+
+    if token_budget is None:
+        token_budget = BATCH_TOKEN_BUDGET
+    if max_batch_size is None:
+        max_batch_size = BATCH_MAX_REVIEWS
+
+    overhead = estimate_tokens(BATCH_REVIEW_ANALYSIS_PROMPT)
+
+    batches = []
+    current = []
+    current_ids = set()
+    used = overhead
+
+    for pos, (review_text, review_id) in enumerate(zip(reviews, ids)):
+        cost = estimate_tokens(format_batch_item(review_text, review_id)) + 1
+        key = str(review_id)
+
+        if current and (
+            used + cost > token_budget
+            or len(current) >= max_batch_size
+            or key in current_ids
+        ):
+            batches.append(current)
+            current = []
+            current_ids = set()
+            used = overhead
+
+        current.append(pos)
+        current_ids.add(key)
+        used += cost
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def parse_batch_response(response):
+    """
+    Maps str(id) -> parsed item for every well-formed object in a batched response.
+    """
+
+    raw_output = getattr(response, "content", str(response))
+    items = extract_json_array_from_text(raw_output)
+
+    by_id = {}
+    for item in items or []:
+        if isinstance(item, dict) and "id" in item:
+            by_id[str(item["id"]).strip()] = item
+    return by_id
+
+
+async def _analyze_batch_async(positions, reviews, ids, semaphore, cache=None, on_result=None,
+                               metrics=None, progress=None):
+    """
+    Sends one packed prompt and returns {position: clean_output} for usable items.
+    """
+
+    reviews_block = "\n".join(format_batch_item(reviews[pos], ids[pos]) for pos in positions)
+
+    async with semaphore:
+        if progress is not None:
+            progress.raise_if_cancelled()
+
+        try:
+            response = await _ainvoke_llm(
+                get_batch_chain(),
+                {"reviews": reviews_block},
+                metrics,
+                tokens=estimate_tokens(BATCH_REVIEW_ANALYSIS_PROMPT) + estimate_tokens(reviews_block)
+            )
+            by_id = parse_batch_response(response)
+        except Exception as e:
+            print(f"[Batch of {len(positions)}] Batch analysis failed: {str(e)}")
+            by_id = {}
+
+    outputs = {}
+    stored = []
+    for pos in positions:
+        item = by_id.get(str(ids[pos]).strip())
+        clean_output = sanitize_result(item, ids[pos]) if item is not None else None
+        if clean_output is None:
+            if metrics is not None:
+                metrics.record_parse_failure()
+            continue
+
+        outputs[pos] = clean_output
+        stored.append((reviews[pos], item, clean_output))
+
+    if stored and (cache is not None or on_result is not None):
+        await asyncio.to_thread(_store_results, stored, cache, on_result)
+    if progress is not None:
+        for clean_output in outputs.values():
+            progress.review_done(clean_output)
+    return outputs
+
+
+async def analyze_reviews_batched_async(reviews, ids, max_concurrency=None, cache=None,
+                                        token_budget=None, max_batch_size=None, on_result=None,
+                                        metrics=None, progress=None):
+    """
+    Multi-review prompting: packs several reviews into one request and expects
+    a JSON array back. Items missing or malformed in the batch output fall back
+    to the single-review path. Output order matches the input order.
+    """
+
+    if max_concurrency is None:
+        max_concurrency = ANALYSIS_CONCURRENCY
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    total = len(reviews)
+
+    if progress is not None:
+        progress.expect(total)
+
+    # SQLite lookups run off the event loop, which may be shared with other runs
+    outputs, pending = await asyncio.to_thread(_lookup_cached, reviews, ids, cache, on_result, progress, metrics)
+    if pending:
+        # Built before any task starts, so a broken setup fails the run once
+        get_batch_chain()
+        get_chain()
+
+    batches = build_review_batches(
+        [reviews[pos] for pos in pending],
+        [ids[pos] for pos in pending],
+        token_budget,
+        max_batch_size
+    )
+    batches = [[pending[i] for i in batch] for batch in batches]
+
+    print(f"Packed {len(pending)} reviews into {len(batches)} batch request(s)")
+
+    batch_outcomes = await asyncio.gather(*[
+        _analyze_batch_async(batch, reviews, ids, semaphore, cache, on_result, metrics, progress)
+        for batch in batches
+    ])
+
+    for batch_outputs in batch_outcomes:
+        outputs.update(batch_outputs)
+
+    fallback = [pos for pos in pending if pos not in outputs]
+    failed_count = 0
+
+    if fallback:
+        print(f"{len(fallback)} review(s) missing or malformed in batch output, "
+              f"falling back to single-review analysis")
+
+        outcomes = await asyncio.gather(*[
+            _analyze_one_async(reviews[pos], ids[pos], pos + 1, total, semaphore, cache, on_result,
+                               metrics, progress)
+            for pos in fallback
+        ])
+
+        for pos, (clean_output, failed) in zip(fallback, outcomes):
+            failed_count += failed
+            if clean_output is not None:
+                outputs[pos] = clean_output
+
+    results = [outputs[pos] for pos in sorted(outputs)]
+
+    print(
+        f"\n✓ Review analysis complete: "
+        f"{len(results)} successful, {failed_count} failed "
+        f"out of {total} reviews"
+    )
+
+    return results
+
+
+def analyze_reviews_batched(reviews, ids, max_concurrency=None, cache=None,
+                            token_budget=None, max_batch_size=None, on_result=None, metrics=None,
+                            progress=None):
+    """
+    Synchronous entry point for batched prompting.
+    """
+    return _run_coroutine(analyze_reviews_batched_async(
+        reviews, ids, max_concurrency, cache, token_budget, max_batch_size, on_result, metrics,
+        progress
+    ))
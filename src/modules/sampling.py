@@ -0,0 +1,248 @@
+# Progressive sampling node: headline estimates with confidence intervals
+import math
+import numpy as np
+from statistics import NormalDist
+from src.modules.aggregation import categorize_sentiments, SENTIMENT_CATEGORIES
+from src.config.settings import (
+    SAMPLE_TARGET_WIDTH, SAMPLE_BUDGET, SAMPLE_INITIAL_SIZE, SAMPLE_CONFIDENCE, SAMPLE_STRATIFY,
+    SAMPLE_SEED
+)
+
+
+# Metrics whose interval width is checked against the target
+TARGET_METRICS = ("overall_ai_rating", "weighted_rating")
+
+# A round never asks for more than this multiple of what was already sent,
+# so one noisy early variance estimate cannot spend the whole budget
+MAX_ROUND_GROWTH = 1.0
+ROUND_SIZE_MARGIN = 1.1
+
+
+def rating_strata(user_ratings):
+    """
+    Stratum code per review from the dataset's rating, rounded to a whole
+    star; reviews without a rating form their own stratum.
+    """
+    ratings = np.asarray(user_ratings, dtype=float)
+    buckets = np.where(np.isnan(ratings), -1.0, np.round(ratings))
+    _, codes = np.unique(buckets, return_inverse=True)
+    return codes.ravel()
+
+
+def sample_order(strata, seed=None):
+    """
+    Random order of all reviews in which every prefix is close to a
+    proportional stratified sample: each stratum's reviews are shuffled and
+    spread evenly over the order, so any round size keeps each stratum
+    within one review of its share.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(strata)
+
+    order = np.lexsort((rng.random(n), strata))
+    sizes = np.bincount(strata)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    sorted_strata = strata[order]
+    rank = np.arange(n) - starts[sorted_strata]
+
+    spread = (rank + rng.random(n)) / sizes[sorted_strata]
+    return order[np.argsort(spread, kind="stable")]
+
+
+def stratified_mean(values, strata, population):
+    """
+    Stratified estimate of a mean and its variance, with the finite
+    population correction. `population` is the full size of each stratum.
+    Strata with no sampled values are left out and the weights of the rest
+    renormalized; a stratum with a single value borrows the pooled variance.
+    """
+    counts = np.bincount(strata, minlength=len(population)).astype(float)
+    sampled = counts > 0
+    if not sampled.any():
+        return math.nan, math.nan
+
+    sums = np.bincount(strata, weights=values, minlength=len(population))
+    squares = np.bincount(strata, weights=values * values, minlength=len(population))
+
+    n = counts[sampled]
+    means = sums[sampled] / n
+    pooled = values.var(ddof=1) if len(values) > 1 else 0.0
+    variances = np.where(
+        n > 1, (squares[sampled] - n * means * means) / np.maximum(n - 1, 1), pooled
+    )
+    variances = np.maximum(variances, 0.0)
+
+    weights = population[sampled] / population[sampled].sum()
+    fpc = 1.0 - n / population[sampled]
+    estimate = float((weights * means).sum())
+    variance = float((weights * weights * variances * fpc / n).sum())
+    return estimate, variance
+
+
+class ProgressiveSampler:
+    """
+    Plans sampling rounds over one file and tracks the running estimates.
+
+    Reviews are drawn in a fixed random order, stratified by the dataset's
+    rating unless `stratify` is off. After each round the overall and
+    weighted AI rating, mean sentiment and sentiment category shares are
+    estimated with `confidence` intervals. Sampling stops once both rating
+    intervals are narrower than `target_width` (rating points), when
+    `budget` reviews have been sent, or when the file is exhausted.
+    Each round is sized from the current interval width, assuming it
+    shrinks with the square root of the sample size.
+    """
+
+    def __init__(self, target_width=None, budget=None, initial_size=None, confidence=None,
+                 stratify=None, seed=None):
+        self.target_width = SAMPLE_TARGET_WIDTH if target_width is None else target_width
+        self.budget = SAMPLE_BUDGET if budget is None else budget
+        self.initial_size = SAMPLE_INITIAL_SIZE if initial_size is None else initial_size
+        self.confidence = SAMPLE_CONFIDENCE if confidence is None else confidence
+        self.stratify = SAMPLE_STRATIFY if stratify is None else stratify
+        self.seed = SAMPLE_SEED if seed is None else seed
+
+        self.total = 0
+        self.sent = 0
+        self.stop_reason = None
+        self.rounds = []
+
+        self._z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        self._strata = None
+        self._population = None
+        self._order = None
+        self._positions = []
+        self._ratings = []
+        self._sentiments = []
+
+    def plan(self, total, user_ratings=None):
+        """
+        Fixes the sampling order for a file of `total` reviews.
+        """
+        self.total = total
+        if self.stratify and user_ratings is not None:
+            self._strata = rating_strata(user_ratings)
+        else:
+            self._strata = np.zeros(total, dtype=np.int64)
+        self._population = np.bincount(self._strata).astype(float)
+        self._order = sample_order(self._strata, self.seed)
+
+    @property
+    def limit(self):
+        return min(self.total, self.budget) if self.budget else self.total
+
+    def next_round(self):
+        """
+        Positions of the reviews to analyze next; empty once sampling stops.
+        """
+        if self.stop_reason is not None:
+            return self._order[:0]
+
+        if self.sent >= self.total:
+            self.stop_reason = "exhausted"
+            return self._order[:0]
+
+        if not self.rounds:
+            size = self.initial_size
+        else:
+            widths = [self.rounds[-1][metric]["width"] for metric in TARGET_METRICS]
+            width = math.nan if any(math.isnan(w) for w in widths) else max(widths)
+            if width <= self.target_width:
+                self.stop_reason = "target_width"
+                return self._order[:0]
+
+            if math.isnan(width):
+                # Nothing analyzed yet (e.g. every call failed)
+                size = self.initial_size
+            else:
+                analyzed = self.rounds[-1]["analyzed"]
+                # A zero target never stops on width; rounds grow at the cap
+                needed = (analyzed * (width / self.target_width) ** 2 * ROUND_SIZE_MARGIN
+                          if self.target_width > 0 else math.inf)
+                size = min(needed - self.sent, self.sent * MAX_ROUND_GROWTH)
+            size = max(int(math.ceil(size)), self.initial_size)
+
+        size = min(size, self.limit - self.sent)
+        if size <= 0:
+            self.stop_reason = "budget"
+            return self._order[:0]
+
+        positions = self._order[self.sent:self.sent + size]
+        self.sent += size
+        return positions
+
+    def add_round(self, positions, ids, results):
+        """
+        Records the analyzed results of one round (`ids` aligned with
+        `positions`) and returns the round's estimates.
+        """
+        position_of = dict(zip(ids, positions))
+        for result in results:
+            pos = position_of.get(result["id"])
+            if pos is not None:
+                self._positions.append(pos)
+                self._ratings.append(result["ai_rating"])
+                self._sentiments.append(result["sentiment"])
+
+        report = {"round": len(self.rounds) + 1, "sampled": self.sent, "analyzed": len(self._positions)}
+        report.update(self.estimates())
+        self.rounds.append(report)
+        return report
+
+    def estimates(self):
+        """
+        Current estimates, each as {estimate, ci_low, ci_high, width}.
+        """
+        strata = self._strata[np.asarray(self._positions, dtype=np.int64)]
+        ratings = np.asarray(self._ratings, dtype=float)
+        sentiments = np.asarray(self._sentiments, dtype=float)
+
+        estimates = {"overall_ai_rating": self._interval(*stratified_mean(ratings, strata, self._population))}
+
+        # Sentiment-weighted rating is a ratio of two means; its variance
+        # comes from the linearized residuals
+        weights = np.abs(sentiments)
+        weight_mean, _ = stratified_mean(weights, strata, self._population)
+        if weight_mean > 0:
+            weighted_total, _ = stratified_mean(ratings * weights, strata, self._population)
+            ratio = weighted_total / weight_mean
+            residuals = (ratings - ratio) * weights
+            _, residual_variance = stratified_mean(residuals, strata, self._population)
+            estimates["weighted_rating"] = self._interval(ratio, residual_variance / weight_mean ** 2)
+        else:
+            estimates["weighted_rating"] = estimates["overall_ai_rating"]
+
+        estimates["mean_sentiment"] = self._interval(*stratified_mean(sentiments, strata, self._population))
+
+        codes = categorize_sentiments(sentiments).codes
+        estimates["sentiment_distribution"] = {
+            category: self._interval(*stratified_mean((codes == code).astype(float), strata, self._population))
+            for code, category in enumerate(SENTIMENT_CATEGORIES)
+        }
+        return estimates
+
+    def _interval(self, estimate, variance):
+        half = self._z * math.sqrt(variance) if not math.isnan(variance) else math.nan
+        return {
+            "estimate": round(estimate, 4),
+            "ci_low": round(estimate - half, 4),
+            "ci_high": round(estimate + half, 4),
+            "width": round(2 * half, 4)
+        }
+
+    def summary(self):
+        return {
+            "target_width": self.target_width,
+            "budget": self.budget,
+            "confidence": self.confidence,
+            "stratified": bool(self.stratify and len(self._population) > 1),
+            "strata": len(self._population),
+            "total_reviews": self.total,
+            "sampled": self.sent,
+            "analyzed": len(self._positions),
+            "sampled_fraction": round(self.sent / self.total, 4) if self.total else 0.0,
+            "stop_reason": self.stop_reason,
+            "estimates": {key: value for key, value in self.rounds[-1].items()
+                          if key not in ("round", "sampled", "analyzed")} if self.rounds else None,
+            "rounds": self.rounds
+        }
@@ -0,0 +1,161 @@
+# Prompt token accounting and long-review truncation node
+import re
+from collections import Counter
+from src.config.settings import (
+    REVIEW_MAX_TOKENS,
+    REVIEW_TRUNCATION_POLICY,
+    REVIEW_HEAD_RATIO,
+)
+
+
+TRUNCATION_POLICIES = ("none", "head_tail", "extractive")
+
+ELLIPSIS = " [...] "
+
+_SENTENCE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)")
+_WORD = re.compile(r"[a-z']+")
+
+# Words too common to say anything about what a review is about
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on", "at", "for", "with",
+    "by", "from", "as", "is", "was", "were", "are", "be", "been", "it", "its", "this", "that",
+    "these", "those", "i", "we", "you", "he", "she", "they", "me", "us", "my", "our", "your",
+    "their", "them", "so", "than", "then", "there", "had", "has", "have", "do", "did", "does",
+    "not", "no", "very", "just", "also", "which", "who", "what", "when", "all", "would", "could",
+}
+
+
+def estimate_tokens(text):
+    """
+    Rough prompt token estimate (~4 characters per token for English text).
+    """
+    return len(text) // 4 + 1
+
+
+def truncate_head_tail(text, max_tokens, head_ratio=None):
+    """
+    Keeps the beginning and end of the review (where the verdict usually is)
+    and drops the middle, cutting on word boundaries.
+    """
+    if head_ratio is None:
+        head_ratio = REVIEW_HEAD_RATIO
+
+    max_chars = max(0, (max_tokens - 1) * 4 - len(ELLIPSIS))
+    if len(text) <= max_chars:
+        return text
+
+    head_chars = int(max_chars * head_ratio)
+    tail_chars = max_chars - head_chars
+
+    head = text[:head_chars]
+    if " " in head:
+        head = head[:head.rfind(" ")]
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    if " " in tail:
+        tail = tail[tail.find(" ") + 1:]
+
+    return head.rstrip() + ELLIPSIS + tail.lstrip()
+
+
+def select_sentences(text, max_tokens):
+    """
+    Extractive selection: always keeps the first and last sentence, then adds
+    the sentences whose content words appear in the most other sentences,
+    until the budget is used. Repeated sentences are kept once and the
+    selection keeps the original order.
+    """
+    sentences = []
+    seen = set()
+    for sentence in _SENTENCE.findall(text):
+        sentence = sentence.strip()
+        key = sentence.lower()
+        if sentence and key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+
+    if len(sentences) <= 2:
+        return truncate_head_tail(text, max_tokens)
+
+    words = [set(_WORD.findall(s.lower())) - STOPWORDS for s in sentences]
+    frequency = Counter(w for sentence_words in words for w in sentence_words)
+
+    def score(i):
+        if not words[i]:
+            return 0.0
+        return sum(frequency[w] for w in words[i]) / len(words[i])
+
+    last = len(sentences) - 1
+    order = [0, last] + sorted(range(1, last), key=lambda i: (-score(i), i))
+
+    budget = (max_tokens - 1) * 4
+    chosen = set()
+    used = 0
+    for i in order:
+        # Room for the sentence, a separator and a possible "[...]" marker
+        cost = len(sentences[i]) + 7
+        if used + cost > budget:
+            continue
+        chosen.add(i)
+        used += cost
+
+    if not chosen:
+        return truncate_head_tail(text, max_tokens)
+
+    parts = []
+    previous = None
+    for i in sorted(chosen):
+        if previous is not None and i != previous + 1:
+            parts.append("[...]")
+        parts.append(sentences[i])
+        previous = i
+    return " ".join(parts)
+
+
+def fit_review(text, max_tokens=None, policy=None):
+    """
+    Applies the truncation policy to one review.
+    Returns (prompt_text, original_tokens, kept_tokens).
+    """
+    if max_tokens is None:
+        max_tokens = REVIEW_MAX_TOKENS
+    if policy is None:
+        policy = REVIEW_TRUNCATION_POLICY
+    if policy not in TRUNCATION_POLICIES:
+        raise ValueError(f"Unknown truncation policy '{policy}'. Expected one of {TRUNCATION_POLICIES}")
+
+    text = str(text)
+    original_tokens = estimate_tokens(text)
+    if policy == "none" or not max_tokens or original_tokens <= max_tokens:
+        return text, original_tokens, original_tokens
+
+    if policy == "head_tail":
+        fitted = truncate_head_tail(text, max_tokens)
+    else:
+        fitted = select_sentences(text, max_tokens)
+
+    return fitted, original_tokens, estimate_tokens(fitted)
+
+
+def apply_token_budget(reviews, max_tokens=None, policy=None):
+    """
+    Fits every review to the per-review token budget before it is sent.
+    Returns the prompt texts plus a token accounting summary.
+    """
+    fitted_reviews = []
+    tokens_before = 0
+    tokens_after = 0
+    truncated = 0
+
+    for review_text in reviews:
+        fitted, original_tokens, kept_tokens = fit_review(review_text, max_tokens, policy)
+        fitted_reviews.append(fitted)
+        tokens_before += original_tokens
+        tokens_after += kept_tokens
+        truncated += kept_tokens < original_tokens
+
+    return fitted_reviews, {
+        "reviews_truncated": truncated,
+        "review_tokens_before": tokens_before,
+        "review_tokens_after": tokens_after,
+        "review_tokens_saved": tokens_before - tokens_after
+    }
@@ -1,20 +1,205 @@
-from src.modules.csv_loader import load_csv
-from src.modules.review_analyzer import analyze_reviews
-from src.modules.aggregation import aggregate_results
-from src.modules.outlier_detection import detect_outliers
-from src.modules.impact_analysis import analyze_impact
+from contextlib import nullcontext
+from src.modules.csv_loader import load_reviews, iter_review_chunks, resolve_path
+from src.modules.review_analyzer import (
+    analyze_reviews,
+    analyze_reviews_concurrent,
+    analyze_reviews_batched,
+)
+from src.modules.deduplication import deduplicate_reviews, expand_results
+from src.modules.token_budget import apply_token_budget
+from src.modules.pre_classifier import PreClassifier
+from src.modules.sampling import ProgressiveSampler
+from src.modules.aggregation import (
+    aggregate_results,
+    parse_segments,
+    build_segments,
+    StreamingAggregator,
+)
+from src.modules.outlier_detection import detect_outliers, StreamingOutlierDetector
+from src.modules.impact_analysis import analyze_impact, StreamingImpactTracker
+from src.utils.cache import get_cache
+from src.utils.result_store import ResultStore
+from src.utils.journal import AnalysisJournal
+from src.utils.metrics import PipelineMetrics
+from src.utils.result_table import compact_ratings_frame, example_table, RecordView
+from src.config.settings import (
+    ANALYSIS_CONCURRENCY,
+    BATCH_PROMPTING_ENABLED,
+    DEDUP_ENABLED,
+    STREAMING_CHUNK_SIZE,
+    CHECKPOINT_ENABLED,
+    PRECLASSIFY_ENABLED,
+    SEGMENT_COLUMNS,
+    METRICS_PROMETHEUS_PATH,
+    METRICS_LOG_PATH,
+)
 
 
-def run_pipeline(file_path):
+def run_pipeline(file_path, concurrency=None, use_cache=True, batch_prompting=None,
+                 deduplicate=None, result_store=None, checkpoint=None, metrics=None, progress=None,
+                 pre_classify=None, segments=None, sample=None, run_id=None):
+    """
+    Runs the full analysis on a review file (CSV, Parquet, Arrow IPC or JSONL).
+    `result_store` (a ResultStore or a path to one) enables incremental runs:
+    only new IDs and reviews whose text changed are sent to the LLM, and the
+    headline ratings are updated from the store's running aggregates.
+    Only the LLM work and the headline statistics scale with the changed
+    rows: the per-review table, outliers, impact scores and segment metrics
+    depend on every row and are rebuilt (vectorized) from the stored results. A changed review whose
+    re-analysis fails loses its stored result; the counts and the dropped
+    IDs are returned under `incremental`.
+    A path is loaded before the run and saved after it if anything changed.
+    With `checkpoint`, every parsed result is journaled to disk; a run that
+    dies part-way resumes from the journal on the same file with the same
+    options; `run_id` keeps concurrent runs (e.g. jobs) on separate journals.
+    Stage timings and LLM telemetry are returned under `metrics`.
+    `progress` (an AnalysisProgress) receives per-review events and can
+    cancel the run, which raises AnalysisCancelled.
+    With `pre_classify` (True or a PreClassifier), confidently scored
+    reviews skip the LLM; the savings and divergence are returned under
+    `pre_classification`.
+    `segments` (column names, "Date:M" for date buckets, default
+    SEGMENT_COLUMNS) adds per-segment metrics under `segment_stats`; the
+    user-vs-AI rating gap is reported under `user_rating_stats`.
+    With `sample` (True or a ProgressiveSampler), only a sample of the
+    reviews is analyzed, in rounds, until the confidence intervals are
+    narrow enough or the budget is spent. The headline ratings are then the
+    sample's estimates, and the intervals after each round are returned
+    under `sampling`.
+    Per-review data lives in one compact `ratings_dataframe`; `all_reviews`
+    and the impact lists are lazy RecordViews into it and outliers are
+    positional indices (see src.utils.result_table.save_result to persist).
+    """
 
-    print("Loading CSV...")
-    data = load_csv(file_path)
+    if concurrency is None:
+        concurrency = ANALYSIS_CONCURRENCY
+    if batch_prompting is None:
+        batch_prompting = BATCH_PROMPTING_ENABLED
+    if deduplicate is None:
+        deduplicate = DEDUP_ENABLED
+    if checkpoint is None:
+        checkpoint = CHECKPOINT_ENABLED
+    if metrics is None:
+        metrics = PipelineMetrics()
+    pre_classifier = _pre_classifier(pre_classify)
+    segment_specs = parse_segments(SEGMENT_COLUMNS if segments is None else segments)
+    sampler = _sampler(sample)
+    if sampler is not None and result_store is not None:
+        raise ValueError("Sampling cannot be combined with an incremental result store.")
 
-    print("Running LLM analysis...")
-    analysis_results = analyze_reviews(
-        data["reviews"],
-        data["ids"]
-    )
+    # Hits and misses are counted in this run's metrics; the cache is shared
+    cache = get_cache() if use_cache else None
+
+    print("Loading reviews...")
+    with metrics.stage("load_csv"):
+        data = load_reviews(file_path, extra_columns=[column for column, _ in segment_specs])
+    metrics.reviews = data["total_reviews"]
+
+    # Options that change the journaled LLM results
+    journal = AnalysisJournal.for_file(
+        resolve_path(file_path),
+        options={"batch_prompting": bool(batch_prompting), "deduplicate": bool(deduplicate)},
+        run_id=run_id
+    ) if checkpoint else None
+
+    store = None
+    store_path = None
+    incremental = None
+    if result_store is not None:
+        if isinstance(result_store, ResultStore):
+            store = result_store
+        else:
+            store_path = result_store
+            store = ResultStore.load(store_path)
+
+    if sampler is not None:
+        analysis_results, dedup = _analyze_sampled(
+            data,
+            sampler,
+            journal,
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            metrics,
+            progress,
+            pre_classifier=pre_classifier
+        )
+    elif store is None:
+        analysis_results, dedup = _analyze_checkpointed(
+            data["reviews"],
+            data["ids"],
+            journal,
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            metrics,
+            progress,
+            user_ratings=data["ratings"],
+            pre_classifier=pre_classifier
+        )
+    else:
+        pending, removed = store.diff(data["ids"], data["reviews"])
+        print(f"Incremental run: {len(pending)} new or changed, "
+              f"{data['total_reviews'] - len(pending)} reused, {len(removed)} removed")
+
+        for review_id in removed:
+            store.remove(review_id)
+
+        new_results, dedup = _analyze_checkpointed(
+            [data["reviews"][pos] for pos in pending],
+            [data["ids"][pos] for pos in pending],
+            journal,
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            metrics,
+            progress,
+            user_ratings=[data["ratings"][pos] for pos in pending] if data["ratings"] is not None else None,
+            pre_classifier=pre_classifier
+        )
+
+        id_to_text = {data["ids"][pos]: data["reviews"][pos] for pos in pending}
+        for result in new_results:
+            store.update(result, id_to_text[result["id"]])
+
+        # A changed review whose re-analysis failed must not keep its old
+        # result; dropping it also makes the next run retry it
+        analyzed = {result["id"] for result in new_results}
+        failed = [review_id for review_id in id_to_text if review_id not in analyzed]
+        stale = [review_id for review_id in failed if review_id in store.records]
+        for review_id in stale:
+            store.remove(review_id)
+        if failed:
+            print(f"{len(failed)} new or changed reviews failed ({len(stale)} stale results dropped)")
+
+        incremental = {
+            "analyzed": len(new_results),
+            "reused": data["total_reviews"] - len(pending),
+            "removed": len(removed),
+            "failed": len(failed),
+            "stale_dropped": stale
+        }
+
+        if store_path is not None and (pending or removed):
+            store.save(store_path)
+
+        analysis_results = store.results_for(data["ids"])
+
+    if journal is not None:
+        # Results now live in the cache/result store; the journal only guards the run
+        journal.discard()
+
+    cache_stats = None
+    if cache is not None:
+        cache.evict()
+        cache_stats = cache.stats(metrics)
+        print(f"Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+    if pre_classifier is not None:
+        _print_pre_classification(pre_classifier.summary())
     
     # Check if any reviews were successfully analyzed
     if not analysis_results:
@@ -28,29 +213,433 @@ def run_pipeline(file_path):
         )
 
     print("Aggregating results...")
-    aggregation = aggregate_results(
-        analysis_results,
-        data["reviews"],
-        data["ids"]
-    )
+    with metrics.stage("aggregation"):
+        # Incremental runs take the headline numbers from the store's
+        # running aggregates instead of recomputing them over every row
+        aggregation = aggregate_results(
+            analysis_results,
+            data["reviews"],
+            data["ids"],
+            user_ratings=data["ratings"],
+            segments=build_segments(data["columns"], segment_specs),
+            summary=store.summary() if store is not None else None
+        )
+
+        if sampler is not None:
+            # Headline numbers are the stratified estimates, not plain sample means
+            estimates = sampler.estimates()
+            aggregation["overall_ai_rating"] = round(estimates["overall_ai_rating"]["estimate"], 2)
+            aggregation["weighted_rating"] = round(estimates["weighted_rating"]["estimate"], 2)
+            aggregation["sentiment_stats"]["mean_sentiment"] = round(estimates["mean_sentiment"]["estimate"], 3)
 
     df = aggregation["ratings_dataframe"]
 
     print("Detecting outliers...")
-    outliers = detect_outliers(df)
+    with metrics.stage("outlier_detection"):
+        outliers = detect_outliers(df)
 
     print("Analyzing impact...")
-    impacts = analyze_impact(df)
+    with metrics.stage("impact_analysis"):
+        impacts = analyze_impact(df)
+
+    # Statistics are computed at full precision above; the result keeps a
+    # single compact table and every list refers into it by position
+    with metrics.stage("compaction"):
+        table = compact_ratings_frame(df)
+        impacts = {name: view.over(table) for name, view in impacts.items()}
+    del df, aggregation["ratings_dataframe"]
 
     final_output = {
         "total_reviews": data["total_reviews"],
         "overall_ai_rating": aggregation["overall_ai_rating"],
         "weighted_rating": aggregation["weighted_rating"],
         "sentiment_stats": aggregation["sentiment_stats"],
-        "ratings_dataframe": aggregation["ratings_dataframe"],
+        "rating_stats": aggregation["rating_stats"],
+        "sentiment_counts": aggregation["sentiment_counts"],
+        "user_rating_stats": aggregation["user_rating_stats"],
+        "segment_stats": aggregation["segment_stats"],
+        "ratings_dataframe": table,
         "outliers": outliers,
         "impact_analysis": impacts,
-        "all_reviews": df[["id", "review_text", "ai_rating", "sentiment", "reasoning"]].to_dict("records")
+        "all_reviews": RecordView(table),
+        "cache_stats": cache_stats,
+        "deduplication": {
+            key: dedup[key]
+            for key in ("total_reviews", "unique_reviews", "exact_duplicates", "near_duplicates")
+        } if dedup is not None else None,
+        "pre_classification": pre_classifier.summary() if pre_classifier is not None else None,
+        "sampling": sampler.summary() if sampler is not None else None,
+        "incremental": incremental,
+        "metrics": metrics.snapshot()
     }
 
+    export_metrics(metrics, file_path)
+
     return final_output
+
+
+def export_metrics(metrics, file_path):
+    """
+    Writes the run's metrics to the configured Prometheus textfile and JSON log.
+    """
+    if METRICS_PROMETHEUS_PATH:
+        metrics.write_prometheus(METRICS_PROMETHEUS_PATH)
+    if METRICS_LOG_PATH:
+        metrics.append_json_log(METRICS_LOG_PATH, source=str(file_path))
+
+
+def _pre_classifier(pre_classify):
+    if pre_classify is None:
+        pre_classify = PRECLASSIFY_ENABLED
+    if isinstance(pre_classify, PreClassifier):
+        return pre_classify
+    return PreClassifier() if pre_classify else None
+
+
+def _sampler(sample):
+    if isinstance(sample, ProgressiveSampler):
+        return sample
+    return ProgressiveSampler() if sample else None
+
+
+def _print_sampling_round(report, confidence):
+    rating = report["overall_ai_rating"]
+    weighted = report["weighted_rating"]
+    print(f"Round {report['round']}: {report['analyzed']} reviews analyzed, "
+          f"AI rating {rating['estimate']:.2f} ± {rating['width'] / 2:.3f}, "
+          f"weighted {weighted['estimate']:.2f} ± {weighted['width'] / 2:.3f} "
+          f"({confidence:.0%} CI)")
+
+
+def _print_pre_classification(report):
+    audit = report["divergence"]["audit"]
+    line = (f"Pre-classifier: {report['llm_calls_saved']} of {report['scored']} LLM calls saved "
+            f"(threshold {report['threshold']:g})")
+    if audit["reviews"]:
+        line += (f"; audit of {audit['reviews']}: rating MAE {audit['rating_mae']}, "
+                 f"sentiment MAE {audit['sentiment_mae']}, "
+                 f"category agreement {audit['category_agreement']:.0%}")
+    print(line)
+
+
+def _analyze(reviews, ids, concurrency, cache, batch_prompting, deduplicate, on_result=None,
+             metrics=None, progress=None, user_ratings=None, pre_classifier=None):
+    """
+    Pre-classifies and deduplicates (both optional) and runs the selected
+    analysis engine on what is left.
+    Returns one result per analyzed review plus the dedup summary.
+    `on_result` receives one LLM result per original review as soon as it
+    is known (pre-classified results are only returned).
+    """
+
+    accepted = None
+    if pre_classifier is not None:
+        print("Pre-classifying reviews...")
+        with _stage(metrics, "pre_classification"):
+            accepted, escalate = pre_classifier.split(reviews, ids, user_ratings)
+        print(f"{len(accepted)} of {len(reviews)} reviews scored offline, "
+              f"{len(escalate)} sent to the LLM")
+        if metrics is not None:
+            metrics.increment("preclassified_reviews", len(accepted))
+
+        # Offline estimates are cheap to redo and are not passed to
+        # `on_result`, so a checkpoint never replays them as LLM results
+        if progress is not None and accepted:
+            progress.expect(len(accepted))
+            for result in accepted:
+                progress.review_done(result)
+
+        all_ids = ids
+        reviews = [reviews[pos] for pos in escalate]
+        ids = [ids[pos] for pos in escalate]
+
+    dedup = None
+    original_ids = ids
+    if deduplicate:
+        print("Deduplicating reviews...")
+        with _stage(metrics, "deduplication"):
+            dedup = deduplicate_reviews(reviews, ids)
+        reviews, ids = dedup["reviews"], dedup["ids"]
+        print(f"{dedup['unique_reviews']} unique of {dedup['total_reviews']} reviews "
+              f"({dedup['exact_duplicates']} exact, {dedup['near_duplicates']} near duplicates)")
+
+        if on_result is not None:
+            # Fan each representative's result out to its whole group
+            members_by_id = dict(zip(dedup["ids"], dedup["members"]))
+            notify_member = on_result
+
+            def on_result(result):
+                for pos in members_by_id.get(result["id"], ()):
+                    notify_member({**result, "id": original_ids[pos]})
+
+    # Oversized reviews are cut to the per-review token budget; the cache is
+    # keyed on the text actually sent
+    with _stage(metrics, "token_budget"):
+        reviews, budget = apply_token_budget(reviews)
+    if budget["reviews_truncated"]:
+        print(f"Truncated {budget['reviews_truncated']} oversized review(s), "
+              f"saving ~{budget['review_tokens_saved']} prompt tokens")
+    if metrics is not None:
+        for key, value in budget.items():
+            metrics.increment(key, value)
+
+    print("Running LLM analysis...")
+    with _stage(metrics, "llm_analysis"):
+        if batch_prompting:
+            analysis_results = analyze_reviews_batched(
+                reviews,
+                ids,
+                max_concurrency=concurrency,
+                cache=cache,
+                on_result=on_result,
+                metrics=metrics,
+                progress=progress
+            )
+        elif concurrency > 1:
+            analysis_results = analyze_reviews_concurrent(
+                reviews,
+                ids,
+                max_concurrency=concurrency,
+                cache=cache,
+                on_result=on_result,
+                metrics=metrics,
+                progress=progress
+            )
+        else:
+            analysis_results = analyze_reviews(
+                reviews,
+                ids,
+                cache=cache,
+                on_result=on_result,
+                metrics=metrics,
+                progress=progress
+            )
+
+    if dedup is not None:
+        analysis_results = expand_results(analysis_results, dedup, original_ids)
+
+    if accepted is not None:
+        pre_classifier.compare(analysis_results)
+        # Back to input order
+        position = {review_id: pos for pos, review_id in enumerate(all_ids)}
+        analysis_results = sorted(accepted + analysis_results, key=lambda result: position[result["id"]])
+
+    return analysis_results, dedup
+
+
+def _stage(metrics, name):
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def _analyze_checkpointed(reviews, ids, journal, concurrency, cache, batch_prompting, deduplicate,
+                          metrics=None, progress=None, user_ratings=None, pre_classifier=None):
+    """
+    `_analyze` that skips IDs already recorded in `journal` and journals
+    every new result as it arrives.
+    """
+
+    if journal is None:
+        return _analyze(reviews, ids, concurrency, cache, batch_prompting, deduplicate,
+                        metrics=metrics, progress=progress, user_ratings=user_ratings,
+                        pre_classifier=pre_classifier)
+
+    completed = journal.completed()
+    pending = [pos for pos, review_id in enumerate(ids) if review_id not in completed]
+    if completed:
+        print(f"Resuming from checkpoint: {len(ids) - len(pending)} of {len(ids)} reviews already analyzed")
+
+    try:
+        new_results, dedup = _analyze(
+            [reviews[pos] for pos in pending],
+            [ids[pos] for pos in pending],
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            on_result=journal.append,
+            metrics=metrics,
+            progress=progress,
+            user_ratings=[user_ratings[pos] for pos in pending] if user_ratings is not None else None,
+            pre_classifier=pre_classifier
+        )
+    finally:
+        journal.flush()
+
+    by_id = {**completed, **{result["id"]: result for result in new_results}}
+    analysis_results = [by_id[review_id] for review_id in ids if review_id in by_id]
+    return analysis_results, dedup
+
+
+def _analyze_sampled(data, sampler, journal, concurrency, cache, batch_prompting, deduplicate,
+                     metrics=None, progress=None, pre_classifier=None):
+    """
+    `_analyze_checkpointed` over the sampler's rounds of the loaded reviews,
+    until it stops. Returns the sample's results and the dedup totals.
+    """
+
+    sampler.plan(data["total_reviews"], data["ratings"])
+    analysis_results = []
+    dedup = None
+
+    while True:
+        positions = sampler.next_round()
+        if not len(positions):
+            break
+
+        ids = data["ids"][positions]
+        results, round_dedup = _analyze_checkpointed(
+            data["reviews"][positions],
+            ids,
+            journal,
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            metrics,
+            progress,
+            user_ratings=data["ratings"][positions] if data["ratings"] is not None else None,
+            pre_classifier=pre_classifier
+        )
+        analysis_results.extend(results)
+        _print_sampling_round(sampler.add_round(positions, ids, results), sampler.confidence)
+
+        if round_dedup is not None:
+            # Each round is deduplicated on its own; the summary adds them up
+            dedup = {key: (dedup[key] if dedup else 0) + round_dedup[key]
+                     for key in ("total_reviews", "unique_reviews", "exact_duplicates", "near_duplicates")}
+
+    print(f"Sampling stopped ({sampler.stop_reason}): {sampler.sent} of {sampler.total} reviews sent")
+    if metrics is not None:
+        metrics.increment("sampled_reviews", sampler.sent)
+    return analysis_results, dedup
+
+
+def iter_analysis_results(file_path, chunk_size=None, concurrency=None, cache=None,
+                          batch_prompting=None, deduplicate=None, stats=None, metrics=None,
+                          progress=None, pre_classifier=None):
+    """
+    Generator over analyzed reviews, reading and analyzing the input one chunk
+    at a time. Each yielded result carries its `review_text`.
+    Deduplication is applied within each chunk to keep memory bounded.
+    """
+
+    if chunk_size is None:
+        chunk_size = STREAMING_CHUNK_SIZE
+    if concurrency is None:
+        concurrency = ANALYSIS_CONCURRENCY
+    if batch_prompting is None:
+        batch_prompting = BATCH_PROMPTING_ENABLED
+    if deduplicate is None:
+        deduplicate = DEDUP_ENABLED
+
+    for chunk_number, chunk in enumerate(iter_review_chunks(file_path, chunk_size), 1):
+        print(f"Chunk {chunk_number}: {chunk['total_reviews']} reviews")
+        if stats is not None:
+            stats["total_reviews"] = stats.get("total_reviews", 0) + chunk["total_reviews"]
+
+        results, _ = _analyze(
+            chunk["reviews"],
+            chunk["ids"],
+            concurrency,
+            cache,
+            batch_prompting,
+            deduplicate,
+            metrics=metrics,
+            progress=progress,
+            user_ratings=chunk["ratings"],
+            pre_classifier=pre_classifier
+        )
+
+        id_to_text = dict(zip(chunk["ids"], chunk["reviews"]))
+        for result in results:
+            yield {**result, "review_text": id_to_text.get(result["id"])}
+
+
+def run_pipeline_streaming(file_path, chunk_size=None, concurrency=None, use_cache=True,
+                           batch_prompting=None, deduplicate=None, top_k=None, metrics=None,
+                           progress=None, pre_classify=None):
+    """
+    Bounded-memory variant of `run_pipeline` for very large inputs.
+    Aggregates, outlier bounds and counts and impact scores are maintained
+    incrementally. The result has the `run_pipeline` shape, but its
+    `ratings_dataframe` holds only the bounded set of example reviews that
+    outlier `indices` and the impact RecordViews refer to; `all_reviews` and
+    `most_influential_weighted_reviews` are not built.
+    """
+
+    if metrics is None:
+        metrics = PipelineMetrics()
+    pre_classifier = _pre_classifier(pre_classify)
+
+    # Hits and misses are counted in this run's metrics; the cache is shared
+    cache = get_cache() if use_cache else None
+
+    aggregator = StreamingAggregator()
+    outlier_detector = StreamingOutlierDetector()
+    impact_tracker = StreamingImpactTracker(k=top_k)
+    stats = {}
+
+    print("Streaming reviews through analysis...")
+    for result in iter_analysis_results(
+        file_path,
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+        cache=cache,
+        batch_prompting=batch_prompting,
+        deduplicate=deduplicate,
+        stats=stats,
+        metrics=metrics,
+        progress=progress,
+        pre_classifier=pre_classifier
+    ):
+        with metrics.stage("streaming_aggregation"):
+            aggregator.add(result)
+            outlier_detector.add(result)
+            impact_tracker.add(result)
+    metrics.reviews = stats.get("total_reviews", 0)
+
+    cache_stats = None
+    if cache is not None:
+        cache.evict()
+        cache_stats = cache.stats(metrics)
+        print(f"Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+    if pre_classifier is not None:
+        _print_pre_classification(pre_classifier.summary())
+
+    if aggregator.rating.count == 0:
+        raise RuntimeError(
+            "FATAL: No reviews were successfully analyzed.\n"
+            "Possible causes:\n"
+            "  1. LLM API is not accessible (check GROQ_API_KEY in .env)\n"
+            "  2. LLM service is down\n"
+            "  3. All review texts are empty or invalid\n"
+            "Please check the error logs above and try again."
+        )
+
+    aggregation = aggregator.summary()
+
+    # Outlier and impact lists share one table of the retained examples
+    table, positions = example_table({
+        **outlier_detector.example_records(), **impact_tracker.example_records()
+    })
+    outliers = outlier_detector.finalize(positions)
+    impacts = impact_tracker.finalize(table, positions)
+
+    export_metrics(metrics, file_path)
+
+    return {
+        "total_reviews": stats.get("total_reviews", 0),
+        "analyzed_reviews": aggregator.rating.count,
+        "overall_ai_rating": aggregation["overall_ai_rating"],
+        "weighted_rating": aggregation["weighted_rating"],
+        "sentiment_stats": aggregation["sentiment_stats"],
+        "rating_stats": aggregation["rating_stats"],
+        "sentiment_counts": aggregation["sentiment_counts"],
+        "ratings_dataframe": table,
+        "outliers": outliers,
+        "impact_analysis": impacts,
+        "cache_stats": cache_stats,
+        "pre_classification": pre_classifier.summary() if pre_classifier is not None else None,
+        "metrics": metrics.snapshot()
+    }
@@ -0,0 +1,227 @@
+# Local HTTP job service: queued pipeline runs shared by many clients
+import re
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.utils.jobs import JobManager, COMPLETED, QUEUED, RUNNING, DEFAULT_CLIENT
+from src.utils.batch import summarize_result
+from src.utils.dashboard import content_hash
+from src.utils.result_table import _to_builtin
+from src.modules.csv_loader import INPUT_FORMATS
+from src.modules.review_analyzer import start_shared_event_loop
+from src.config.settings import (
+    SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_JOBS, SERVICE_FINISHED_JOBS, SERVICE_MAX_UPLOAD_MB
+)
+
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/result|/report\.pdf)?$")
+
+_FLAG_OPTIONS = ("pre_classify", "batch_prompting", "deduplicate", "sample")
+
+
+def job_status(manager, job):
+    """
+    JSON-ready status of one job, with its live progress.
+    """
+    return {
+        "id": job.id,
+        "client": job.client,
+        "subscribers": len(job.subscribers),
+        "status": job.status,
+        "options": job.options,
+        "queue_position": manager.queue_position(job) if job.status == QUEUED else None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "error": job.error,
+        "progress": job.progress.snapshot()
+    }
+
+
+def parse_options(query):
+    """
+    `run_pipeline` options from the submission's query string.
+    """
+    options = {}
+    for name in _FLAG_OPTIONS:
+        if name in query:
+            options[name] = query[name][0].lower() in ("1", "true", "yes")
+    if "segments" in query:
+        options["segments"] = query["segments"][0]
+    return options
+
+
+def submission_suffix(query, headers):
+    """
+    Input file extension from `?format=`, `?filename=` or X-Filename (CSV by default).
+    """
+    if "format" in query:
+        suffix = "." + query["format"][0].lower().lstrip(".")
+    else:
+        filename = query.get("filename", [headers.get("X-Filename", "")])[0]
+        suffix = Path(filename).suffix.lower() or ".csv"
+
+    if suffix not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported input format: {suffix}")
+    return suffix
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+      POST   /jobs                   submit a file (request body), returns 202 + job status
+      GET    /jobs                   status of every job (?client= for one client's jobs)
+      GET    /jobs/<id>              status and progress of one job
+      GET    /jobs/<id>/result       JSON summary of a completed job
+      GET    /jobs/<id>/report.pdf   PDF report of a completed job
+      DELETE /jobs/<id>              drop the caller's subscription (cancels the job
+                                     once no client is waiting on it)
+      GET    /health                 queue and worker counts
+
+    Clients identify themselves with X-Client-Id (or ?client=). Submitting
+    a file that is already queued or running subscribes the client to the
+    existing job.
+    """
+
+    manager = None
+    max_upload_bytes = SERVICE_MAX_UPLOAD_MB * 1024 * 1024
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/health":
+            jobs = self.manager.jobs()
+            return self._send_json(200, {
+                "status": "ok",
+                "workers": self.manager.max_workers,
+                "queued": sum(job.status == QUEUED for job in jobs),
+                "running": sum(job.status == RUNNING for job in jobs)
+            })
+
+        if url.path == "/jobs":
+            client = query.get("client", [None])[0]
+            return self._send_json(200, [job_status(self.manager, job) for job in self.manager.jobs(client)])
+
+        match = _JOB_PATH.match(url.path)
+        job = self.manager.get(match.group(1)) if match else None
+        if job is None:
+            return self._send_error(404, "Job not found")
+
+        if match.group(2) is None:
+            return self._send_json(200, job_status(self.manager, job))
+        if job.status != COMPLETED:
+            return self._send_error(409, f"Job is {job.status}")
+
+        if match.group(2) == "/result":
+            return self._send_json(200, job.extra)
+
+        # reportlab is only needed once a report is requested
+        from src.modules.report_generator import render_pdf_report
+        appendix = query.get("appendix", ["0"])[0].lower() in ("1", "true", "yes")
+        self._send(200, render_pdf_report(job.result, appendix=appendix), "application/pdf")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            return self._send_error(404, "Not found")
+
+        query = parse_qs(url.query)
+        try:
+            suffix = submission_suffix(query, self.headers)
+        except ValueError as e:
+            return self._send_error(415, str(e))
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            return self._send_error(411, "Content-Length required")
+        length = int(length)
+        if length > self.max_upload_bytes:
+            return self._send_error(413, f"Upload exceeds {self.max_upload_bytes // (1024 * 1024)} MB")
+        if length == 0:
+            return self._send_error(400, "Empty upload")
+
+        body = self.rfile.read(length)
+        options = parse_options(query)
+        client = self._client(query)
+
+        # Same file with the same options is analyzed once, whoever submits it
+        key = hashlib.sha256(
+            f"{content_hash(body)}|{suffix}|{json.dumps(options, sort_keys=True)}".encode("utf-8")
+        ).hexdigest()
+        job = self.manager.submit(key, body, suffix=suffix, postprocess=summarize_result,
+                                  client=client, options=options, subscriber=client)
+
+        self._send_json(202, job_status(self.manager, job), headers={"Location": f"/jobs/{job.id}"})
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        match = _JOB_PATH.match(url.path)
+        job = self.manager.get(match.group(1)) if match and match.group(2) is None else None
+        if job is None:
+            return self._send_error(404, "Job not found")
+
+        client = self._client(parse_qs(url.query))
+        if client not in job.subscribers:
+            return self._send_error(403, "Client is not subscribed to this job")
+
+        cancelled = self.manager.cancel(job.id, client)
+        self._send_json(200, {**job_status(self.manager, job), "cancelled": cancelled})
+
+    def _client(self, query):
+        return self.headers.get("X-Client-Id") or query.get("client", [DEFAULT_CLIENT])[0]
+
+    def _send_json(self, code, payload, headers=None):
+        body = json.dumps(payload, default=_to_builtin).encode("utf-8")
+        self._send(code, body, "application/json", headers)
+
+    def _send_error(self, code, message):
+        self._send_json(code, {"error": message})
+
+    def _send(self, code, body, content_type, headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(host=SERVICE_HOST, port=SERVICE_PORT, workers=None, max_finished=None):
+    """
+    HTTP server whose jobs share one worker pool, LLM client, rate limiter,
+    circuit breaker and result cache. Async LLM calls of every job run on
+    one event loop, so they also share the client's connection pool.
+    """
+    start_shared_event_loop()
+
+    manager = JobManager(
+        max_workers=SERVICE_MAX_JOBS if workers is None else workers,
+        max_finished=SERVICE_FINISHED_JOBS if max_finished is None else max_finished
+    )
+    handler = type("Handler", (ServiceHandler,), {"manager": manager})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run the review analysis job service.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="concurrent analysis jobs (default: SERVICE_MAX_JOBS)")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers)
+    print(f"Review analysis service listening on http://{args.host}:{args.port} "
+          f"({server.RequestHandlerClass.manager.max_workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
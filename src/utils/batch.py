@@ -0,0 +1,218 @@
+# Parallel batch runs of the pipeline over many input files
+import os
+import glob
+import json
+import time
+from pathlib import Path
+from multiprocessing.managers import BaseManager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.utils.retry import RateLimiter, get_retry_policy
+from src.utils.result_table import save_result, _to_builtin
+from src.modules.csv_loader import INPUT_FORMATS
+from src.config.settings import BATCH_FILE_WORKERS, LLM_RPM_LIMIT, LLM_TPM_LIMIT
+
+
+SUMMARY_FILE = "batch_summary.json"
+
+
+class _LimiterManager(BaseManager):
+    pass
+
+
+_LimiterManager.register("RateLimiter", RateLimiter)
+
+
+def discover_inputs(sources, pattern=None):
+    """
+    Expands directories (files matching `pattern`, by default every
+    supported input format), glob patterns and plain paths into a sorted,
+    de-duplicated list of input files.
+    """
+    found = set()
+
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            if pattern is not None:
+                found.update(p for p in path.glob(pattern) if p.is_file())
+            else:
+                found.update(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in INPUT_FORMATS)
+        elif glob.has_magic(str(source)):
+            found.update(Path(p) for p in glob.glob(str(source)) if Path(p).is_file())
+        elif path.is_file():
+            found.add(path)
+        else:
+            raise FileNotFoundError(f"No such input file or directory: {source}")
+
+    return sorted(found)
+
+
+def output_stems(paths):
+    """
+    Output file name per input: its stem, prefixed with the parent
+    directory when two inputs share a stem.
+    """
+    counts = {}
+    for path in paths:
+        counts[path.stem] = counts.get(path.stem, 0) + 1
+
+    return {
+        path: path.stem if counts[path.stem] == 1 else f"{path.parent.name}_{path.stem}"
+        for path in paths
+    }
+
+
+def summarize_result(result, top_k=3):
+    """
+    JSON-ready headline numbers of one pipeline result.
+    """
+    outliers = result["outliers"]
+    return {
+        "total_reviews": result["total_reviews"],
+        "overall_ai_rating": result["overall_ai_rating"],
+        "weighted_rating": result["weighted_rating"],
+        "sentiment_stats": result["sentiment_stats"],
+        "rating_stats": result.get("rating_stats"),
+        "sentiment_counts": result.get("sentiment_counts"),
+        "user_rating_stats": result.get("user_rating_stats"),
+        "segment_stats": result["segment_stats"].to_dict(orient="records")
+        if result.get("segment_stats") is not None else None,
+        "outlier_counts": outliers.get("counts"),
+        "most_influential_reviews": result["impact_analysis"]["most_influential_reviews"][:top_k].to_list(),
+        "cache_stats": result.get("cache_stats"),
+        "deduplication": result.get("deduplication"),
+        "pre_classification": result.get("pre_classification"),
+        "sampling": result.get("sampling"),
+        "incremental": result.get("incremental"),
+        "metrics": result.get("metrics")
+    }
+
+
+def _init_worker(limiter):
+    # Every worker throttles against the same buckets in the manager process
+    if limiter is not None:
+        get_retry_policy().limiter = limiter
+
+
+def _process_file(file_path, output_dir, stem, pdf):
+    from src.pipeline import run_pipeline
+
+    started = time.monotonic()
+    result = run_pipeline(str(file_path))
+
+    json_path = output_dir / f"{stem}.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(summarize_result(result), f, indent=2, default=_to_builtin)
+
+    outputs = {"json": str(json_path)}
+
+    parquet_path = output_dir / f"{stem}.parquet"
+    save_result(result, parquet_path)
+    outputs["parquet"] = str(parquet_path)
+
+    if pdf:
+        # reportlab is only imported by workers that render a report
+        from src.modules.report_generator import generate_pdf_report
+        outputs["pdf"] = generate_pdf_report(result, str(output_dir / f"{stem}.pdf"))
+
+    return {
+        "total_reviews": result["total_reviews"],
+        "overall_ai_rating": result["overall_ai_rating"],
+        "weighted_rating": result["weighted_rating"],
+        "seconds": round(time.monotonic() - started, 3),
+        "outputs": outputs
+    }
+
+
+def run_batch(paths, output_dir="data/output", workers=None, pdf=True):
+    """
+    Runs the pipeline over `paths` on a process pool and writes per-file
+    JSON, Parquet and (optionally) PDF outputs plus a combined summary.
+
+    All workers share one LLM rate limiter, hosted in a manager process, so
+    LLM_RPM_LIMIT/LLM_TPM_LIMIT hold for the batch as a whole. The SQLite
+    result cache is opened by every worker on the same file. Largest files
+    are started first so a big export does not finish the batch alone.
+    A failed file is recorded in the summary and does not stop the others.
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        raise ValueError("No input files to process.")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if workers is None:
+        workers = BATCH_FILE_WORKERS
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+
+    stems = output_stems(paths)
+    ordered = sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+
+    manager = None
+    limiter = None
+    if LLM_RPM_LIMIT or LLM_TPM_LIMIT:
+        manager = _LimiterManager()
+        manager.start()
+        limiter = manager.RateLimiter(LLM_RPM_LIMIT, LLM_TPM_LIMIT)
+
+    print(f"Processing {len(paths)} files with {workers} workers...")
+    started = time.monotonic()
+    files = {}
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(limiter,)) as pool:
+            futures = {
+                pool.submit(_process_file, path, output_dir, stems[path], pdf): path
+                for path in ordered
+            }
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                try:
+                    entry = {"file": str(path), "status": "ok", **future.result()}
+                    print(f"[{done}/{len(paths)}] {path.name}: {entry['total_reviews']} reviews, "
+                          f"rating {entry['overall_ai_rating']:.2f} ({entry['seconds']:.1f}s)")
+                except Exception as e:
+                    entry = {"file": str(path), "status": "failed", "error": str(e)}
+                    print(f"[{done}/{len(paths)}] {path.name}: FAILED - {e}")
+                files[path] = entry
+    finally:
+        if manager is not None:
+            manager.shutdown()
+
+    summary = combine_summaries([files[path] for path in paths])
+    summary["workers"] = workers
+    summary["wall_seconds"] = round(time.monotonic() - started, 3)
+
+    with open(output_dir / SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=_to_builtin)
+
+    return summary
+
+
+def combine_summaries(entries):
+    """
+    Batch totals across per-file entries; ratings are averaged weighted by
+    each file's review count.
+    """
+    ok = [entry for entry in entries if entry["status"] == "ok"]
+    total_reviews = sum(entry["total_reviews"] for entry in ok)
+
+    def weighted(key):
+        if not total_reviews:
+            return None
+        return sum(entry[key] * entry["total_reviews"] for entry in ok) / total_reviews
+
+    return {
+        "files": len(entries),
+        "succeeded": len(ok),
+        "failed": len(entries) - len(ok),
+        "total_reviews": total_reviews,
+        "overall_ai_rating": weighted("overall_ai_rating"),
+        "weighted_rating": weighted("weighted_rating"),
+        "per_file": entries
+    }
@@ -0,0 +1,227 @@
+# Persistent result cache for LLM review analyses
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from src.config.prompts import REVIEW_ANALYSIS_PROMPT
+from src.utils.llm_utils import backend_identity
+from src.config.settings import (
+    GROQ_MODEL,
+    TEMPERATURE,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_MAX_AGE_DAYS,
+)
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Buffered access times of cache hits are written once this many are pending
+ACCESS_FLUSH_EVERY = 500
+
+
+def make_cache_key(review_text, model=GROQ_MODEL, temperature=TEMPERATURE, backend=None):
+    """
+    Content address of one analysis: review text, rendered prompt, backend,
+    model and temperature. Changing any of them yields a new key.
+    """
+    if backend is None:
+        backend = backend_identity()
+    review_hash = hashlib.sha256(review_text.encode("utf-8")).hexdigest()
+    rendered_prompt = REVIEW_ANALYSIS_PROMPT.format(review=review_text)
+
+    h = hashlib.sha256()
+    for part in (review_hash, rendered_prompt, str(backend), str(model), str(temperature)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class ReviewCache:
+    """
+    SQLite-backed cache of parsed model outputs (ai_rating, sentiment, reasoning).
+    Raw parsed values are stored so `sanitize_result` is applied exactly once per read.
+    `hits`/`misses` count every lookup in the process; runs sharing the
+    cache pass their own metrics to `get` and `stats` for per-run numbers.
+    Access times of hits are buffered and written in batches, so reads do
+    not commit.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                 max_age_days=RESULT_CACHE_MAX_AGE_DAYS):
+        path = Path(path)
+        if not path.is_absolute():
+            path = PROJECT_ROOT / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY,"
+            " ai_rating REAL NOT NULL,"
+            " sentiment REAL NOT NULL,"
+            " reasoning TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, review_text, metrics=None):
+        """
+        Returns the cached parsed dict for a review, or None on a miss.
+        The lookup is also counted in `metrics` (cache_hits/cache_misses).
+        """
+        key = make_cache_key(review_text)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ai_rating, sentiment, reasoning, created_at FROM analyses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            hit = row is not None and not self._is_expired(row[3], now)
+            if hit:
+                self.hits += 1
+                self._accessed[key] = now
+                if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                    self._flush_accessed()
+                    self._conn.commit()
+            else:
+                self.misses += 1
+
+        if metrics is not None:
+            metrics.increment("cache_hits" if hit else "cache_misses")
+        return {"ai_rating": row[0], "sentiment": row[1], "reasoning": row[2]} if hit else None
+
+    def put(self, review_text, parsed):
+        """
+        Stores a parsed model output. Unusable outputs are ignored.
+        """
+        try:
+            ai_rating = float(parsed["ai_rating"])
+            sentiment = float(parsed["sentiment"])
+            reasoning = str(parsed.get("reasoning", ""))
+        except Exception:
+            return
+
+        key = make_cache_key(review_text)
+        now = time.time()
+
+        with self._lock:
+            self._flush_accessed()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, ai_rating, sentiment, reasoning, now, now)
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """
+        Drops expired entries, then the least recently used ones beyond `max_entries`.
+        Returns the number of removed rows.
+        """
+        removed = 0
+
+        with self._lock:
+            # LRU order needs the buffered access times
+            self._flush_accessed()
+            if self.max_age_seconds:
+                cur = self._conn.execute(
+                    "DELETE FROM analyses WHERE created_at < ?",
+                    (time.time() - self.max_age_seconds,)
+                )
+                removed += cur.rowcount
+
+            if self.max_entries:
+                count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    cur = self._conn.execute(
+                        "DELETE FROM analyses WHERE key IN ("
+                        " SELECT key FROM analyses ORDER BY accessed_at ASC LIMIT ?)",
+                        (excess,)
+                    )
+                    removed += cur.rowcount
+
+            self._conn.commit()
+
+        return removed
+
+    def stats(self, metrics=None):
+        """
+        Hit/miss counts of one run (from its `metrics`), or of the whole
+        process, plus the current number of entries.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+        if metrics is not None:
+            hits = metrics.counters.get("cache_hits", 0)
+            misses = metrics.counters.get("cache_misses", 0)
+        else:
+            hits, misses = self.hits, self.misses
+
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": entries
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_accessed(self):
+        # Caller holds the lock and commits
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE analyses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _is_expired(self, created_at, now):
+        return self.max_age_seconds is not None and created_at < now - self.max_age_seconds
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the shared cache instance, or None when caching is disabled.
+    """
+    global _cache
+
+    if not RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReviewCache()
+    return _cache
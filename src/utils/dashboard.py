@@ -0,0 +1,57 @@
+# Derived data for the Streamlit dashboard, computed once per result
+import hashlib
+import numpy as np
+import pandas as pd
+from src.modules.aggregation import SENTIMENT_CATEGORIES
+
+
+def content_hash(data, block_size=1 << 20):
+    """
+    SHA-256 of an uploaded file's bytes, used as the result cache key.
+    """
+    h = hashlib.sha256()
+    view = memoryview(data)
+    for start in range(0, len(view), block_size):
+        h.update(view[start:start + block_size])
+    return h.hexdigest()
+
+
+def build_dashboard_data(result):
+    """
+    Chart tables, headline numbers and per-category row positions for one
+    pipeline result, so reruns of the app only render.
+    """
+    df = result["ratings_dataframe"]
+
+    # float32 ratings are widened and rounded so chart labels read 3.28, not 3.2799999
+    ratings = df["ai_rating"].astype("float64").round(2)
+    rating_counts = ratings.value_counts().sort_index().reset_index()
+    rating_counts.columns = ["ai_rating", "count"]
+
+    categories = df["sentiment_category"]
+    sentiment_counts = (
+        categories.value_counts()
+        .reindex(SENTIMENT_CATEGORIES, fill_value=0)
+        .reset_index()
+    )
+    sentiment_counts.columns = ["sentiment_category", "count"]
+
+    sentiment = df["sentiment"].astype("float64")
+    codes = pd.Categorical(categories, categories=SENTIMENT_CATEGORIES).codes
+
+    return {
+        "total_reviews": len(df),
+        "rating_counts": rating_counts,
+        "sentiment_counts": sentiment_counts,
+        "category_counts": dict(zip(sentiment_counts["sentiment_category"], sentiment_counts["count"])),
+        "sentiment_summary": {
+            "min": float(sentiment.min()),
+            "mean": float(sentiment.mean()),
+            "max": float(sentiment.max()),
+            "std": float(sentiment.std())
+        },
+        "category_positions": {
+            category: np.flatnonzero(codes == code)
+            for code, category in enumerate(SENTIMENT_CATEGORIES)
+        }
+    }
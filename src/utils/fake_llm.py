@@ -0,0 +1,223 @@
+# Deterministic offline LLM backend for benchmarking and regression runs
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from src.config.settings import (
+    FAKE_LLM_LATENCY,
+    FAKE_LLM_MALFORMED_RATE,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_SEED,
+)
+
+
+POSITIVE_WORDS = {
+    "good", "great", "excellent", "amazing", "phenomenal", "love", "loved", "seamless",
+    "fast", "quickly", "helpful", "easy", "improved", "reliable", "intuitive", "smooth",
+    "comprehensive", "impressive", "perfect", "best", "happy", "satisfied", "recommend",
+}
+NEGATIVE_WORDS = {
+    "bad", "poor", "terrible", "awful", "worst", "damaged", "broken", "ignored", "slow",
+    "outdated", "unintuitive", "complex", "frustrating", "crash", "crashes", "bug", "bugs",
+    "lacked", "lacking", "erased", "disappointed", "useless", "confusing", "delayed", "never",
+}
+
+_WORD = re.compile(r"[a-z']+")
+_BATCH_ITEM = re.compile(r"^\[ID: (.*?)\] (.*)$")
+
+
+class FakeLLMError(Exception):
+    """
+    Simulated provider failure.
+    """
+
+    def __init__(self, message, status_code=503, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution spec into a sampler `rng -> seconds`:
+      "0" / "fixed:0.05"         constant
+      "uniform:0.02,0.2"         uniform between bounds
+      "exponential:0.1"          exponential with the given mean
+      "lognormal:-2.3,0.5"       lognormal with mu, sigma of the underlying normal
+    """
+    name, _, params = str(spec).partition(":")
+    if not params:
+        name, params = "fixed", name
+
+    values = [float(v) for v in params.split(",")]
+
+    if name == "fixed":
+        return lambda rng: values[0]
+    if name == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "exponential":
+        return lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    if name == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def score_review(review_text):
+    """
+    Deterministic (ai_rating, sentiment) for a review: a small lexicon score
+    plus a stable hash-derived jitter.
+    """
+    words = _WORD.findall(review_text.lower())
+    positive = sum(word in POSITIVE_WORDS for word in words)
+    negative = sum(word in NEGATIVE_WORDS for word in words)
+
+    digest = hashlib.sha256(review_text.encode("utf-8")).digest()
+    jitter = (digest[0] / 255.0 - 0.5) * 0.4
+
+    raw = (positive - negative) / max(1.0, (positive + negative) ** 0.5) + jitter
+    sentiment = max(-1.0, min(1.0, raw / 1.5))
+    ai_rating = max(0.0, min(5.0, 3.0 + 2.0 * sentiment + (digest[1] / 255.0 - 0.5) * 0.6))
+
+    return round(ai_rating, 2), round(sentiment, 3)
+
+
+class FakeLLM(Runnable):
+    """
+    In-process stand-in for ChatGroq. It answers single-review and batched
+    prompts with well-formed JSON derived from the review text. Latency,
+    malformed output and exceptions are drawn from a seeded RNG. The same
+    prompt yields the same outcome sequence, so runs are reproducible.
+    """
+
+    def __init__(self, latency=FAKE_LLM_LATENCY, malformed_rate=FAKE_LLM_MALFORMED_RATE,
+                 error_rate=FAKE_LLM_ERROR_RATE, seed=FAKE_LLM_SEED):
+        self.latency_spec = latency
+        self._sample_latency = parse_latency(latency)
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """
+        Restarts the outcome sequences, e.g. between benchmark runs.
+        """
+        with self._lock:
+            self._attempts.clear()
+            self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        prompt_text = _prompt_to_text(input)
+        delay, outcome = self._plan(prompt_text)
+        if delay > 0:
+            time.sleep(delay)
+        return self._respond(prompt_text, outcome)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        prompt_text = _prompt_to_text(input)
+        delay, outcome = self._plan(prompt_text)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._respond(prompt_text, outcome)
+
+    def _plan(self, prompt_text):
+        # One RNG per (seed, prompt, attempt number): reproducible regardless of
+        # call interleaving, while retries of the same prompt can still differ
+        key = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            self.calls += 1
+
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+        delay = max(0.0, self._sample_latency(rng))
+
+        draw = rng.random()
+        if draw < self.error_rate:
+            outcome = "error"
+        elif draw < self.error_rate + self.malformed_rate:
+            outcome = "malformed"
+        else:
+            outcome = "ok"
+        return delay, outcome
+
+    def _respond(self, prompt_text, outcome):
+        if outcome == "error":
+            raise FakeLLMError("Simulated provider error (503 Service Unavailable)")
+
+        batch_items = _batch_items(prompt_text)
+        if batch_items is not None:
+            payload = []
+            for review_id, review_text in batch_items:
+                ai_rating, sentiment = score_review(review_text)
+                payload.append({
+                    "id": review_id,
+                    "ai_rating": ai_rating,
+                    "sentiment": sentiment,
+                    "reasoning": _reasoning(sentiment)
+                })
+            content = json.dumps(payload, indent=2)
+        else:
+            ai_rating, sentiment = score_review(_single_review(prompt_text))
+            content = json.dumps({
+                "ai_rating": ai_rating,
+                "sentiment": sentiment,
+                "reasoning": _reasoning(sentiment)
+            }, indent=2)
+
+        if outcome == "malformed":
+            # Truncated output, as seen when a model stops mid-object
+            content = content[:len(content) // 2]
+
+        input_tokens = len(prompt_text) // 4 + 1
+        output_tokens = len(content) // 4 + 1
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        )
+
+
+def _prompt_to_text(input):
+    if hasattr(input, "to_string"):
+        return input.to_string()
+    if isinstance(input, dict):
+        return str(input.get("review", input))
+    return str(input)
+
+
+def _single_review(prompt_text):
+    _, marker, review = prompt_text.rpartition("Review:\n")
+    return review.strip() if marker else prompt_text.strip()
+
+
+def _batch_items(prompt_text):
+    _, marker, block = prompt_text.rpartition("Reviews:\n")
+    if not marker:
+        return None
+
+    items = []
+    for line in block.strip().splitlines():
+        match = _BATCH_ITEM.match(line.strip())
+        if match:
+            items.append(match.groups())
+    return items or None
+
+
+def _reasoning(sentiment):
+    if sentiment <= -0.2:
+        return "The review describes a mostly negative experience."
+    if sentiment >= 0.2:
+        return "The review describes a mostly positive experience."
+    return "The review is balanced between positives and negatives."
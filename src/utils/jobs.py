@@ -0,0 +1,265 @@
+# Background analysis jobs shared by all Streamlit sessions and service clients
+import os
+import time
+import uuid
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from src.utils.progress import AnalysisProgress, AnalysisCancelled
+from src.config.settings import APP_MAX_JOBS, APP_RESULT_CACHE_ENTRIES
+
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+DEFAULT_CLIENT = "default"
+
+
+class AnalysisJob:
+    """
+    One pipeline run on a worker thread. Poll `status` and
+    `progress.snapshot()`; `result` is set once it completes.
+    `options` are passed to `run_pipeline` as keyword arguments.
+    `subscribers` are the sessions or clients waiting on the job.
+    """
+
+    def __init__(self, key, file_bytes, suffix=".csv", postprocess=None, client=None, options=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.client = client or DEFAULT_CLIENT
+        self.options = dict(options or {})
+        self.subscribers = set()
+        # Client whose queue the job was started from (its running slot)
+        self.dispatched_by = None
+        self.status = QUEUED
+        self.progress = AnalysisProgress()
+        self.result = None
+        self.extra = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self._file_bytes = file_bytes
+        self._suffix = suffix
+        self._postprocess = postprocess
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def cancel(self):
+        self.progress.cancel()
+        if self.status == QUEUED:
+            self.status = CANCELLED
+            self.finished_at = time.time()
+
+    def run(self):
+        # Imported here so the app can start before the pipeline is loaded
+        from src.pipeline import run_pipeline
+
+        if self.progress.cancelled:
+            self.status = CANCELLED
+            return
+
+        self.status = RUNNING
+        self.started_at = time.time()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=self._suffix) as tmp:
+            tmp.write(self._file_bytes)
+            file_path = tmp.name
+        self._file_bytes = None
+
+        try:
+            # Same bytes may run as several jobs with different options;
+            # each keeps its own checkpoint journal
+            self.result = run_pipeline(file_path, progress=self.progress, run_id=self.id, **self.options)
+            if self._postprocess is not None:
+                self.extra = self._postprocess(self.result)
+            self.status = COMPLETED
+        except AnalysisCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+        finally:
+            os.unlink(file_path)
+            self.finished_at = time.time()
+
+
+class JobManager:
+    """
+    Runs analysis jobs on a bounded pool of worker threads, so sessions never
+    block one another. Each client has its own queue; a free worker takes the
+    next job of the client with the fewest running jobs (then the one served
+    least recently), so one client submitting many files cannot starve the
+    others.
+    Jobs are keyed on the input's content hash: submitting a file that is
+    already queued, running or completed returns the existing job and adds
+    the submitter as a subscriber. A job is only cancelled once every
+    subscriber has cancelled it, so one session cannot stop another's run.
+    Only the `max_finished` most recent finished jobs are kept.
+    """
+
+    def __init__(self, max_workers=APP_MAX_JOBS, max_finished=APP_RESULT_CACHE_ENTRIES):
+        self.max_workers = max(1, max_workers)
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        # Per-client FIFO queues, running job counts and dispatch order
+        self._queues = {}
+        self._running = {}
+        self._last_served = {}
+        self._dispatched = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._workers = []
+
+    def submit(self, key, file_bytes, suffix=".csv", postprocess=None, client=None, options=None,
+               subscriber=None):
+        with self._lock:
+            existing = self._by_key.get(key)
+            if (existing is not None and existing.status not in (FAILED, CANCELLED)
+                    and not existing.progress.cancelled):
+                existing.subscribers.add(subscriber)
+                self._jobs.move_to_end(existing.id)
+                queue = self._queues.setdefault(client or DEFAULT_CLIENT, deque())
+                if existing.status == QUEUED and existing not in queue:
+                    # Also waits in this client's queue, so it starts on
+                    # whichever subscriber's turn comes first
+                    queue.append(existing)
+                    self._running.setdefault(client or DEFAULT_CLIENT, 0)
+                return existing
+
+            job = AnalysisJob(key, file_bytes, suffix, postprocess, client, options)
+            job.subscribers.add(subscriber)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._queues.setdefault(job.client, deque()).append(job)
+            self._running.setdefault(job.client, 0)
+            self._prune()
+
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name="analysis-job", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._wakeup.notify()
+
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, subscriber=None):
+        """
+        Every job, or only those `subscriber` is waiting on.
+        """
+        with self._lock:
+            return [job for job in self._jobs.values() if subscriber is None or subscriber in job.subscribers]
+
+    def queue_position(self, job):
+        """
+        Estimated jobs that will start before `job` (0 = next), or None if
+        it is not queued.
+        """
+        with self._lock:
+            queues = []
+            seen = set()
+            for client in sorted(self._queues, key=self._priority):
+                # A shared job counts once, in the queue that reaches it first
+                queues.append([queued for queued in self._queues[client]
+                               if queued.status == QUEUED and queued.id not in seen])
+                seen.update(queued.id for queued in queues[-1])
+
+        for client_rank, queue in enumerate(queues):
+            if job in queue:
+                depth = queue.index(job)
+                # Every earlier round serves each client once, then this
+                # round serves the clients ahead in the rotation
+                ahead = sum(min(len(other), depth) for other in queues)
+                ahead += sum(1 for other in queues[:client_rank] if len(other) > depth)
+                return ahead
+        return None
+
+    def find(self, key):
+        """
+        The completed job for `key`, if one is still cached.
+        """
+        with self._lock:
+            job = self._by_key.get(key)
+        return job if job is not None and job.status == COMPLETED else None
+
+    def cancel(self, job_id, subscriber=None):
+        """
+        Drops `subscriber`'s interest in the job and cancels it once nobody
+        is left waiting. Returns whether the job was cancelled.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.subscribers.discard(subscriber)
+            if job.subscribers:
+                return False
+        job.cancel()
+        return True
+
+    def _priority(self, client):
+        return self._running.get(client, 0), self._last_served.get(client, -1)
+
+    def _next_job(self):
+        with self._wakeup:
+            while True:
+                while self._queues:
+                    client = min(self._queues, key=self._priority)
+                    queue = self._queues[client]
+                    job = queue.popleft()
+                    if not queue:
+                        del self._queues[client]
+                    if job.status == QUEUED:
+                        job.dispatched_by = client
+                        self._running[client] += 1
+                        self._last_served[client] = self._dispatched
+                        self._dispatched += 1
+                        return job
+                self._wakeup.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            try:
+                job.run()
+            finally:
+                with self._lock:
+                    # A shared job may have started from a subscriber's queue
+                    self._running[job.dispatched_by] -= 1
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """
+    Process-wide job manager (one per Streamlit server).
+    """
+    global _manager
+
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+
+    return _manager
@@ -1,14 +1,55 @@
 # LLM utility functions
-from langchain_groq import ChatGroq
-from src.config.settings import GROQ_API_KEY, GROQ_MODEL, TEMPERATURE
+import threading
+from src.config.settings import GROQ_API_KEY, GROQ_MODEL, TEMPERATURE, LLM_BACKEND, FAKE_LLM_SEED
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def build_llm(backend=LLM_BACKEND):
+    """
+    Create a new llm instance for the given backend ("groq" or "fake").
+    Backend libraries are imported here so that importing the pipeline
+    (or running the analytics without an API key) stays cheap.
+    """
+    if backend == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model=GROQ_MODEL,
+            groq_api_key=GROQ_API_KEY,
+            temperature=TEMPERATURE,
+            # Retries, backoff and rate limiting are handled by src.utils.retry
+            max_retries=0
+        )
+
+    if backend == "fake":
+        from src.utils.fake_llm import FakeLLM
+
+        return FakeLLM()
+
+    raise ValueError(f"Unknown LLM backend '{backend}'. Expected 'groq' or 'fake'.")
+
+
+def backend_identity(backend=LLM_BACKEND):
+    """
+    Which backend produces the analyses, for cache keys and checkpoint
+    fingerprints, so synthetic results are never served for the real model.
+    """
+    if backend == "fake":
+        return f"fake:{FAKE_LLM_SEED}"
+    return backend
 
 
 def get_llm():
-    """Initialize and return a llm instance."""
-    llm = ChatGroq(
-        model=GROQ_MODEL,
-        groq_api_key=GROQ_API_KEY,
-        temperature=TEMPERATURE
-    )
-
-    return llm
+    """
+    Return the shared llm instance, building it on first use.
+    """
+    global _llm
+
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = build_llm()
+
+    return _llm
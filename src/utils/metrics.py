@@ -0,0 +1,206 @@
+# Per-stage timings and LLM call telemetry
+import os
+import json
+import time
+import threading
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Prometheus histogram buckets for per-call LLM latency (seconds)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "review_pipeline"
+
+
+def extract_token_usage(response):
+    """
+    (input_tokens, output_tokens) reported by a chat model response, or (0, 0).
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if token_usage:
+        return int(token_usage.get("prompt_tokens", 0)), int(token_usage.get("completion_tokens", 0))
+
+    return 0, 0
+
+
+class PipelineMetrics:
+    """
+    Collects wall time per stage and LLM call telemetry for one pipeline run.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.llm_calls = 0
+        self.llm_errors = 0
+        self.retries = 0
+        self.parse_failures = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.reviews = 0
+        self.counters = {}
+
+        self._latencies = array("d")
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def record_llm_call(self, latency, response=None, error=False, retry=False):
+        input_tokens, output_tokens = extract_token_usage(response) if response is not None else (0, 0)
+
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_errors += bool(error)
+            self.retries += bool(retry)
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self._latencies.append(latency)
+
+    def record_parse_failure(self, count=1):
+        with self._lock:
+            self.parse_failures += count
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def latency_percentiles(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            return {"p50": None, "p95": None, "p99": None}
+
+        def percentile(q):
+            # Nearest-rank percentile
+            rank = max(0, min(len(latencies) - 1, int(round(q * len(latencies) + 0.5)) - 1))
+            return latencies[rank]
+
+        return {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)}
+
+    def latency_histogram(self):
+        """
+        Cumulative bucket counts keyed by upper bound, Prometheus style.
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+
+        buckets = {str(bound): sum(1 for value in latencies if value <= bound) for bound in LATENCY_BUCKETS}
+        buckets["+Inf"] = len(latencies)
+        return buckets
+
+    def snapshot(self):
+        wall_time = time.perf_counter() - self._started
+        latency_sum = sum(self._latencies)
+
+        return {
+            "wall_time_seconds": round(wall_time, 4),
+            "stages_seconds": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "reviews": self.reviews,
+            "reviews_per_second": round(self.reviews / wall_time, 2) if wall_time > 0 else None,
+            "llm": {
+                "calls": self.llm_calls,
+                "errors": self.llm_errors,
+                "retries": self.retries,
+                "parse_failures": self.parse_failures,
+                "latency_seconds": {
+                    **{key: round(value, 4) if value is not None else None
+                       for key, value in self.latency_percentiles().items()},
+                    "mean": round(latency_sum / len(self._latencies), 4) if self._latencies else None,
+                    "sum": round(latency_sum, 4),
+                    "histogram": self.latency_histogram()
+                },
+                "tokens": {
+                    "input": self.input_tokens,
+                    "output": self.output_tokens,
+                    "total": self.input_tokens + self.output_tokens
+                }
+            },
+            "counters": dict(self.counters)
+        }
+
+    def to_prometheus(self, labels=None):
+        """
+        Renders the run as Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        base_labels = dict(labels or {})
+
+        def fmt(name, value, extra=None):
+            merged = {**base_labels, **(extra or {})}
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in merged.items())
+            label_text = f"{{{label_text}}}" if label_text else ""
+            return f"{METRIC_PREFIX}_{name}{label_text} {value}"
+
+        lines = [
+            f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+            *[fmt("stage_seconds", seconds, {"stage": stage})
+              for stage, seconds in snapshot["stages_seconds"].items()],
+            f"# TYPE {METRIC_PREFIX}_wall_time_seconds gauge",
+            fmt("wall_time_seconds", snapshot["wall_time_seconds"]),
+            f"# TYPE {METRIC_PREFIX}_reviews_total counter",
+            fmt("reviews_total", snapshot["reviews"]),
+            f"# TYPE {METRIC_PREFIX}_throughput_reviews_per_second gauge",
+            fmt("throughput_reviews_per_second", snapshot["reviews_per_second"] or 0),
+        ]
+
+        llm = snapshot["llm"]
+        for name in ("calls", "errors", "retries", "parse_failures"):
+            lines.append(f"# TYPE {METRIC_PREFIX}_llm_{name}_total counter")
+            lines.append(fmt(f"llm_{name}_total", llm[name]))
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_llm_tokens_total counter")
+        for kind in ("input", "output"):
+            lines.append(fmt("llm_tokens_total", llm["tokens"][kind], {"type": kind}))
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_llm_latency_seconds histogram")
+        for bound, count in llm["latency_seconds"]["histogram"].items():
+            lines.append(fmt("llm_latency_seconds_bucket", count, {"le": bound}))
+        lines.append(fmt("llm_latency_seconds_sum", llm["latency_seconds"]["sum"]))
+        lines.append(fmt("llm_latency_seconds_count", llm["calls"]))
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_llm_latency_quantile_seconds gauge")
+        for key, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+            value = llm["latency_seconds"][key]
+            if value is not None:
+                lines.append(fmt("llm_latency_quantile_seconds", value, {"quantile": quantile}))
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, labels=None):
+        """
+        Atomically writes a node_exporter textfile-collector file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(self.to_prometheus(labels), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def append_json_log(self, path, **fields):
+        """
+        Appends the run's snapshot as one JSON log line.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"timestamp": time.time(), "event": "pipeline_run", **fields, **self.snapshot()}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,97 @@
+# Per-review progress events, partial aggregates and cancellation for analysis runs
+import time
+import threading
+from src.modules.aggregation import StreamingAggregator
+
+
+class AnalysisCancelled(Exception):
+    """
+    Raised inside an analysis run once its job has been cancelled.
+    """
+
+
+class AnalysisProgress:
+    """
+    Receives one event per analyzed review from the analysis engines and
+    keeps counters, throughput and running aggregates that another thread
+    can poll. `cancel()` makes the run stop at the next review.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.aggregator = StreamingAggregator()
+
+        self._started = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def expect(self, count):
+        """
+        Announces `count` more reviews to analyze (called once per engine run).
+        """
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            self.total += count
+
+    def review_done(self, result=None, failed=False):
+        """
+        Per-review event: a clean result, or `failed=True` when the review was dropped.
+        """
+        with self._lock:
+            self.done += 1
+            self.failed += bool(failed)
+            if result is not None:
+                self.aggregator.add(result)
+
+        self.raise_if_cancelled()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise AnalysisCancelled("Analysis cancelled")
+
+    def snapshot(self):
+        """
+        Progress, throughput (reviews/s), ETA (s) and partial aggregates so far.
+        """
+        with self._lock:
+            done, total, failed = self.done, self.total, self.failed
+            elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+            rating = self.aggregator.rating
+            sentiment = self.aggregator.sentiment
+            weight_sum = self.aggregator.weight_sum
+            weighted_rating_sum = self.aggregator.weighted_rating_sum
+            category_counts = dict(self.aggregator.category_counts)
+
+        throughput = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, total - done)
+
+        partial = None
+        if rating.count:
+            partial = {
+                "analyzed": rating.count,
+                "overall_ai_rating": rating.mean,
+                "weighted_rating": weighted_rating_sum / weight_sum if weight_sum else rating.mean,
+                "mean_sentiment": sentiment.mean,
+                "sentiment_counts": category_counts
+            }
+
+        return {
+            "done": done,
+            "total": total,
+            "failed": failed,
+            "fraction": done / total if total else 0.0,
+            "elapsed_seconds": elapsed,
+            "reviews_per_second": throughput,
+            "eta_seconds": remaining / throughput if throughput > 0 else None,
+            "partial": partial
+        }
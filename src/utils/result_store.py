@@ -0,0 +1,138 @@
+# Result store for incremental pipeline runs
+import os
+import json
+import hashlib
+from pathlib import Path
+from src.modules.aggregation import StreamingAggregator
+from src.utils.result_table import _to_builtin
+
+
+STORE_VERSION = 1
+
+
+def text_hash(review_text):
+    return hashlib.sha256(str(review_text).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    Per-ID analysis results of previous runs plus the running aggregates
+    over them. Updating one review adjusts the running sums and Welford
+    state in O(1), so overall ratings never have to be rebuilt.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.aggregator = StreamingAggregator()
+
+    def __len__(self):
+        return len(self.records)
+
+    def diff(self, ids, reviews):
+        """
+        Compares a loaded file against the store.
+        Returns (positions to analyze, IDs no longer present in the file).
+        """
+        pending = []
+        for pos, (review_id, review_text) in enumerate(zip(ids, reviews)):
+            record = self.records.get(review_id)
+            if record is None or record["text_hash"] != text_hash(review_text):
+                pending.append(pos)
+
+        present = set(ids)
+        removed = [review_id for review_id in self.records if review_id not in present]
+        return pending, removed
+
+    def update(self, result, review_text):
+        """
+        Inserts or replaces the result for one review.
+        """
+        previous = self.records.get(result["id"])
+        if previous is not None:
+            self.aggregator.remove(previous)
+
+        record = {
+            "id": result["id"],
+            "text_hash": text_hash(review_text),
+            "ai_rating": result["ai_rating"],
+            "sentiment": result["sentiment"],
+            "reasoning": result.get("reasoning", "")
+        }
+        self.records[result["id"]] = record
+        self.aggregator.add(record)
+
+    def remove(self, review_id):
+        previous = self.records.pop(review_id, None)
+        if previous is not None:
+            self.aggregator.remove(previous)
+
+    def results_for(self, ids):
+        """
+        Stored results for `ids`, in that order, shaped like `analyze_reviews` output.
+        """
+        results = []
+        for review_id in ids:
+            record = self.records.get(review_id)
+            if record is not None:
+                results.append({
+                    "id": record["id"],
+                    "ai_rating": record["ai_rating"],
+                    "sentiment": record["sentiment"],
+                    "reasoning": record["reasoning"]
+                })
+        return results
+
+    def summary(self):
+        return self.aggregator.summary()
+
+    def save(self, path):
+        """
+        Writes the store atomically as JSON.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = {
+            "version": STORE_VERSION,
+            "aggregator": self.aggregator.state(),
+            "records": [
+                [r["id"], r["text_hash"], r["ai_rating"], r["sentiment"], r["reasoning"]]
+                for r in self.records.values()
+            ]
+        }
+
+        # One dumps() call uses the C encoder; json.dump() streams through
+        # the pure-Python one. IDs may be NumPy scalars from the array-based loader
+        text = json.dumps(payload, default=_to_builtin)
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved store, or returns an empty one if `path` does not exist.
+        """
+        store = cls()
+        path = Path(path)
+        if not path.exists():
+            return store
+
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+
+        if payload.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported result store version in {path}")
+
+        for review_id, hashed, ai_rating, sentiment, reasoning in payload["records"]:
+            store.records[review_id] = {
+                "id": review_id,
+                "text_hash": hashed,
+                "ai_rating": ai_rating,
+                "sentiment": sentiment,
+                "reasoning": reasoning
+            }
+        store.aggregator = StreamingAggregator.from_state(payload["aggregator"])
+        return store
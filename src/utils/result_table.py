@@ -0,0 +1,222 @@
+# Compact columnar pipeline results with lazy record views and Parquet storage
+import json
+import numpy as np
+import pandas as pd
+from collections.abc import Sequence
+from pathlib import Path
+from src.modules.aggregation import SENTIMENT_CATEGORIES, categorize_sentiments
+
+
+RECORD_COLUMNS = ["id", "review_text", "ai_rating", "sentiment", "reasoning"]
+
+METADATA_KEY = b"review_pipeline"
+RESULT_VERSION = 1
+
+try:
+    import pyarrow  # noqa: F401
+
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = "string"
+
+
+def compact_ratings_frame(df):
+    """
+    One table per run with compact dtypes: float32 scores, a categorical
+    `sentiment_category` and Arrow-backed strings for text columns.
+    """
+    compact = pd.DataFrame(index=pd.RangeIndex(len(df)))
+
+    for column in df.columns:
+        values = df[column].reset_index(drop=True)
+        if column in ("ai_rating", "sentiment", "user_rating"):
+            values = values.astype("float32")
+        elif column == "sentiment_category":
+            values = pd.Categorical(values, categories=SENTIMENT_CATEGORIES, ordered=True)
+        elif column in ("review_text", "reasoning"):
+            values = values.astype(TEXT_DTYPE)
+        compact[column] = values
+
+    return compact
+
+
+def example_table(records):
+    """
+    Compact table of the example records kept by the streaming trackers
+    (keyed by stream position). Returns the table and the sorted stream
+    positions of its rows.
+    """
+    positions = np.array(sorted(records), dtype=np.int64)
+    frame = pd.DataFrame([records[position] for position in positions], columns=RECORD_COLUMNS)
+    frame["sentiment_category"] = categorize_sentiments(frame["sentiment"])
+    return compact_ratings_frame(frame), positions
+
+
+def _to_builtin(value):
+    if isinstance(value, np.floating):
+        # str() gives the shortest repr, so float32 3.28 stays 3.28
+        return float(str(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NA:
+        return None
+    return value
+
+
+class RecordView(Sequence):
+    """
+    List-like view of selected rows of a ratings table. Rows are only turned
+    into dicts when accessed, so outlier and impact lists hold positions
+    (plus any per-row scores in `extra`) instead of copies of the text.
+    """
+
+    def __init__(self, frame, indices=None, extra=None, columns=None):
+        self.frame = frame
+        self.indices = np.arange(len(frame)) if indices is None else np.asarray(indices, dtype=np.int64)
+        self.extra = {name: np.asarray(values) for name, values in (extra or {}).items()}
+        self.columns = [c for c in (columns or RECORD_COLUMNS) if c in frame.columns]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return RecordView(
+                self.frame,
+                self.indices[item],
+                {name: values[item] for name, values in self.extra.items()},
+                self.columns
+            )
+
+        position = self.indices[item]
+        record = {column: _to_builtin(self.frame[column].iat[position]) for column in self.columns}
+        for name, values in self.extra.items():
+            record[name] = _to_builtin(values[item])
+        return record
+
+    def __repr__(self):
+        return f"RecordView({len(self)} rows)"
+
+    @property
+    def ids(self):
+        return self.frame["id"].to_numpy()[self.indices]
+
+    def over(self, frame):
+        """
+        Same rows and scores, read from another (e.g. compacted) copy of the table.
+        """
+        return RecordView(frame, self.indices, self.extra, self.columns)
+
+    def to_frame(self):
+        selected = self.frame[self.columns].iloc[self.indices].reset_index(drop=True)
+        for name, values in self.extra.items():
+            selected[name] = values
+        return selected
+
+    def to_list(self):
+        return [self[i] for i in range(len(self))]
+
+
+def save_result(result, path):
+    """
+    Writes a `run_pipeline` result as one Parquet file: the ratings table as
+    columns, everything else (summary numbers, outlier and impact references)
+    as JSON in the file's schema metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(result["ratings_dataframe"], preserve_index=False)
+
+    metadata = {
+        "version": RESULT_VERSION,
+        "total_reviews": result["total_reviews"],
+        "overall_ai_rating": result["overall_ai_rating"],
+        "weighted_rating": result["weighted_rating"],
+        "sentiment_stats": result["sentiment_stats"],
+        "rating_stats": result.get("rating_stats"),
+        "sentiment_counts": result.get("sentiment_counts"),
+        "user_rating_stats": result.get("user_rating_stats"),
+        "segment_stats": result["segment_stats"].to_dict(orient="split", index=False)
+        if result.get("segment_stats") is not None else None,
+        "outliers": {
+            **{key: value for key, value in result["outliers"].items() if key != "indices"},
+            "indices": {name: np.asarray(positions).tolist()
+                        for name, positions in result["outliers"]["indices"].items()}
+        },
+        "impact_analysis": {
+            name: {
+                "indices": view.indices.tolist(),
+                "extra": {key: values.tolist() for key, values in view.extra.items()}
+            }
+            for name, view in result["impact_analysis"].items()
+        },
+        **{key: result.get(key) for key in ("cache_stats", "deduplication", "pre_classification", "sampling", "incremental", "metrics")}
+    }
+
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY] = json.dumps(metadata, default=_to_builtin).encode("utf-8")
+    table = table.replace_schema_metadata(schema_metadata)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    pq.write_table(table, tmp_path)
+    tmp_path.replace(path)
+
+
+def _arrow_text_dtype(arrow_type):
+    import pyarrow as pa
+
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def load_result(path, memory_map=True):
+    """
+    Reads a result written by `save_result`. The Parquet file is read
+    through a memory map and decoded once; the decoded Arrow buffers become
+    the DataFrame's columns without a second copy (text stays Arrow-backed
+    rather than Python objects). List-valued entries come back as lazy
+    RecordViews.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, memory_map=memory_map)
+    metadata = json.loads(table.schema.metadata[METADATA_KEY])
+    if metadata.get("version") != RESULT_VERSION:
+        raise ValueError(f"Unsupported result version in {path}")
+
+    # Text columns keep the decoded Arrow buffers and numeric columns are not
+    # consolidated into 2D blocks, so the table is not copied again
+    df = table.to_pandas(types_mapper=_arrow_text_dtype, split_blocks=True, self_destruct=True)
+    del table
+
+    segment_stats = metadata.get("segment_stats")
+    if segment_stats is not None:
+        segment_stats = pd.DataFrame(segment_stats["data"], columns=segment_stats["columns"])
+
+    outliers = metadata["outliers"]
+    outliers["indices"] = {name: np.asarray(positions, dtype=np.int64)
+                           for name, positions in outliers["indices"].items()}
+
+    return {
+        "total_reviews": metadata["total_reviews"],
+        "overall_ai_rating": metadata["overall_ai_rating"],
+        "weighted_rating": metadata["weighted_rating"],
+        "sentiment_stats": metadata["sentiment_stats"],
+        "rating_stats": metadata.get("rating_stats"),
+        "sentiment_counts": metadata.get("sentiment_counts"),
+        "user_rating_stats": metadata.get("user_rating_stats"),
+        "segment_stats": segment_stats,
+        "ratings_dataframe": df,
+        "outliers": outliers,
+        "impact_analysis": {
+            name: RecordView(df, entry["indices"], entry["extra"])
+            for name, entry in metadata["impact_analysis"].items()
+        },
+        "all_reviews": RecordView(df),
+        **{key: metadata.get(key) for key in ("cache_stats", "deduplication", "pre_classification", "sampling", "incremental", "metrics")}
+    }
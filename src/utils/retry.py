@@ -0,0 +1,379 @@
+# Retry policy, client-side rate limiting and circuit breaker for LLM calls
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from src.config.settings import (
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    LLM_RPM_LIMIT,
+    LLM_TPM_LIMIT,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN,
+)
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def status_code_of(error):
+    """
+    HTTP status carried by a provider exception, if any.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error):
+    """
+    Rate limits, server errors and transport failures are worth retrying;
+    other client errors (bad request, auth) are not.
+    """
+    status = status_code_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def retry_after_seconds(error):
+    """
+    Delay requested by the provider (Retry-After / retry-after-ms), or None.
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+    Callers reserve capacity up front and are told how long to wait, so the
+    same bucket can throttle both threads and asyncio tasks.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1.0):
+        """
+        Takes `amount` from the bucket (possibly going into debt) and returns
+        the seconds to wait before the reservation is covered.
+        """
+        with self._lock:
+            self._refill()
+            # A request larger than the bucket can never fit; let it through
+            # once the bucket is full rather than blocking forever.
+            amount = min(float(amount), self.capacity)
+            self._available -= amount
+            if self._available >= 0:
+                return 0.0
+            return -self._available / self.rate
+
+    def adjust(self, delta):
+        """
+        Corrects an earlier reservation once the real cost is known
+        (positive `delta` takes more, negative gives tokens back).
+        """
+        with self._lock:
+            self._refill()
+            self._available = min(self.capacity, self._available - delta)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits, as published by Groq.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, rpm=LLM_RPM_LIMIT, tpm=LLM_TPM_LIMIT):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def reserve(self, tokens=0):
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def settle(self, estimated_tokens, actual_tokens):
+        if self.tokens is not None and actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures and makes
+    every caller wait out `cooldown` seconds. Then a single probe call is let
+    through: success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=CIRCUIT_BREAKER_THRESHOLD, cooldown=CIRCUIT_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.trips = 0
+
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Seconds the caller must wait before trying again; 0 means go ahead.
+        """
+        if not self.failure_threshold:
+            return 0.0
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if self.state == self.OPEN and remaining > 0:
+                return remaining
+
+            if self._probe_in_flight:
+                # Poll until the probe reports back
+                return min(1.0, self.cooldown) or 0.1
+
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                print("Circuit breaker closed: provider is responding again")
+            self.state = self.CLOSED
+
+    def abandon_probe(self):
+        """
+        Called when a call is cancelled before it reported back. If it was
+        the half-open probe, the circuit re-opens so a later caller probes
+        again instead of every caller waiting for it forever.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probe_in_flight:
+                self._probe_in_flight = False
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_failure(self):
+        if not self.failure_threshold:
+            return
+
+        with self._lock:
+            self._failures += 1
+            reopen = self.state == self.HALF_OPEN
+            self._probe_in_flight = False
+
+            if reopen or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    self.trips += 1
+                    print(f"Circuit breaker open after {self._failures} consecutive failures; "
+                          f"pausing LLM calls for {self.cooldown:g}s")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Wraps LLM calls with the client-side rate limiter, the circuit breaker and
+    exponential backoff with full jitter (honoring Retry-After when present).
+    Non-retryable errors are raised immediately; retryable ones are raised
+    after `max_attempts` tries.
+    """
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, limiter=None, breaker=None, rng=None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._rng = rng if rng is not None else random.Random()
+
+    def backoff(self, attempt, error=None):
+        """
+        Delay before retry number `attempt` (1-based).
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = self._rng.uniform(0, ceiling)
+
+        requested = retry_after_seconds(error) if error is not None else None
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        return delay
+
+    def call(self, fn, tokens=0, on_attempt=None, metrics=None):
+        """
+        Runs `fn()` under the policy. `on_attempt(n)` is called before each try.
+        """
+        attempt = 0
+        while True:
+            self._wait_until_allowed(time.sleep, tokens, metrics)
+            attempt += 1
+            if on_attempt is not None:
+                on_attempt(attempt)
+
+            try:
+                response = fn()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, metrics)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.abandon_probe()
+                raise
+
+            self._after_success(response, tokens)
+            return response
+
+    async def acall(self, fn, tokens=0, on_attempt=None, metrics=None):
+        """
+        Async counterpart of `call`; `fn()` returns an awaitable.
+        """
+        attempt = 0
+        while True:
+            await self._await_until_allowed(tokens, metrics)
+            attempt += 1
+            if on_attempt is not None:
+                on_attempt(attempt)
+
+            try:
+                response = await fn()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, metrics)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # e.g. CancelledError when a sibling task failed or the run was cancelled
+                self.breaker.abandon_probe()
+                raise
+
+            self._after_success(response, tokens)
+            return response
+
+    def _wait_until_allowed(self, sleep, tokens, metrics):
+        while True:
+            wait = self.breaker.before_call()
+            if wait <= 0:
+                break
+            _count(metrics, "circuit_open_wait_seconds", wait)
+            sleep(wait)
+
+        wait = self.limiter.reserve(tokens)
+        if wait > 0:
+            _count(metrics, "throttle_wait_seconds", wait)
+            sleep(wait)
+
+    async def _await_until_allowed(self, tokens, metrics):
+        while True:
+            wait = self.breaker.before_call()
+            if wait <= 0:
+                break
+            _count(metrics, "circuit_open_wait_seconds", wait)
+            await asyncio.sleep(wait)
+
+        wait = self.limiter.reserve(tokens)
+        if wait > 0:
+            _count(metrics, "throttle_wait_seconds", wait)
+            await asyncio.sleep(wait)
+
+    def _after_failure(self, error, attempt, metrics):
+        # Returns the backoff delay, or None when the error should be raised
+        if not is_retryable(error):
+            # The provider answered; this request is simply bad
+            self.breaker.record_success()
+            return None
+
+        if status_code_of(error) == 429:
+            _count(metrics, "rate_limited_responses")
+        self.breaker.record_failure()
+
+        if attempt >= self.max_attempts:
+            return None
+        return self.backoff(attempt, error)
+
+    def _after_success(self, response, tokens):
+        self.breaker.record_success()
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        actual = usage.get("total_tokens") or (usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+        self.limiter.settle(tokens, actual)
+
+
+def _count(metrics, name, value=1):
+    if metrics is not None:
+        metrics.increment(name, round(value, 4) if isinstance(value, float) else value)
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """
+    Process-wide policy, so every concurrent call shares one set of limits.
+    """
+    global _policy
+
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = RetryPolicy()
+
+    return _policy
@@ -3,7 +3,7 @@ from src.utils.llm_utils import get_llm
 from src.modules.csv_loader import load_csv
 from src.modules.review_analyzer import analyze_reviews
 from src.modules.aggregation import aggregate_results
-from src.modules.outlier_detection import detect_outliers
+from src.modules.outlier_detection import detect_outliers, outlier_records
 from src.modules.impact_analysis import analyze_impact
 
 print("\n--- TEST 1: Checking LLM Connection ---")
@@ -50,21 +50,22 @@ print(agg["sentiment_stats"])
 
 #Outlier
 
-outliers = detect_outliers(agg["ratings_dataframe"])
+df = agg["ratings_dataframe"]
+outliers = detect_outliers(df)
 
 print("\nOUTLIER COUNTS:")
 print(outliers["counts"])
 
 print("\nStatistical Outliers:")
-for r in outliers["statistical_outliers"]:
+for r in outlier_records(df, outliers, "statistical_outliers"):
     print(r)
 
 print("\nStrong Negative Reviews:")
-for r in outliers["strong_negative_reviews"]:
+for r in outlier_records(df, outliers, "strong_negative"):
     print(r)
 
 print("\nStrong Positive Reviews:")
-for r in outliers["strong_positive_reviews"]:
+for r in outlier_records(df, outliers, "strong_positive"):
     print(r)
 
 impact_results = analyze_impact(agg["ratings_dataframe"])
@@ -0,0 +1,72 @@
+import math
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+from src.modules.csv_loader import load_reviews, iter_review_chunks
+
+FRAME = pd.DataFrame({
+    "ID": [1, 2, 3, 4, 5],
+    "Name": ["a", "b", "c", "d", "e"],
+    "Review": ["great", "bad", None, "fine", "ok"],
+    "Ratings": [4.5, 1.0, 3.0, None, 2.5],
+    "Product": ["x", "y", "x", "y", "x"],
+})
+
+WRITERS = {
+    ".csv": lambda df, path: df.to_csv(path, index=False),
+    ".parquet": lambda df, path: df.to_parquet(path, index=False),
+    ".arrow": lambda df, path: feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), path),
+    ".jsonl": lambda df, path: df.to_json(path, orient="records", lines=True),
+}
+
+
+@pytest.fixture(params=sorted(WRITERS))
+def review_file(request, tmp_path):
+    path = tmp_path / f"reviews{request.param}"
+    WRITERS[request.param](FRAME, path)
+    return path
+
+
+def test_formats_load_the_same_arrays(review_file):
+    data = load_reviews(review_file, extra_columns=["Product"])
+
+    assert data["total_reviews"] == 5
+    assert list(data["ids"]) == [1, 2, 3, 4, 5]
+    assert list(data["reviews"]) == ["great", "bad", "", "fine", "ok"]
+    assert list(data["ratings"][:3]) == [4.5, 1.0, 3.0] and math.isnan(data["ratings"][3])
+    assert list(data["columns"]["Product"]) == ["x", "y", "x", "y", "x"]
+    assert set(data["columns"]) == {"Product"}
+
+
+def test_chunks_cover_the_file(review_file):
+    chunks = list(iter_review_chunks(review_file, chunk_size=2))
+    assert [chunk["total_reviews"] for chunk in chunks] == [2, 2, 1]
+    assert [review_id for chunk in chunks for review_id in chunk["ids"]] == [1, 2, 3, 4, 5]
+
+
+def test_missing_required_column(tmp_path):
+    path = tmp_path / "reviews.csv"
+    FRAME.drop(columns=["Review"]).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Review"):
+        load_reviews(path)
+
+
+def test_unparseable_csv_ratings_become_nan(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text("ID,Review,Ratings\n1,good,4\n2,meh,4 stars\n3,bad,\n")
+    ratings = load_reviews(path)["ratings"]
+    assert ratings[0] == 4.0
+    assert math.isnan(ratings[1]) and math.isnan(ratings[2])
+
+
+def test_csv_ids_changing_type_after_first_block(tmp_path):
+    path = tmp_path / "reviews.csv"
+    rows = "".join(f"{i},review {i},4\n" for i in range(40000))
+    path.write_text("ID,Review,Ratings\n" + rows + "X-0,odd,3\n")
+
+    assert load_reviews(path)["ids"][-1] == "X-0"
+    chunks = list(iter_review_chunks(path, chunk_size=10000))
+    assert sum(chunk["total_reviews"] for chunk in chunks) == 40001
+    assert chunks[0]["ids"].dtype.kind == "i"
+    assert chunks[-1]["ids"][-1] == "X-0"
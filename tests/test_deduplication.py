@@ -0,0 +1,48 @@
+from src.modules.deduplication import (
+    deduplicate_reviews, expand_results, normalize_text, simhash, SIMHASH_BITS
+)
+
+BASE = "The delivery was fast and the product works great, very happy with it overall"
+REVIEWS = [
+    BASE,
+    BASE.upper() + "!",                                   # exact after normalization
+    BASE.replace("was fast", "was not fast"),             # negated
+    BASE + " too",                                        # near duplicate
+    "Terrible support, never again",
+]
+
+
+def test_negation_blocks_near_duplicate_merge():
+    # The negated review is within the SimHash distance, so only the
+    # negation guard keeps it apart
+    distance = bin(simhash(normalize_text(BASE)) ^ simhash(normalize_text(REVIEWS[2]))).count("1")
+    assert distance <= round((1 - 0.85) * SIMHASH_BITS)
+
+    dedup = deduplicate_reviews(REVIEWS, [10, 11, 12, 13, 14], near_duplicates=True, threshold=0.85)
+    assert dedup["members"] == [[0, 1, 3], [2], [4]]
+    assert dedup["ids"] == [10, 12, 14]
+    assert (dedup["exact_duplicates"], dedup["near_duplicates"]) == (1, 1)
+
+
+def test_contractions_count_as_negations():
+    reviews = ["I like the new layout of the settings page a lot",
+               "I don't like the new layout of the settings page a lot"]
+    dedup = deduplicate_reviews(reviews, [1, 2], near_duplicates=True, threshold=0.5)
+    assert dedup["unique_reviews"] == 2
+
+
+def test_exact_only_when_near_duplicates_off():
+    dedup = deduplicate_reviews(REVIEWS, [10, 11, 12, 13, 14], near_duplicates=False)
+    assert dedup["members"] == [[0, 1], [2], [3], [4]]
+    assert dedup["near_duplicates"] == 0
+
+
+def test_expand_results_restores_input_order():
+    ids = [10, 11, 12, 13, 14]
+    dedup = deduplicate_reviews(REVIEWS, ids, near_duplicates=True, threshold=0.85)
+    results = [{"id": review_id, "ai_rating": float(i)} for i, review_id in enumerate(dedup["ids"])
+               if review_id != 14]
+
+    expanded = expand_results(results, dedup, ids)
+    assert [r["id"] for r in expanded] == [10, 11, 12, 13]
+    assert [r["ai_rating"] for r in expanded] == [0.0, 0.0, 1.0, 0.0]
@@ -0,0 +1,92 @@
+import math
+import numpy as np
+import pandas as pd
+from src.modules.impact_analysis import analyze_impact
+
+
+def ratings_frame(ratings, sentiments):
+    return pd.DataFrame({
+        "id": range(len(ratings)),
+        "review_text": [f"review {i}" for i in range(len(ratings))],
+        "ai_rating": ratings,
+        "sentiment": sentiments,
+        "reasoning": "r"
+    })
+
+
+def weighted_mean(ratings, weights):
+    # Same fallback as aggregate_results: no sentiment weight, plain mean
+    return np.average(ratings, weights=weights) if weights.sum() > 0 else ratings.mean()
+
+
+def brute_force(df):
+    ratings = df["ai_rating"].to_numpy(dtype=float)
+    weights = np.abs(df["sentiment"].to_numpy(dtype=float))
+    base, base_weighted = ratings.mean(), weighted_mean(ratings, weights)
+
+    impact, weighted_impact = [], []
+    for i in range(len(ratings)):
+        keep = np.arange(len(ratings)) != i
+        impact.append(round(abs(base - ratings[keep].mean()), 5))
+        weighted_impact.append(round(abs(base_weighted - weighted_mean(ratings[keep], weights[keep])), 5))
+    return np.array(impact), np.array(weighted_impact)
+
+
+def expected_ranking(scores, k):
+    # Descending, ties in input order
+    return sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:k]
+
+
+def test_closed_form_matches_leave_one_out():
+    rng = np.random.default_rng(0)
+    df = ratings_frame(np.round(rng.uniform(1, 5, 200), 2), np.round(rng.uniform(-1, 1, 200), 2))
+    impact, weighted_impact = brute_force(df)
+
+    result = analyze_impact(df, k=10)
+
+    view = result["most_influential_reviews"]
+    assert list(view.indices) == expected_ranking(impact, 10)
+    assert np.allclose(view.extra["impact_score"], impact[view.indices])
+    assert np.allclose(view.extra["weighted_impact_score"], weighted_impact[view.indices])
+
+    weighted_view = result["most_influential_weighted_reviews"]
+    assert list(weighted_view.indices) == expected_ranking(weighted_impact, 10)
+    assert np.allclose(weighted_view.extra["weighted_impact_score"], weighted_impact[weighted_view.indices])
+
+
+def test_ties_keep_input_order():
+    df = ratings_frame([1.0, 5.0, 3.0, 1.0, 5.0], [0.5] * 5)
+    view = analyze_impact(df, k=4)["most_influential_reviews"]
+    assert list(view.indices) == [0, 1, 3, 4]
+
+
+def test_zero_sentiment_weights_fall_back_to_plain_mean():
+    df = ratings_frame([1.0, 2.5, 4.0, 5.0], [0.0, 0.0, 0.0, 0.0])
+    impact, weighted_impact = brute_force(df)
+
+    view = analyze_impact(df, k=4)["most_influential_reviews"]
+    assert np.allclose(view.extra["impact_score"], impact[view.indices])
+    assert np.allclose(view.extra["weighted_impact_score"], weighted_impact[view.indices])
+    assert np.allclose(view.extra["weighted_impact_score"], view.extra["impact_score"])
+
+
+def test_single_weighted_review_leaves_plain_mean():
+    # Removing the only review with weight leaves no weight at all
+    df = ratings_frame([1.0, 3.0, 5.0], [0.0, 0.8, 0.0])
+    impact, weighted_impact = brute_force(df)
+
+    view = analyze_impact(df, k=3)["most_influential_weighted_reviews"]
+    assert np.allclose(view.extra["weighted_impact_score"], weighted_impact[view.indices])
+
+
+def test_single_review_has_undefined_impact():
+    df = ratings_frame([4.0], [0.5])
+    records = analyze_impact(df)["most_influential_reviews"].to_list()
+    assert len(records) == 1
+    assert math.isnan(records[0]["impact_score"])
+
+
+def test_empty_table():
+    result = analyze_impact(ratings_frame([], []))
+    assert len(result["most_influential_reviews"]) == 0
+    assert len(result["most_influential_weighted_reviews"]) == 0
@@ -0,0 +1,39 @@
+import time
+import threading
+from src.utils import jobs
+from src.utils.jobs import JobManager, COMPLETED
+
+
+def fake_run(self):
+    self.status = jobs.RUNNING
+    self.options["gate"].wait(5)
+    self.status = COMPLETED
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_shared_job_releases_the_dispatching_clients_slot(monkeypatch):
+    monkeypatch.setattr(jobs.AnalysisJob, "run", fake_run)
+    manager = JobManager(max_workers=1)
+
+    first_gate, shared_gate = threading.Event(), threading.Event()
+    first = manager.submit("first", b"", client="A", options={"gate": first_gate}, subscriber="A")
+    wait_until(lambda: first.status == jobs.RUNNING)
+
+    # B subscribes to A's queued job; B has not been served yet, so the job
+    # is started from B's queue
+    shared = manager.submit("shared", b"", client="A", options={"gate": shared_gate}, subscriber="A")
+    assert manager.submit("shared", b"", client="B", subscriber="B") is shared
+    first_gate.set()
+    wait_until(lambda: shared.status == jobs.RUNNING)
+    assert shared.dispatched_by == "B"
+    assert manager._running == {"A": 0, "B": 1}
+
+    shared_gate.set()
+    wait_until(lambda: manager._running == {"A": 0, "B": 0})
+    assert shared.subscribers == {"A", "B"}
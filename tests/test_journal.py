@@ -0,0 +1,77 @@
+import json
+from src.utils.journal import AnalysisJournal, file_fingerprint
+
+
+def result(review_id, ai_rating=4.0):
+    return {"id": review_id, "ai_rating": ai_rating, "sentiment": 0.5, "reasoning": "r"}
+
+
+def write_input(path, text="ID,Review\n1,good\n2,bad\n"):
+    path.write_text(text)
+    return path
+
+
+def test_resume_after_reopen(tmp_path):
+    source = write_input(tmp_path / "reviews.csv")
+    journal = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    journal.append(result(1))
+    journal.append(result(2, 2.0))
+    journal.close()
+
+    resumed = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    assert resumed.completed() == {1: result(1), 2: result(2, 2.0)}
+    resumed.close()
+
+
+def test_torn_trailing_line_is_skipped(tmp_path):
+    source = write_input(tmp_path / "reviews.csv")
+    journal = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    journal.append(result(1))
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"result": {"id": 2, "ai_ra')
+
+    resumed = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    assert list(resumed.completed()) == [1]
+    resumed.append(result(3))
+    resumed.close()
+
+    assert list(AnalysisJournal.for_file(source, directory=tmp_path / "ck").completed()) == [1, 3]
+
+
+def test_changed_file_does_not_resume(tmp_path):
+    source = write_input(tmp_path / "reviews.csv")
+    journal = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    journal.append(result(1))
+    journal.close()
+
+    write_input(source, "ID,Review\n1,changed\n2,bad\n")
+    changed = AnalysisJournal.for_file(source, directory=tmp_path / "ck")
+    assert changed.path != journal.path
+    assert changed.completed() == {}
+    changed.close()
+
+
+def test_header_mismatch_discards_entries(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"header": {"fingerprint": "other"}}) + "\n"
+                    + json.dumps({"result": result(1)}) + "\n")
+    journal = AnalysisJournal(path, "expected")
+    assert journal.completed() == {}
+    journal.close()
+
+
+def test_options_and_run_id_separate_journals(tmp_path):
+    source = write_input(tmp_path / "reviews.csv")
+    assert file_fingerprint(source, {"deduplicate": True}) != file_fingerprint(source, {"deduplicate": False})
+
+    first = AnalysisJournal.for_file(source, directory=tmp_path / "ck", run_id="job-1")
+    second = AnalysisJournal.for_file(source, directory=tmp_path / "ck", run_id="job-2")
+    assert first.path != second.path
+    first.append(result(1))
+    assert second.completed() == {}
+
+    second.discard()
+    assert not second.path.exists()
+    assert first.path.exists()
+    first.discard()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from src.utils.result_store import ResultStore
+
+
+def result(review_id, ai_rating, sentiment):
+    return {"id": review_id, "ai_rating": ai_rating, "sentiment": sentiment, "reasoning": "r"}
+
+
+def recomputed(records):
+    ratings = np.array([r["ai_rating"] for r in records])
+    sentiments = np.array([r["sentiment"] for r in records])
+    weights = np.abs(sentiments)
+    return {
+        "overall_ai_rating": round(ratings.mean(), 2),
+        "weighted_rating": round(float((ratings * weights).sum() / weights.sum()), 2),
+        "mean_sentiment": round(sentiments.mean(), 3),
+        "std_sentiment": round(sentiments.std(ddof=1), 3),
+        "rating_std": ratings.std(ddof=1),
+        "count": len(records)
+    }
+
+
+def assert_matches(store):
+    summary = store.summary()
+    expected = recomputed(list(store.records.values()))
+    assert summary["overall_ai_rating"] == expected["overall_ai_rating"]
+    assert summary["weighted_rating"] == expected["weighted_rating"]
+    assert summary["sentiment_stats"]["mean_sentiment"] == expected["mean_sentiment"]
+    assert summary["sentiment_stats"]["std_sentiment"] == expected["std_sentiment"]
+    assert summary["rating_stats"]["std"] == pytest.approx(expected["rating_std"])
+    assert summary["rating_stats"]["count"] == expected["count"]
+
+
+def test_updates_and_removals_match_recomputation():
+    rng = np.random.default_rng(3)
+    store = ResultStore()
+    for i in range(500):
+        store.update(result(i, round(rng.uniform(1, 5), 2), round(rng.uniform(-1, 1), 3)), f"text {i}")
+    assert_matches(store)
+
+    # Replace a third of the results, then drop another third
+    for i in range(0, 500, 3):
+        store.update(result(i, round(rng.uniform(1, 5), 2), round(rng.uniform(-1, 1), 3)), f"new text {i}")
+    for i in range(1, 500, 3):
+        store.remove(i)
+    assert len(store) == 500 - len(range(1, 500, 3))
+    assert_matches(store)
+
+
+def test_remove_down_to_empty():
+    store = ResultStore()
+    store.update(result(1, 4.0, 0.5), "a")
+    store.update(result(2, 2.0, -0.5), "b")
+    store.remove(1)
+    store.remove(2)
+    store.remove(3)
+    assert len(store) == 0
+    with pytest.raises(ValueError):
+        store.summary()
+
+    store.update(result(4, 3.0, 0.2), "c")
+    assert store.summary()["overall_ai_rating"] == 3.0
+
+
+def test_diff_and_round_trip(tmp_path):
+    store = ResultStore()
+    store.update(result(1, 4.0, 0.5), "kept")
+    store.update(result(2, 2.0, -0.5), "old text")
+    store.update(result(3, 3.0, 0.1), "removed")
+
+    path = tmp_path / "store.json"
+    store.save(path)
+    loaded = ResultStore.load(path)
+    assert loaded.records == store.records
+    assert loaded.summary() == store.summary()
+
+    pending, removed = loaded.diff([1, 2, 4], ["kept", "new text", "added"])
+    assert pending == [1, 2]
+    assert removed == [3]
+
+
+def test_load_missing_store(tmp_path):
+    assert len(ResultStore.load(tmp_path / "absent.json")) == 0
@@ -0,0 +1,63 @@
+import time
+import asyncio
+import pytest
+from src.utils.retry import CircuitBreaker, RetryPolicy, RateLimiter
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+def open_breaker(policy):
+    def failing():
+        raise ServerError("unavailable")
+
+    with pytest.raises(ServerError):
+        policy.call(failing)
+    assert policy.breaker.state == CircuitBreaker.OPEN
+
+
+def make_policy():
+    return RetryPolicy(max_attempts=1, limiter=RateLimiter(0, 0), breaker=CircuitBreaker(1, 0.1))
+
+
+def test_cancelled_sync_probe_releases_breaker():
+    policy = make_policy()
+    open_breaker(policy)
+    time.sleep(0.15)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        policy.call(interrupted)
+    assert policy.breaker.state == CircuitBreaker.OPEN
+
+    started = time.monotonic()
+    assert policy.call(lambda: "ok") == "ok"
+    assert time.monotonic() - started < 1.0
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_async_probe_releases_breaker():
+    policy = make_policy()
+    open_breaker(policy)
+    time.sleep(0.15)
+
+    async def scenario():
+        async def hang():
+            await asyncio.sleep(60)
+
+        probe = asyncio.ensure_future(policy.acall(hang))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        async def ok():
+            return "ok"
+
+        return await asyncio.wait_for(policy.acall(ok), timeout=1.0)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert policy.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from src.modules.sampling import ProgressiveSampler, rating_strata, sample_order, stratified_mean
+
+
+def population(n, seed=0):
+    rng = np.random.default_rng(seed)
+    user_ratings = rng.integers(1, 6, n).astype(float)
+    ai_ratings = np.clip(user_ratings + rng.normal(0, 0.5, n), 1, 5).round(2)
+    sentiments = np.clip((ai_ratings - 3) / 2 + rng.normal(0, 0.2, n), -1, 1).round(3)
+    return user_ratings, ai_ratings, sentiments
+
+
+def run(sampler, ai_ratings, sentiments, user_ratings):
+    sampler.plan(len(ai_ratings), user_ratings)
+    ids = list(range(len(ai_ratings)))
+    while True:
+        positions = sampler.next_round()
+        if len(positions) == 0:
+            return sampler.summary()
+        results = [{"id": int(p), "ai_rating": ai_ratings[p], "sentiment": sentiments[p]} for p in positions]
+        sampler.add_round(positions, [ids[p] for p in positions], results)
+
+
+def test_order_prefixes_stay_proportional():
+    strata = rating_strata([1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, np.nan, np.nan, np.nan, np.nan] * 25)
+    order = sample_order(strata, seed=1)
+    assert sorted(order) == list(range(len(strata)))
+
+    shares = np.bincount(strata) / len(strata)
+    for size in (10, 37, 100, 250):
+        counts = np.bincount(strata[order[:size]], minlength=len(shares))
+        assert np.all(np.abs(counts - shares * size) <= 1)
+
+
+def test_census_has_no_sampling_variance():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 2.0])
+    strata = np.array([0, 0, 0, 1, 1, 1])
+    estimate, variance = stratified_mean(values, strata, np.array([3.0, 3.0]))
+    assert estimate == pytest.approx(values.mean())
+    assert variance == pytest.approx(0.0)
+
+
+def test_intervals_cover_the_true_mean():
+    user_ratings, ai_ratings, sentiments = population(2000)
+    true_mean = ai_ratings.mean()
+
+    covered = 0
+    runs = 200
+    for seed in range(runs):
+        sampler = ProgressiveSampler(target_width=0, budget=150, initial_size=150, confidence=0.95, seed=seed)
+        estimate = run(sampler, ai_ratings, sentiments, user_ratings)["estimates"]["overall_ai_rating"]
+        covered += estimate["ci_low"] <= true_mean <= estimate["ci_high"]
+    # 95% nominal; allow for simulation noise
+    assert covered / runs >= 0.9
+
+
+def test_stops_at_target_width():
+    user_ratings, ai_ratings, sentiments = population(5000)
+    summary = run(ProgressiveSampler(target_width=0.2, budget=0, initial_size=50, seed=0),
+                  ai_ratings, sentiments, user_ratings)
+
+    assert summary["stop_reason"] == "target_width"
+    assert summary["sampled"] < 5000
+    for metric in ("overall_ai_rating", "weighted_rating"):
+        assert summary["estimates"][metric]["width"] <= 0.2
+    assert abs(summary["estimates"]["overall_ai_rating"]["estimate"] - ai_ratings.mean()) < 0.2
+
+
+def test_stops_at_budget():
+    user_ratings, ai_ratings, sentiments = population(5000)
+    summary = run(ProgressiveSampler(target_width=0.001, budget=300, initial_size=50, seed=0),
+                  ai_ratings, sentiments, user_ratings)
+    assert summary["stop_reason"] == "budget"
+    assert summary["sampled"] == 300
+
+
+def test_small_file_is_exhausted():
+    user_ratings, ai_ratings, sentiments = population(80)
+    summary = run(ProgressiveSampler(target_width=0.001, budget=0, initial_size=50, seed=0),
+                  ai_ratings, sentiments, user_ratings)
+    assert summary["stop_reason"] == "exhausted"
+    assert summary["sampled"] == 80
+    # The whole file was analyzed, so the interval collapses onto the mean
+    estimate = summary["estimates"]["overall_ai_rating"]
+    assert estimate["estimate"] == pytest.approx(ai_ratings.mean(), abs=1e-4)
+    assert estimate["width"] == pytest.approx(0.0, abs=1e-4)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.modules.aggregation import StreamingAggregator, aggregate_results
+from src.modules.outlier_detection import detect_outliers, StreamingOutlierDetector
+from src.modules.impact_analysis import analyze_impact, StreamingImpactTracker
+from src.utils.result_table import example_table
+
+
+@pytest.fixture(scope="module")
+def ratings():
+    rng = np.random.default_rng(1)
+    n = 3000
+    return pd.DataFrame({
+        "id": range(n),
+        "review_text": [f"review {i}" for i in range(n)],
+        "ai_rating": np.round(np.clip(rng.normal(3.3, 0.8, n), 1, 5), 2),
+        "sentiment": np.round(rng.uniform(-1, 1, n), 3),
+        "reasoning": "r"
+    })
+
+
+def stream(df, *trackers):
+    for record in df.to_dict("records"):
+        for tracker in trackers:
+            tracker.add(record)
+
+
+def test_outlier_detector_matches_detect_outliers(ratings):
+    detector = StreamingOutlierDetector(max_examples=20)
+    stream(ratings, detector)
+    table, positions = example_table(detector.example_records())
+
+    for method in ("percentile", "sigma", "iqr", "mad"):
+        streamed = detector.finalize(positions, method=method)
+        expected = detect_outliers(ratings, method=method)
+
+        assert streamed["counts"] == expected["counts"]
+        assert streamed["percentile_bounds"] == expected["percentile_bounds"]
+        for name, bounds in expected["bounds"].items():
+            assert streamed["bounds"][name] == pytest.approx(bounds)
+
+        # Indices point at retained examples that the full pass also flags
+        for name, rows in streamed["indices"].items():
+            assert set(table["id"].to_numpy()[rows]) <= set(expected["indices"][name])
+            assert len(rows) <= min(expected["counts"][name], 2 * detector.max_examples)
+
+
+def test_impact_tracker_matches_analyze_impact(ratings):
+    tracker = StreamingImpactTracker(k=10)
+    stream(ratings, tracker)
+
+    streamed = tracker.finalize()["most_influential_reviews"].to_list()
+    expected = analyze_impact(ratings, k=10)["most_influential_reviews"].to_list()
+    assert streamed == expected
+
+
+def test_shared_example_table(ratings):
+    detector = StreamingOutlierDetector(max_examples=5)
+    tracker = StreamingImpactTracker(k=5)
+    stream(ratings, detector, tracker)
+
+    table, positions = example_table({**detector.example_records(), **tracker.example_records()})
+    impacts = tracker.finalize(table, positions)["most_influential_reviews"]
+    outliers = detector.finalize(positions)
+
+    assert list(impacts.ids) == list(analyze_impact(ratings, k=5)["most_influential_reviews"].ids)
+    assert table["id"].is_monotonic_increasing
+    assert all(rows.max() < len(table) for rows in outliers["indices"].values() if len(rows))
+
+
+def test_aggregator_matches_aggregate_results(ratings):
+    aggregator = StreamingAggregator()
+    stream(ratings, aggregator)
+
+    streamed = aggregator.summary()
+    expected = aggregate_results(ratings.to_dict("records"), ratings["review_text"].tolist(),
+                                 ratings["id"].tolist())
+    for key in ("overall_ai_rating", "weighted_rating", "sentiment_stats", "sentiment_counts"):
+        assert streamed[key] == expected[key]
+    assert streamed["rating_stats"] == pytest.approx(expected["rating_stats"])
+
+
+def test_empty_streams():
+    with pytest.raises(ValueError):
+        StreamingOutlierDetector().finalize()
+    assert len(StreamingImpactTracker().finalize()["most_influential_reviews"]) == 0